@@ -2,6 +2,13 @@ from flask import Flask
 from app.config import Config
 from app.core.extensions import init_extensions
 from app.core.error_handlers import register_error_handlers
+from app.core.password_hasher import password_hasher
+from app.core.tracing import tracer
+from app.core.query_counter import query_counter
+from app.services.message_journal import message_journal
+from app.services.conversation_store import conversation_store
+from app.ai.registry import network_registry
+from app.ai.warmup import warmup as ai_warmup
 from app.blueprints.main import main
 from app.blueprints.auth import auth
 from app.blueprints.bot import bot
@@ -19,6 +26,24 @@ def create_app(config_object=None):
     # Initialize extensions
     init_extensions(app)
     
+    # Per-stage request timings (Server-Timing header and /metrics)
+    tracer.init_app(app)
+    
+    # SQL statements and database time per request, with a budget warning
+    query_counter.init_app(app)
+    
+    # Bounded pool for bcrypt hashing and verification
+    password_hasher.init_app(app)
+    
+    # Optional write-behind storage of chat messages
+    message_journal.init_app(app)
+    
+    # Server-side conversation state
+    conversation_store.init_app(app)
+    
+    # Validated network artifacts
+    network_registry.init_app(app)
+    
     # Register error handlers
     register_error_handlers(app)
     
@@ -27,4 +52,14 @@ def create_app(config_object=None):
     app.register_blueprint(auth, url_prefix="/auth")
     app.register_blueprint(bot, url_prefix="/bot")
     
+    # Warm the AI stack: in the gunicorn master before fork, synchronously, or on a background thread
+    warm_recommendations = bool(app.config.get("WARM_RECOMMENDATION_CACHE"))
+    if app.config.get("PRELOAD_AI_MODELS"):
+        ai_warmup.run(recommendations=warm_recommendations)
+        network_registry.preload()
+    elif app.config.get("AI_WARMUP") == "sync":
+        ai_warmup.run(recommendations=warm_recommendations)
+    elif app.config.get("AI_WARMUP") == "thread":
+        ai_warmup.start(recommendations=warm_recommendations)
+    
     return app
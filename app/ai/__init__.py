@@ -1,4 +1,21 @@
-from .betting_adviser import BettingAdviser, SportFactory
-from .base_models import BaseExpert, BaseBayesianNetwork
+import importlib
 
-__all__ = ['BettingAdviser', 'SportFactory', 'BaseExpert', 'BaseBayesianNetwork']
+# Exports resolved on first access, so importing app.ai (e.g. the registry)
+# does not load experta and pgmpy until a model is actually needed.
+_EXPORTS = {
+    'BettingAdviser': 'app.ai.betting_adviser',
+    'SportFactory': 'app.ai.betting_adviser',
+    'BaseExpert': 'app.ai.base_models',
+    'BaseBayesianNetwork': 'app.ai.base_models',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,179 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import numpy as np
+import pgmpy
+from pgmpy.models import BayesianNetwork
+from pgmpy.factors.discrete import TabularCPD
+from app.core.private_dir import private_directory
+
+logger = logging.getLogger(__name__)
+
+
+class NetworkArtifactStore:
+    """
+    On-disk cache of validated Bayesian networks.
+
+    An artifact is a directory holding one ``.npy`` file per CPD and a
+    ``manifest.json`` with the graph, the state names, the *spec hash* of the
+    code that built the network and a *content hash* of everything else. It is
+    only written after ``create_network()`` (and therefore ``check_model()``)
+    succeeded, so loading an artifact whose hashes match skips validation: the
+    CPD arrays are memory-mapped and the model is rebuilt from the manifest.
+
+    The hashes are not keyed, so they only catch stale or damaged artifacts;
+    what keeps anyone else from planting one is the directory itself. It is
+    created with mode 0700, and one not owned by this process' user, or
+    writable by group or others, is neither read nor written.
+    """
+
+    FORMAT_VERSION = 1
+    MANIFEST = "manifest.json"
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    @classmethod
+    def spec_hash(cls, network_cls):
+        """
+        Hash of everything that determines the network: the source files of its
+        classes (CPD values, weights, ``additive_table``), the pgmpy and numpy
+        versions and the artifact format. Returns ``None`` when a source file
+        cannot be read.
+        """
+        digest = hashlib.sha256(f"{cls.FORMAT_VERSION}|{pgmpy.__version__}|{np.__version__}".encode())
+        try:
+            for klass in network_cls.__mro__:
+                if klass.__module__.startswith("app."):
+                    with open(sys.modules[klass.__module__].__file__, "rb") as f:
+                        digest.update(f.read())
+        except (OSError, KeyError, TypeError):
+            return None
+        return digest.hexdigest()
+
+    @staticmethod
+    def content_hash(manifest, arrays):
+        """Hash of the manifest (without its own hash) and the CPD arrays."""
+        body = {key: value for key, value in manifest.items() if key != "content_hash"}
+        digest = hashlib.sha256(json.dumps(body, sort_keys=True).encode())
+        for array in arrays:
+            digest.update(f"{array.dtype.str}{array.shape}".encode())
+            digest.update(np.ascontiguousarray(array).tobytes())
+        return digest.hexdigest()
+
+    def trusted(self, create=False):
+        """Whether the directory (made first when ``create``) can only be written by this process' user."""
+        if private_directory(self.directory, create):
+            return True
+        if os.path.isdir(self.directory):
+            logger.warning(f"Ignoring network artifacts in {self.directory}: not private to this user")
+        return False
+
+    def path(self, network_cls):
+        """Directory of the artifact of ``network_cls``."""
+        return os.path.join(self.directory, network_cls.__name__)
+
+    def save(self, network_cls, model):
+        """
+        Write the artifact of a validated ``model``.
+
+        The artifact is written to a temporary directory and then moved into
+        place, so concurrent readers see either the old or the new one. Returns
+        whether it was written; failures are logged and never raised.
+        """
+        spec_hash = self.spec_hash(network_cls)
+        if spec_hash is None or not self.trusted(create=True):
+            return False
+
+        cpds = model.get_cpds()
+        manifest = {
+            "format": self.FORMAT_VERSION,
+            "spec_hash": spec_hash,
+            "nodes": list(model.nodes()),
+            "edges": [list(edge) for edge in model.edges()],
+            "cpds": [
+                {
+                    "file": f"cpd_{i}.npy",
+                    "variable": cpd.variable,
+                    "variables": list(cpd.variables),
+                    "cardinality": [int(card) for card in cpd.cardinality],
+                    "state_names": {var: list(states) for var, states in cpd.state_names.items()}
+                }
+                for i, cpd in enumerate(cpds)
+            ]
+        }
+        arrays = [np.ascontiguousarray(cpd.values, dtype=float) for cpd in cpds]
+        manifest["content_hash"] = self.content_hash(manifest, arrays)
+
+        target = self.path(network_cls)
+        staging = None
+        try:
+            staging = tempfile.mkdtemp(prefix=f".{network_cls.__name__}-", dir=self.directory)
+            for entry, array in zip(manifest["cpds"], arrays):
+                np.save(os.path.join(staging, entry["file"]), array)
+            with open(os.path.join(staging, self.MANIFEST), "w", encoding="utf-8") as f:
+                json.dump(manifest, f)
+            if os.path.isdir(target):
+                # Move the old artifact aside first; directories cannot be replaced atomically
+                stale = tempfile.mkdtemp(prefix=f".{network_cls.__name__}-stale-", dir=self.directory)
+                os.replace(target, os.path.join(stale, "artifact"))
+                shutil.rmtree(stale, ignore_errors=True)
+            os.replace(staging, target)
+        except OSError:
+            if staging is not None:
+                shutil.rmtree(staging, ignore_errors=True)
+            logger.warning(f"Could not write the network artifact for {network_cls.__name__}", exc_info=True)
+            return False
+        return True
+
+    def load(self, network_cls):
+        """
+        Return the model stored for ``network_cls`` without validating it again.
+
+        Returns ``None`` when there is no artifact, when the directory is not
+        private, when it was built by other code (spec hash mismatch) or when
+        its content does not match its hash.
+        """
+        spec_hash = self.spec_hash(network_cls)
+        target = self.path(network_cls)
+        if spec_hash is None or not os.path.isfile(os.path.join(target, self.MANIFEST)):
+            return None
+        if not self.trusted():
+            return None
+
+        try:
+            with open(os.path.join(target, self.MANIFEST), encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest.get("format") != self.FORMAT_VERSION or manifest.get("spec_hash") != spec_hash:
+                return None
+            arrays = [
+                np.asarray(np.load(os.path.join(target, entry["file"]), mmap_mode="r"))
+                for entry in manifest["cpds"]
+            ]
+            if self.content_hash(manifest, arrays) != manifest.get("content_hash"):
+                logger.warning(f"Network artifact for {network_cls.__name__} is corrupt, rebuilding")
+                return None
+
+            model = BayesianNetwork(manifest["edges"])
+            model.add_nodes_from(manifest["nodes"])
+            cpds = []
+            for entry, array in zip(manifest["cpds"], arrays):
+                card = entry["cardinality"]
+                cpd = TabularCPD(
+                    variable=entry["variable"], variable_card=card[0],
+                    values=array.reshape(card[0], -1),
+                    evidence=entry["variables"][1:] or None, evidence_card=card[1:] or None,
+                    state_names=entry["state_names"]
+                )
+                # Keep the memory-mapped buffer so workers share the page cache
+                cpd.values = array
+                cpds.append(cpd)
+            model.add_cpds(*cpds)
+        except (OSError, ValueError, KeyError, TypeError):
+            logger.warning(f"Could not read the network artifact for {network_cls.__name__}", exc_info=True)
+            return None
+        return model
@@ -1,6 +1,14 @@
 from abc import ABC, abstractmethod
+import itertools
+import threading
+import weakref
+import numpy as np
 from experta import KnowledgeEngine, Fact
+from pgmpy.factors.discrete import DiscreteFactor
 from pgmpy.inference import VariableElimination
+from app.core.cache import TTLCache
+from app.core.tracing import trace_stage, traced
+from app.ai.artifact import NetworkArtifactStore
 
 class BaseExpert(KnowledgeEngine, ABC):
     """
@@ -11,11 +19,214 @@ class BaseExpert(KnowledgeEngine, ABC):
     # def __init__(self):
     #     self.counter = 0
 
+    @traced("expert.reset")
+    def reset(self, **kwargs):
+        """Clear the working memory before declaring the answered facts."""
+        return super().reset(**kwargs)
+
+    @traced("expert.replay")
+    def run(self, steps=float("inf")):
+        """Run the Rete network over the declared facts."""
+        return super().run(steps)
+
     @abstractmethod
     def get_sport_name(self):
         """Return the name of the sport this knowledge base handles."""
         pass
     
+    # Direct-evaluation ("question plan") settings, filled in by each sport.
+    fact_class = Fact
+    valid_states = {}
+    use_question_plan = True
+
+    def question_plan(self):
+        """
+        Return the ordered ``(next_fact, question)`` pairs asked by the @Rule chain.
+
+        The plan is derived once per expert class by replaying the Rete network
+        with one more answered fact each time, and then cached on the class.
+        """
+        cls = type(self)
+        plan = cls.__dict__.get("_question_plan")
+        if plan is None:
+            plan = []
+            answered = {}
+            for _ in self.valid_states:
+                self.reset()
+                if answered:
+                    self.declare(self.fact_class(**answered))
+                self.run()
+                question = next((fact for fact in self.facts.values() if "question" in fact), None)
+                if question is None:
+                    break
+                plan.append((question["next_fact"], question["question"]))
+                answered[question["next_fact"]] = self.valid_states[question["next_fact"]][0]
+            self.reset()
+            plan = tuple(plan)
+            cls._question_plan = plan
+        return plan
+
+    @traced("expert.plan")
+    def answer_from_plan(self, translated_facts):
+        """
+        Answer a turn straight from the question plan, without running experta.
+
+        Returns the next question, or the final result once every key in the plan
+        is answered. Returns ``None`` when the answers are not a clean prefix of
+        the plan (duplicated, unknown or invalid values) so the caller can fall
+        back to the Rete path, which stays the reference behaviour.
+        """
+        answered = self.prefix_evidence(translated_facts)
+        if answered is None:
+            return None
+
+        plan = self.question_plan()
+        keys = [key for key, _ in plan]
+        if len(answered) < len(keys):
+            # Mirror the Rete path, where only the rule asking the next question records data
+            self.collected_data = {keys[len(answered) - 1]: answered[keys[len(answered) - 1]]} if answered else {}
+            key, question = plan[len(answered)]
+            return self.with_estimate({"question": question, "next_fact": key}, translated_facts)
+
+        self.collected_data = {}
+        return {"result": self.final_recommendation(answered)}
+
+    def prefix_evidence(self, translated_facts):
+        """Return the answers as one dict when they are a clean prefix of the plan, else ``None``."""
+        answered = {}
+        for fact in translated_facts:
+            for key, value in fact.items():
+                if key in answered or value not in self.valid_states.get(key, ()):
+                    return None
+                answered[key] = value
+
+        keys = [key for key, _ in self.question_plan()]
+        if set(answered) != set(keys[:len(answered)]):
+            return None
+        return answered
+
+    def running_estimate(self, answered):
+        """
+        Return P(safe) given a prefix of answers, read from the network's prefix tables.
+
+        Returns ``None`` when the network cannot provide prefix tables.
+        """
+        network = self.bayes_net
+        if not isinstance(network, BaseBayesianNetwork) or network.target_variable != self.target:
+            return None
+        keys = [key for key, _ in self.question_plan()]
+        with trace_stage("bayes.prefix"):
+            return round(network.prefix_posterior(keys, answered)["safe"], 4)
+
+    def with_estimate(self, response, translated_facts):
+        """Add the running ``safe_probability`` to a question when the answers so far allow it."""
+        answered = self.prefix_evidence(translated_facts)
+        if answered is not None:
+            estimate = self.running_estimate(answered)
+            if estimate is not None:
+                response["safe_probability"] = estimate
+        return response
+
+    # Final recommendation memo settings.
+    target = None
+    use_recommendation_cache = True
+    recommendation_cache_size = 20000
+
+    def final_recommendation(self, evidence):
+        """
+        Return the final explanation for a fully answered conversation.
+
+        Complete, valid evidence is memoized per network: the canonical evidence
+        tuple maps to ``(prob_safe, label, explanation)``. The memo is dropped
+        whenever the network's CPDs change (see ``BaseBayesianNetwork.revision``).
+        """
+        self.collected_data.update(evidence)
+        key = self.evidence_key(self.collected_data)
+        cache = self.recommendation_cache() if key is not None else None
+        if cache is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                return cached[2]
+
+        with trace_stage("bayes.query"):
+            prediction = self.bayes_net.inference.query(
+                variables=[self.target],
+                evidence=self.collected_data
+            )
+        values = prediction.values
+        prob_safe = round(values[0] * 100, 2)
+        label = prediction.state_names[self.target][values.argmax()]
+        explanation = self.explain(self.collected_data, label, prob_safe)
+
+        if cache is not None:
+            cache.set(key, (prob_safe, label, explanation))
+        return explanation
+
+    @abstractmethod
+    def explain(self, evidence, label, prob_safe):
+        """Render the explanation of a recommendation."""
+        pass
+
+    def evidence_key(self, evidence):
+        """Return the canonical evidence tuple, or ``None`` unless every key has a valid state."""
+        if len(evidence) != len(self.valid_states):
+            return None
+        key = tuple(evidence.get(name) for name in self.valid_states)
+        if any(value not in states for value, states in zip(key, self.valid_states.values())):
+            return None
+        return key
+
+    _recommendation_caches = weakref.WeakKeyDictionary()
+    _recommendation_lock = threading.Lock()
+
+    def recommendation_cache(self):
+        """
+        Return the memo of final recommendations for this expert's network.
+
+        Only networks that track their CPD revision are memoized; any other
+        network object (e.g. a test double) always goes through inference.
+        """
+        network = self.bayes_net
+        if not self.use_recommendation_cache or not isinstance(network, BaseBayesianNetwork):
+            return None
+        caches = BaseExpert._recommendation_caches
+        with BaseExpert._recommendation_lock:
+            entry = caches.get(network)
+            if entry is None or entry[0] != network.revision:
+                entry = (network.revision, TTLCache(max_size=self.recommendation_cache_size))
+                caches[network] = entry
+        return entry[1]
+
+    def warm_recommendation_cache(self):
+        """
+        Fill the memo with every evidence combination at once.
+
+        The posteriors come from a single gather into the network's lookup
+        table; only the explanations are rendered one by one.
+        """
+        cache = self.recommendation_cache()
+        inference = self.bayes_net.inference
+        if cache is None or not isinstance(inference, LookupInference):
+            return 0
+
+        keys = list(self.valid_states)
+        combinations = list(itertools.product(*self.valid_states.values()))
+        codes = np.array([
+            [inference.ordinals[name][state] for name, state in zip(keys, combination)]
+            for combination in combinations
+        ]).reshape(-1, len(keys))
+        # Columns follow the CPD evidence order, which may differ from the question order
+        order = [keys.index(var) for var in inference.evidence_vars]
+        rows = inference.batch_query(codes[:, order])
+        labels = inference.state_names[self.target]
+
+        for combination, row in zip(combinations, rows):
+            evidence = dict(zip(keys, combination))
+            prob_safe = round(row[0] * 100, 2)
+            label = labels[row.argmax()]
+            cache.set(combination, (prob_safe, label, self.explain(evidence, label, prob_safe)))
+        return len(combinations)
+
     def get_next_question(self, facts, fact_cls=Fact):
         """
         Get the next question to ask the user based on the current state of the knowledge base.
@@ -43,17 +254,310 @@ class BaseExpert(KnowledgeEngine, ABC):
             
 
 
+class LookupInference(VariableElimination):
+    """
+    Variable elimination with an O(1) path for fully observed parents.
+
+    When every parent of ``target`` is in the evidence, the posterior of
+    ``target`` is just the matching (normalized) column of its CPD, so it is
+    read from a flat lookup table indexed by state ordinals. Any other query
+    goes through the regular ``VariableElimination`` algorithm.
+    """
+
+    def __init__(self, model, target):
+        super().__init__(model)
+        cpd = model.get_cpds(target)
+        self.target = target
+        self.evidence_vars = list(cpd.variables[1:])
+        self.state_names = {target: list(cpd.state_names[target])}
+        self.ordinals = {
+            var: {state: i for i, state in enumerate(cpd.state_names[var])}
+            for var in self.evidence_vars
+        }
+
+        cards = [int(card) for card in cpd.cardinality[1:]]
+        self.strides = np.array([np.prod(cards[i + 1:], dtype=np.int64) for i in range(len(cards))])
+
+        # One row per parent combination, normalized the same way VE would.
+        table = np.ascontiguousarray(cpd.get_values().T, dtype=float)
+        table /= table.sum(axis=1, keepdims=True)
+        table.flags.writeable = False
+        self.table = table
+
+    def index_of(self, evidence):
+        """Return the lookup row for a fully observed evidence dict."""
+        return sum(self.ordinals[var][evidence[var]] * int(stride)
+                   for var, stride in zip(self.evidence_vars, self.strides))
+
+    def encode(self, var, states):
+        """Map a sequence of state names of ``var`` to ordinals (-1 for unknown states)."""
+        uniques, inverse = np.unique(np.asarray(states, dtype=str), return_inverse=True)
+        ordinals = self.ordinals[var]
+        return np.array([ordinals.get(state, -1) for state in uniques], dtype=np.int64)[inverse]
+
+    def batch_query(self, codes):
+        """Return the posterior rows for an ``(n_rows, n_parents)`` array of state ordinals."""
+        return self.table[np.asarray(codes, dtype=np.int64).reshape(-1, len(self.strides)) @ self.strides]
+
+    def query(self, variables, evidence=None, virtual_evidence=None, elimination_order="greedy",
+              joint=True, show_progress=True):
+        if (evidence and virtual_evidence is None and list(variables) == [self.target]
+                and len(evidence) == len(self.evidence_vars)):
+            try:
+                row = self.table[self.index_of(evidence)]
+            except KeyError:
+                # Unknown variable or state: let pgmpy raise its usual error.
+                pass
+            else:
+                factor = DiscreteFactor(
+                    [self.target], [row.shape[0]], row.copy(),
+                    state_names=self.state_names
+                )
+                return factor if joint else {self.target: factor}
+
+        return super().query(
+            variables, evidence=evidence, virtual_evidence=virtual_evidence,
+            elimination_order=elimination_order, joint=joint, show_progress=show_progress
+        )
+
+
+class StarNetworkInference(LookupInference):
+    """
+    Exact inference for star networks: independent root priors feeding ``target``.
+
+    For any subset of observed parents, the marginal of ``target`` is its CPD
+    with the observed axes indexed and every unobserved axis contracted against
+    that parent's prior (one matrix-vector product per axis), so no elimination
+    order or intermediate factors are built. Fully observed parents still use the
+    lookup table, and any other query goes through ``VariableElimination``.
+    """
+
+    def __init__(self, model, target):
+        super().__init__(model, target)
+        # (target, parents...) in CPD evidence order
+        self.cpd_values = np.asarray(model.get_cpds(target).values, dtype=float)
+        self.priors = [np.asarray(model.get_cpds(var).values, dtype=float) for var in self.evidence_vars]
+        self.axes = {var: axis for axis, var in enumerate(self.evidence_vars, start=1)}
+
+    @staticmethod
+    def is_star(model, target):
+        """Whether every other node of ``model`` is a root parent of ``target``."""
+        parents = set(model.get_parents(target))
+        return (set(model.nodes()) == parents | {target}
+                and all(not model.get_parents(parent) for parent in parents))
+
+    def marginal(self, evidence, keep=()):
+        """
+        Return the normalized posterior of ``target`` given some of its parents.
+
+        Parents listed in ``keep`` are neither observed nor summed out: the result
+        has shape ``(target states, *states of each kept parent)`` and holds the
+        posterior for every combination of their states at once.
+        """
+        index = [slice(None)] * self.cpd_values.ndim
+        for var, state in evidence.items():
+            index[self.axes[var]] = self.ordinals[var][state]
+        values = self.cpd_values[tuple(index)]
+        remaining = [var for var in self.evidence_vars if var not in evidence]
+        if keep:
+            # Bring the kept axes right after the target so the rest can be contracted from the end
+            values = np.moveaxis(values, [remaining.index(var) + 1 for var in keep], range(1, len(keep) + 1))
+            remaining = [var for var in remaining if var not in keep]
+
+        # Contract the unobserved axes from the last one back, one matrix-vector product each
+        shape = values.shape[:len(keep) + 1]
+        for var in reversed(remaining):
+            prior = self.priors[self.axes[var] - 1]
+            values = values.reshape(-1, prior.shape[0]) @ prior
+        values = values.reshape(shape)
+        return values / values.sum(axis=0, keepdims=True)
+
+    def query(self, variables, evidence=None, virtual_evidence=None, elimination_order="greedy",
+              joint=True, show_progress=True):
+        evidence = evidence or {}
+        if (virtual_evidence is None and list(variables) == [self.target]
+                and len(evidence) < len(self.evidence_vars) and evidence.keys() <= self.axes.keys()):
+            try:
+                values = self.marginal(evidence)
+            except KeyError:
+                # Unknown state: let pgmpy raise its usual error.
+                pass
+            else:
+                factor = DiscreteFactor(
+                    [self.target], [values.shape[0]], values,
+                    state_names=self.state_names
+                )
+                return factor if joint else {self.target: factor}
+
+        return super().query(
+            variables, evidence=evidence, virtual_evidence=virtual_evidence,
+            elimination_order=elimination_order, joint=joint, show_progress=show_progress
+        )
+
+
 class BaseBayesianNetwork(ABC):
     """
     Base class for sport-specific Bayesian networks.
     All sport implementations should inherit from this.
     """
-    def __init__(self):
-        """Initialize the Bayesian network."""
-        self.model = self.create_network()
-        self.inference = VariableElimination(self.model)
+
+    # Child node whose posterior is precomputed for full-evidence queries.
+    target_variable = None
+
+    def __init__(self, artifact_dir=None):
+        """
+        Initialize the Bayesian network.
+
+        With ``artifact_dir`` the validated network is loaded from its artifact
+        when one matches, and saved there after being built otherwise.
+        """
+        self.artifact_dir = artifact_dir
+        self.model = self.load_network()
+        # Bumped whenever the CPDs change, so memoized results can be dropped
+        self.revision = 0
+        self.inference = self.create_inference()
+        self._prefix_tables = {}
+
+    def load_network(self):
+        """Return the model from its artifact, or build (and validate) it and save the artifact."""
+        if not self.artifact_dir:
+            return self.create_network()
+        store = NetworkArtifactStore(self.artifact_dir)
+        model = store.load(type(self))
+        if model is None:
+            model = self.create_network()
+            store.save(type(self), model)
+        return model
+
+    def create_inference(self):
+        """Build the inference engine for the current CPDs."""
+        if self.target_variable:
+            if StarNetworkInference.is_star(self.model, self.target_variable):
+                return StarNetworkInference(self.model, self.target_variable)
+            return LookupInference(self.model, self.target_variable)
+        return VariableElimination(self.model)
+
+    def update_cpds(self, *cpds):
+        """Replace the CPDs of the given variables and rebuild the inference engine."""
+        for cpd in cpds:
+            old = self.model.get_cpds(cpd.variable)
+            if old is not None:
+                self.model.remove_cpds(old)
+        self.model.add_cpds(*cpds)
+        self.inference = self.create_inference()
+        self._prefix_tables = {}
+        self.revision += 1
+
+    def prefix_tables(self, order):
+        """
+        Return ``P(target_variable | first k parents of order)`` for every k.
+
+        Table ``k`` has one axis per answered parent (state ordinals, in ``order``)
+        followed by an axis over the target states. The parents must be root
+        nodes, so each unanswered parent is summed out against its prior, from
+        the last question back to the first. Tables are built once per order.
+        """
+        order = tuple(order)
+        tables = self._prefix_tables.get(order)
+        if tables is not None:
+            return tables
+
+        cpd = self.model.get_cpds(self.target_variable)
+        parents = list(cpd.variables[1:])
+        if sorted(order) != sorted(parents):
+            raise ValueError(f"Order must list every parent of '{self.target_variable}' once")
+
+        # (parents in question order..., target)
+        table = np.moveaxis(np.array(cpd.values, dtype=float), 0, -1)
+        table = table.transpose([parents.index(var) for var in order] + [len(parents)])
+        tables = [None] * (len(order) + 1)
+        tables[-1] = table
+        for k in range(len(order) - 1, -1, -1):
+            prior = self.model.get_cpds(order[k])
+            if len(prior.variables) != 1:
+                raise ValueError(f"'{order[k]}' is not a root node")
+            tables[k] = np.tensordot(tables[k + 1], prior.values, axes=([k], [0]))
+
+        for table in tables:
+            table /= table.sum(axis=-1, keepdims=True)
+            table.flags.writeable = False
+        tables = tuple(tables)
+        self._prefix_tables[order] = tables
+        return tables
+
+    def prefix_posterior(self, order, evidence):
+        """
+        Return the posterior of ``target_variable`` given the answered prefix of ``order``.
+
+        ``evidence`` must answer exactly the first ``len(evidence)`` parents of
+        ``order``. The result maps each target state to its probability.
+        """
+        answered = tuple(order[:len(evidence)])
+        if set(answered) != set(evidence):
+            raise ValueError("Evidence is not a prefix of the question order")
+
+        cpd = self.model.get_cpds(self.target_variable)
+        index = tuple(cpd.state_names[var].index(evidence[var]) for var in answered)
+        row = self.prefix_tables(order)[len(answered)][index]
+        return dict(zip(cpd.state_names[self.target_variable], row.tolist()))
+
+    def sensitivity(self, evidence, factors):
+        """
+        Return the posterior of ``target_variable`` for every state combination of ``factors``.
+
+        The other parents are fixed by ``evidence`` (a partial dict of parent
+        states) or summed out against their priors. The result has one axis per
+        factor, in the given order, followed by one axis over the target states.
+        Requires a star network.
+        """
+        inference = self.inference
+        if not isinstance(inference, StarNetworkInference):
+            raise ValueError("Sensitivity sweeps need a star-shaped network")
+        factors = list(factors)
+        if len(set(factors)) != len(factors):
+            raise ValueError("Factors must not repeat")
+        invalid = [var for var in factors if var not in inference.axes] + [
+            var for var, state in evidence.items() if state not in inference.ordinals.get(var, {})
+        ]
+        if invalid:
+            raise ValueError(f"Unknown parents or states: {', '.join(invalid)}")
+        fixed = {var: state for var, state in evidence.items() if var not in factors}
+        return np.moveaxis(inference.marginal(fixed, keep=factors), 0, -1)
+
+    def score_batch(self, evidence):
+        """
+        Return the posterior of ``target_variable`` for many fully observed rows at once.
+
+        ``evidence`` maps every parent to an equally long sequence of state names.
+        The result has one row per input row and one column per target state;
+        rows containing an unknown state are filled with NaN.
+        """
+        inference = self.inference
+        codes = np.column_stack([inference.encode(var, evidence[var]) for var in inference.evidence_vars])
+        valid = (codes >= 0).all(axis=1)
+        posteriors = np.full((codes.shape[0], inference.table.shape[1]), np.nan)
+        posteriors[valid] = inference.batch_query(codes[valid])
+        return posteriors
 
     @abstractmethod
     def create_network(self):
         """Create and return the Bayesian network for this sport."""
-        pass
\ No newline at end of file
+        pass
+
+    @staticmethod
+    def additive_table(weights, start=0.0):
+        """
+        Sum one contribution vector per parent over every parent combination.
+
+        ``weights`` maps each parent to its per-state contributions, in CPD
+        evidence order. The vectors are added one axis at a time, in the same
+        order a nested loop would add them, and the result is flattened in
+        ``itertools.product`` order (one entry per CPD column).
+        """
+        vectors = [np.asarray(list(states.values()), dtype=float) for states in weights.values()]
+        table = np.asarray(start, dtype=float)
+        for axis, vector in enumerate(vectors):
+            shape = [1] * len(vectors)
+            shape[axis] = -1
+            table = table + vector.reshape(shape)
+        return table.ravel()
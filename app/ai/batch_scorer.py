@@ -0,0 +1,112 @@
+import numpy as np
+from app.ai.registry import network_registry
+
+
+class BatchScorer:
+    """
+    Vectorized scoring of fully specified matches for one sport.
+
+    Every match is a dict with one answer per network parent, either in the
+    Spanish wording used by the bot or as the canonical network state. All
+    rows are translated column by column and scored with a single gather
+    into the CPD lookup table, without touching the expert engines.
+    ``sweep`` answers what-if questions over the same translations.
+    """
+
+    _scorers = {}
+
+    def __init__(self, network, spanish_map, valid_states):
+        self.network = network
+        self.target = network.target_variable
+        self.keys = list(valid_states)
+        self.state_names = network.inference.state_names[self.target]
+        # Accept both the Spanish answers and the canonical states
+        self.translations = {
+            key: {**{state: state for state in valid_states[key]}, **spanish_map.get(key, {})}
+            for key in self.keys
+        }
+
+    @classmethod
+    def for_sport(cls, sport):
+        """Return the shared scorer for ``sport``."""
+        sport = sport.lower()
+        if sport not in cls._scorers:
+            if sport == "soccer":
+                from app.ai.models.expert_systems.soccer_expert import SPANISH_MAP, VALID_STATES
+            elif sport == "basketball":
+                from app.ai.models.expert_systems.basketball_expert import SPANISH_MAP, VALID_STATES
+            else:
+                raise ValueError(f"Sport '{sport}' not supported")
+            cls._scorers[sport] = cls(network_registry.get(sport), SPANISH_MAP, VALID_STATES)
+        return cls._scorers[sport]
+
+    def translate(self, key, values):
+        """Translate a column of raw answers to network states ('' when invalid, e.g. not a string)."""
+        values = [value if isinstance(value, str) else "" for value in values]
+        uniques, inverse = np.unique(np.asarray(values, dtype=str), return_inverse=True)
+        translation = self.translations[key]
+        translated = np.array(
+            [translation.get(value.strip().lower(), "") for value in uniques.tolist()], dtype=object
+        )
+        return translated[inverse]
+
+    def score(self, matches):
+        """
+        Score a list of match dicts.
+
+        Returns one dict per match: ``label`` and ``safe_probability`` for valid
+        rows, or ``error`` naming the missing or invalid facts.
+        """
+        rows = [match if isinstance(match, dict) else {} for match in matches]
+        columns = {
+            key: self.translate(key, [row.get(key, "") for row in rows])
+            for key in self.keys
+        }
+        invalid = np.column_stack([columns[key] == "" for key in self.keys]) if rows else np.zeros((0, 0), bool)
+
+        posteriors = self.network.score_batch(columns)
+        labels = np.asarray(self.state_names, dtype=object)[np.nan_to_num(posteriors).argmax(axis=1)]
+        safe = np.round(posteriors[:, self.state_names.index("safe")], 4)
+
+        results = []
+        for i, label in enumerate(labels.tolist()):
+            if invalid[i].any():
+                bad_keys = [key for key, bad in zip(self.keys, invalid[i]) if bad]
+                results.append({"error": f"Valores faltantes o no válidos: {', '.join(bad_keys)}"})
+            else:
+                results.append({"label": label, "safe_probability": float(safe[i])})
+        return results
+
+    def sweep(self, evidence, factors):
+        """
+        Return the safe probability for every state combination of ``factors``.
+
+        ``evidence`` holds the answers kept fixed (Spanish or canonical); any
+        other fact is summed out against its prior. ``safe_probability`` is a
+        nested list with one level per factor, indexed like ``states``, and
+        ``baseline`` is the safe probability given ``evidence`` alone.
+        Raises ``ValueError`` naming the unknown or invalid facts.
+        """
+        factors = list(factors)
+        if not factors or len(set(factors)) != len(factors):
+            raise ValueError("Se espera una lista de factores sin repetir")
+        invalid = [key for key in factors if key not in self.translations]
+        fixed = {}
+        for key, value in evidence.items():
+            state = self.translations.get(key, {}).get(value.strip().lower()) if isinstance(value, str) else None
+            if state is None:
+                invalid.append(key)
+            fixed[key] = state
+        if invalid:
+            raise ValueError(f"Valores faltantes o no válidos: {', '.join(invalid)}")
+
+        safe_index = self.state_names.index("safe")
+        grid = self.network.sensitivity(fixed, factors)[..., safe_index]
+        baseline = self.network.sensitivity(fixed, [])[safe_index]
+        ordinals = self.network.inference.ordinals
+        return {
+            "factors": factors,
+            "states": {key: list(ordinals[key]) for key in factors},
+            "safe_probability": np.round(grid, 4).tolist(),
+            "baseline": round(float(baseline), 4)
+        }
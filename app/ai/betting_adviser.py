@@ -1,3 +1,45 @@
+import threading
+from collections import deque
+from contextlib import contextmanager
+from app.ai.registry import network_registry
+
+
+class ExpertPool:
+    """
+    Pool of expert engines for a single sport.
+
+    Expert engines keep per-conversation state (facts, agenda, collected data),
+    so each advice call checks out its own engine and returns it afterwards.
+    Engines are created on demand when the pool is empty; all of them share
+    the sport's Bayesian network from the registry.
+    """
+
+    def __init__(self, factory, max_idle=16):
+        self._factory = factory
+        self._idle = deque()
+        self.max_idle = max_idle
+
+    def checkin(self, expert):
+        """Return an engine to the pool, dropping it if the pool is full."""
+        if len(self._idle) < self.max_idle:
+            self._idle.append(expert)
+
+    @contextmanager
+    def checkout(self):
+        """Borrow an engine for the duration of a ``with`` block."""
+        try:
+            expert = self._idle.pop()
+        except IndexError:
+            expert = self._factory()
+        try:
+            yield expert
+        finally:
+            self.checkin(expert)
+
+    def __len__(self):
+        return len(self._idle)
+
+
 class BettingAdviser:
     """
     Betting adviser class to provide betting recommendations based on user input.
@@ -6,20 +48,27 @@ class BettingAdviser:
     """
     
     _instances = {}
+    _instances_lock = threading.Lock()
 
     def __new__(cls, sport):
         sport_key = sport.lower()
         if sport_key not in cls._instances:
-            cls._instances[sport_key] = super(BettingAdviser, cls).__new__(cls)
-            cls._instances[sport_key].initialize(sport_key)
+            with cls._instances_lock:
+                if sport_key not in cls._instances:
+                    instance = super(BettingAdviser, cls).__new__(cls)
+                    instance.initialize(sport_key)
+                    cls._instances[sport_key] = instance
         return cls._instances[sport_key]
 
     def initialize(self, sport):
         self.sport = sport
-        self.expert = SportFactory.create_expert_system(sport)
+        self.experts = ExpertPool(lambda: SportFactory.create_expert_system(sport))
+        # Build the first engine eagerly so unsupported sports fail here
+        self.experts.checkin(SportFactory.create_expert_system(sport))
     
     def get_betting_advice(self, facts):
-        response = self.expert.get_next_question(facts)
+        with self.experts.checkout() as expert:
+            response = expert.get_next_question(facts)
 
         if response is None:
             return {
@@ -43,11 +92,14 @@ class BettingAdviser:
             }
 
         if "question" in response:
-            return {
+            advice = {
                 "message": response["question"],
                 "is_final": False,
                 "next_fact": response["next_fact"]
             }
+            if "safe_probability" in response:
+                advice["safe_probability"] = response["safe_probability"]
+            return advice
 
         return {
             "message": "No hay recomendaciones disponibles.",
@@ -67,13 +119,11 @@ class SportFactory:
         
         if sport == "soccer":
             from app.ai.models.expert_systems.soccer_expert import SoccerExpert
-            from app.ai.models.bayesian.soccer_bayesian_net import SoccerBayesianNetwork
-            return SoccerExpert(SoccerBayesianNetwork())
+            return SoccerExpert(network_registry.get(sport))
         
         elif sport == "basketball":
             from app.ai.models.expert_systems.basketball_expert import BasketballExpert
-            from app.ai.models.bayesian.basketball_bayesian_net import BasketballBayesianNetwork
-            return BasketballExpert(BasketballBayesianNetwork())
+            return BasketballExpert(network_registry.get(sport))
         
         else:
-            raise ValueError(f"Sport '{sport}' not supported")
+            raise ValueError(f"Sport '{sport}' not supported")
\ No newline at end of file
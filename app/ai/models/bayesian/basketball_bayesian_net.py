@@ -1,8 +1,23 @@
+import numpy as np
 from pgmpy.models import BayesianNetwork
 from pgmpy.factors.discrete import TabularCPD
 from app.ai.base_models import BaseBayesianNetwork
 
 class BasketballBayesianNetwork(BaseBayesianNetwork):
+    target_variable = 'bet_risk'
+
+    # Contribution of each parent state to the safety of the bet, in CPD evidence order.
+    SAFE_WEIGHTS = {
+        'team_form': {'good': 0.1, 'average': 0.0, 'poor': -0.1},
+        'player_injuries': {'none': 0.05, 'minor': 0.0, 'major': -0.05},
+        'home_advantage': {'yes': 0.05, 'no': -0.05},
+        'betting_odds': {'low': 0.05, 'medium': 0.0, 'high': -0.05},
+        'rest_days': {'0-1': -0.05, '2-3': 0.0, '4+': 0.05},
+        'opponent_strength': {'strong': -0.1, 'average': 0.0, 'weak': 0.1},
+        'recent_head_to_head': {'win': 0.05, 'draw': 0.0, 'loss': -0.05},
+        'match_importance': {'high': 0.05, 'medium': 0.0, 'low': -0.05}
+    }
+
     def create_network(self):
         model = BayesianNetwork([
             ('team_form', 'bet_risk'),
@@ -39,44 +54,8 @@ class BasketballBayesianNetwork(BaseBayesianNetwork):
         cpd_match_importance = TabularCPD('match_importance', 3, [[0.3], [0.4], [0.3]],
             state_names={'match_importance': ['high', 'medium', 'low']})
 
-        from itertools import product
-        safe_probs = []
-        risky_probs = []
-
-        for tf, inj, home, odds, rest, opp, h2h, imp in product(
-            range(3), range(3), range(2), range(3), range(3), range(3), range(3), range(3)
-        ):
-            safe = 0.5
-
-            if tf == 0: safe += 0.1
-            elif tf == 2: safe -= 0.1
-
-            if inj == 0: safe += 0.05
-            elif inj == 2: safe -= 0.05
-
-            if home == 0: safe += 0.05
-            else: safe -= 0.05
-
-            if odds == 0: safe += 0.05
-            elif odds == 2: safe -= 0.05
-
-            if rest == 2: safe += 0.05
-            elif rest == 0: safe -= 0.05
-
-            if opp == 0: safe -= 0.1
-            elif opp == 2: safe += 0.1
-
-            if h2h == 0: safe += 0.05
-            elif h2h == 2: safe -= 0.05
-
-            if imp == 0: safe += 0.05
-            elif imp == 2: safe -= 0.05
-
-            safe = round(max(min(safe, 0.99), 0.01), 3)
-            risky = round(1 - safe, 3)
-
-            safe_probs.append(safe)
-            risky_probs.append(risky)
+        safe_probs = np.round(np.clip(self.additive_table(self.SAFE_WEIGHTS, start=0.5), 0.01, 0.99), 3)
+        risky_probs = np.round(1 - safe_probs, 3)
 
         cpd_bet_risk = TabularCPD(
             variable='bet_risk',
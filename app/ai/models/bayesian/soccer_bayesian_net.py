@@ -1,3 +1,4 @@
+import numpy as np
 from pgmpy.models import BayesianNetwork
 from pgmpy.factors.discrete import TabularCPD
 from app.ai.base_models import BaseBayesianNetwork
@@ -6,6 +7,22 @@ class SoccerBayesianNetwork(BaseBayesianNetwork):
     """
     Enhanced Bayesian network for football betting with additional real-world variables.
     """
+    target_variable = 'risk'
+
+    # Contribution of each parent state to the risk of the bet, in CPD evidence order.
+    RISK_WEIGHTS = {
+        'home_advantage': {'home': -0.1, 'away': 0.15},
+        'injuries': {'no': -0.05, 'yes': 0.25},
+        'performance': {'low': 0.25, 'medium': 0.0, 'high': -0.05},
+        'weather': {'no': -0.05, 'yes': 0.2},
+        'rivalry': {'no': -0.05, 'yes': 0.1},
+        'league_position': {'high': -0.1, 'medium': 0.0, 'low': 0.05},
+        'recent_streak': {'winning': -0.1, 'neutral': 0.0, 'losing': 0.1},
+        'match_importance': {'high': -0.05, 'medium': 0.0, 'low': 0.05},
+        'physical_condition': {'rested': -0.1, 'normal': 0.0, 'fatigued': 0.1},
+        'head_to_head': {'home_advantage': -0.05, 'balanced': 0.0, 'away_advantage': 0.05}
+    }
+
     def create_network(self):
         model = BayesianNetwork([
             ('home_advantage', 'risk'),
@@ -90,45 +107,9 @@ class SoccerBayesianNetwork(BaseBayesianNetwork):
             state_names={'head_to_head': ['home_advantage', 'balanced', 'away_advantage']}
         )
 
-      
-        safe = []
-        risky = []
-
-        from itertools import product
-        for home_advantage, injury, performance, weather, rivalry, league_position, recent_streak, match_importance, physical_condition, head_to_head in product(
-            ['home', 'away'],
-            ['no', 'yes'],
-            ['low', 'medium', 'high'],
-            ['no', 'yes'],
-            ['no', 'yes'],
-            ['high', 'medium', 'low'],
-            ['winning', 'neutral', 'losing'],
-            ['high', 'medium', 'low'],
-            ['rested', 'normal', 'fatigued'],
-            ['home_advantage', 'balanced', 'away_advantage']
-        ):
-            risk = 0.0
-
-            
-            risk += 0.15 if home_advantage == 'away' else -0.1
-            risk += 0.25 if injury == 'yes' else -0.05
-            risk += 0.25 if performance == 'low' else (-0.05 if performance == 'high' else 0.0)
-            risk += 0.2 if weather == 'yes' else -0.05
-            risk += 0.1 if rivalry == 'yes' else -0.05
-
-            
-            risk += -0.1 if league_position == 'high' else (0.05 if league_position == 'low' else 0.0)
-            risk += -0.1 if recent_streak == 'winning' else (0.1 if recent_streak == 'losing' else 0.0)
-            risk += -0.05 if match_importance == 'high' else (0.05 if match_importance == 'low' else 0.0)
-            risk += -0.1 if physical_condition == 'rested' else (0.1 if physical_condition == 'fatigued' else 0.0)
-            risk += -0.05 if head_to_head == 'home_advantage' else (0.05 if head_to_head == 'away_advantage' else 0.0)
-
-            risk = min(max(0.05 + risk, 0.01), 0.99)
-            safe_prob = round(1 - risk, 3)
-            risky_prob = round(risk, 3)
-
-            safe.append(safe_prob)
-            risky.append(risky_prob)
+        risk = np.clip(0.05 + self.additive_table(self.RISK_WEIGHTS), 0.01, 0.99)
+        safe = np.round(1 - risk, 3)
+        risky = np.round(risk, 3)
 
         cpd_risk = TabularCPD(
             variable='risk', variable_card=2,
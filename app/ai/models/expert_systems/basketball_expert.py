@@ -28,6 +28,10 @@ VALID_STATES = {
 }
 
 class BasketballExpert(BaseExpert):
+    fact_class = BasketballFact
+    valid_states = VALID_STATES
+    target = "bet_risk"
+
     def __init__(self, bayes_net: BasketballBayesianNetwork):
         super().__init__()
         self.bayes_net = bayes_net
@@ -38,14 +42,16 @@ class BasketballExpert(BaseExpert):
         return "Basketball"
 
     def get_next_question(self, facts, fact_cls=BasketballFact):
-        self.reset()
         self.collected_data = {}
 
         if not facts:
+            if self.use_question_plan:
+                return self.answer_from_plan([])
+            self.reset()
             self.run()
             for fact in self.facts.values():
                 if "question" in fact:
-                    return {"question": fact["question"], "next_fact": fact["next_fact"]}
+                    return self.with_estimate({"question": fact["question"], "next_fact": fact["next_fact"]}, [])
 
         current_fact = facts[-1] if facts else {}
         translated = {}
@@ -68,19 +74,29 @@ class BasketballExpert(BaseExpert):
                     "next_fact": k
                 }
 
+        previous_facts = [
+            {k: SPANISH_MAP.get(k, {}).get(v.strip().lower(), v.strip().lower()) for k, v in previous_fact.items()}
+            for previous_fact in facts[:-1]
+        ]
+
+        if self.use_question_plan and fact_cls is self.fact_class:
+            response = self.answer_from_plan(previous_facts + [translated])
+            if response is not None:
+                return response
+
+        self.reset()
         self.declare(fact_cls(**translated))
 
-        for previous_fact in facts[:-1]:
-            self.declare(fact_cls(**{
-                k: SPANISH_MAP.get(k, {}).get(v.strip().lower(), v.strip().lower())
-                for k, v in previous_fact.items()
-            }))
+        for previous_fact in previous_facts:
+            self.declare(fact_cls(**previous_fact))
 
         self.run()
 
         for fact in self.facts.values():
             if "question" in fact:
-                return {"question": fact["question"], "next_fact": fact["next_fact"]}
+                return self.with_estimate(
+                    {"question": fact["question"], "next_fact": fact["next_fact"]}, previous_facts + [translated]
+                )
             if "result" in fact:
                 return {"result": fact["result"]}
 
@@ -160,7 +176,7 @@ class BasketballExpert(BaseExpert):
         BasketballFact(match_importance=MATCH.importance)
     )
     def give_final_recommendation(self, form, injuries, home, odds, rest, opp, h2h, importance):
-        self.collected_data.update({
+        self.declare(Fact(result=self.final_recommendation({
             "team_form": form,
             "player_injuries": injuries,
             "home_advantage": home,
@@ -169,16 +185,18 @@ class BasketballExpert(BaseExpert):
             "opponent_strength": opp,
             "recent_head_to_head": h2h,
             "match_importance": importance
-        })
-
-        prediction = self.bayes_net.inference.query(
-            variables=["bet_risk"],
-            evidence=self.collected_data
-        )
+        })))
+
+    def explain(self, evidence, label, prob_safe):
+        form = evidence["team_form"]
+        injuries = evidence["player_injuries"]
+        home = evidence["home_advantage"]
+        odds = evidence["betting_odds"]
+        rest = evidence["rest_days"]
+        opp = evidence["opponent_strength"]
+        h2h = evidence["recent_head_to_head"]
+        importance = evidence["match_importance"]
 
-        values = prediction.values
-        prob_safe = round(values[0] * 100, 2)
-        label = prediction.state_names["bet_risk"][values.argmax()]
         label_es = "segura" if label == "safe" else "arriesgada"
 
         factores = []
@@ -227,4 +245,4 @@ class BasketballExpert(BaseExpert):
             f"Esto se debe a:{formatted_causes}"
         )
 
-        self.declare(Fact(result=explanation))
+        return explanation
@@ -33,6 +33,10 @@ class SoccerFact(Fact):
     pass
 
 class SoccerExpert(BaseExpert):
+    fact_class = SoccerFact
+    valid_states = VALID_STATES
+    target = "risk"
+
     def __init__(self, bayes_net: SoccerBayesianNetwork):
         super().__init__()
         self.bayes_net = bayes_net
@@ -43,14 +47,16 @@ class SoccerExpert(BaseExpert):
         return "Soccer"
 
     def get_next_question(self, facts):
-        self.reset()
         self.collected_data = {}
 
         if not facts:
+            if self.use_question_plan:
+                return self.answer_from_plan([])
+            self.reset()
             self.run()
             for fact in self.facts.values():
                 if "question" in fact:
-                    return {"question": fact["question"], "next_fact": fact["next_fact"]}
+                    return self.with_estimate({"question": fact["question"], "next_fact": fact["next_fact"]}, [])
 
         current_fact = facts[-1] if facts else {}
         translated = {}
@@ -75,20 +81,30 @@ class SoccerExpert(BaseExpert):
                     "next_fact": k
                 }
 
+        previous_facts = [
+            {k: SPANISH_MAP.get(k, {}).get(v.strip().lower(), v.strip().lower()) for k, v in previous_fact.items()}
+            for previous_fact in facts[:-1]
+        ]
+
+        if self.use_question_plan:
+            response = self.answer_from_plan(previous_facts + [translated])
+            if response is not None:
+                return response
+
+        self.reset()
         self.declare(SoccerFact(**translated))
 
-        for previous_fact in facts[:-1]:
-            self.declare(SoccerFact(**{
-                k: SPANISH_MAP.get(k, {}).get(v.strip().lower(), v.strip().lower())
-                for k, v in previous_fact.items()
-            }))
+        for previous_fact in previous_facts:
+            self.declare(SoccerFact(**previous_fact))
 
         self.run()
 
         for fact in self.facts.values():
             if isinstance(fact, Fact):
                 if "question" in fact:
-                    return {"question": fact["question"], "next_fact": fact["next_fact"]}
+                    return self.with_estimate(
+                        {"question": fact["question"], "next_fact": fact["next_fact"]}, previous_facts + [translated]
+                    )
                 if "result" in fact:
                     return {"result": fact["result"]}
 
@@ -193,7 +209,7 @@ class SoccerExpert(BaseExpert):
           SoccerFact(injuries=MATCH.injuries),
           SoccerFact(home_advantage=MATCH.home_advantage))
     def give_final_recommendation(self, head_to_head, physical_condition, match_importance, recent_streak, league_position, rivalry, weather, performance, injuries, home_advantage):
-        self.collected_data.update({
+        self.declare(Fact(result=self.final_recommendation({
             "home_advantage": home_advantage,
             "injuries": injuries,
             "performance": performance,
@@ -204,21 +220,18 @@ class SoccerExpert(BaseExpert):
             "match_importance": match_importance,
             "physical_condition": physical_condition,
             "head_to_head": head_to_head
-        })
+        })))
+
+    def final_recommendation(self, evidence):
+        self.collected_data.update(evidence)
 
         for key, val in self.collected_data.items():
             if val not in VALID_STATES.get(key, []):
-                self.declare(Fact(result=f"Error: valor no válido '{val}' para '{key}'"))
-                return
+                return f"Error: valor no válido '{val}' para '{key}'"
 
-        prediction = self.bayes_net.inference.query(
-            variables=["risk"],
-            evidence=self.collected_data
-        )
+        return super().final_recommendation(evidence)
 
-        values = prediction.values
-        prob_safe = round(values[0] * 100, 2)
-        label = prediction.state_names["risk"][values.argmax()]
+    def explain(self, evidence, label, prob_safe):
         label_es = "segura" if label == "safe" else "arriesgada"
 
         explanation = (
@@ -226,4 +239,4 @@ class SoccerExpert(BaseExpert):
             f"Esto se debe a una combinación de factores: localía, lesiones, rendimiento, clima, rivalidad, posición en la tabla, racha, importancia del partido, condición física e historial directo."
         )
 
-        self.declare(Fact(result=explanation))
\ No newline at end of file
+        return explanation
@@ -0,0 +1,78 @@
+import gc
+import os
+import threading
+
+
+class NetworkRegistry:
+    """
+    Process-wide registry of read-only Bayesian networks, one per sport.
+
+    Networks are built once and shared by every expert engine in the process.
+    Calling ``preload()`` in the gunicorn master (``preload_app = True``)
+    builds them before the workers are forked, so the CPD buffers are shared
+    copy-on-write instead of being rebuilt in every worker. With
+    ``NETWORK_ARTIFACTS`` enabled, validated networks are cached on disk (see
+    ``NetworkArtifactStore``), by default under the app's instance folder, so
+    later processes map the stored CPDs and skip ``check_model()``.
+    """
+
+    SPORTS = ('soccer', 'basketball')
+
+    def __init__(self):
+        self._networks = {}
+        self._lock = threading.Lock()
+        self.artifact_dir = None
+
+    def init_app(self, app):
+        """Choose where validated network artifacts are kept (``None`` disables them)."""
+        if app.config.get("NETWORK_ARTIFACTS"):
+            self.artifact_dir = app.config.get("NETWORK_ARTIFACT_DIR") or os.path.join(
+                app.instance_path, "networks"
+            )
+        else:
+            self.artifact_dir = None
+
+    def _create(self, sport):
+        if sport == "soccer":
+            from app.ai.models.bayesian.soccer_bayesian_net import SoccerBayesianNetwork
+            return SoccerBayesianNetwork(artifact_dir=self.artifact_dir)
+
+        elif sport == "basketball":
+            from app.ai.models.bayesian.basketball_bayesian_net import BasketballBayesianNetwork
+            return BasketballBayesianNetwork(artifact_dir=self.artifact_dir)
+
+        else:
+            raise ValueError(f"Sport '{sport}' not supported")
+
+    @staticmethod
+    def _freeze(network):
+        """Mark every CPD buffer read-only so no worker dirties the shared pages."""
+        for cpd in network.model.get_cpds():
+            cpd.values.flags.writeable = False
+
+    def get(self, sport):
+        """Return the shared network for ``sport``, building it on first use."""
+        sport = sport.lower()
+        network = self._networks.get(sport)
+        if network is None:
+            with self._lock:
+                network = self._networks.get(sport)
+                if network is None:
+                    network = self._create(sport)
+                    self._freeze(network)
+                    self._networks[sport] = network
+        return network
+
+    def is_loaded(self, sport):
+        """Return whether the network for ``sport`` has already been built."""
+        return sport.lower() in self._networks
+
+    def preload(self, sports=None):
+        """Build every network up front, typically in the gunicorn master before fork."""
+        for sport in sports or self.SPORTS:
+            self.get(sport)
+        # Keep the garbage collector from touching (and copying) the preloaded objects.
+        gc.freeze()
+
+
+network_registry = NetworkRegistry()
@@ -1,114 +1,157 @@
-import kagglehub
+import argparse
 import sqlite3
+import numpy as np
 import pandas as pd
-from collections import Counter
 from pathlib import Path
 
-# Descargar el dataset
-path = kagglehub.dataset_download("wyattowalsh/basketball")
-db_path = Path(path) / "nba.sqlite"
-
-# Conectar a SQLite
-conn = sqlite3.connect(db_path)
-games = pd.read_sql_query("SELECT * FROM game", conn)
-inactive = pd.read_sql_query("SELECT * FROM inactive_players", conn)
-conn.close()
-
-games['game_date'] = pd.to_datetime(games['game_date'])
-games.sort_values(by='game_date', inplace=True)
-
-# Contadores por categoría
-form_counter = Counter()
-injury_counter = Counter()
-home_advantage_counter = Counter()
-rest_days_counter = Counter()
-opponent_strength_counter = Counter()
-head_to_head_counter = Counter()
-importance_counter = Counter()
-
-# team_form
-team_games = games.groupby('team_id_home')
-for _, group in team_games:
-    group = group.sort_values('game_date')
-    for idx in range(5, len(group)):
-        last5 = group.iloc[idx - 5:idx]
-        wins = (last5['wl_home'] == 'W').sum()
-        if wins >= 4:
-            form_counter.update(['good'])
-        elif wins >= 2:
-            form_counter.update(['average'])
-        else:
-            form_counter.update(['poor'])
-
-# player_injuries
-injuries_per_game = inactive.groupby('game_id').size()
-for count in injuries_per_game:
-    if count == 0:
-        injury_counter.update(['none'])
-    elif count <= 2:
-        injury_counter.update(['minor'])
-    else:
-        injury_counter.update(['major'])
-
-# home_advantage
-home_advantage_counter.update(['yes'] * len(games))
-
-# rest_days
-for _, group in team_games:
-    group = group.sort_values('game_date')
-    group['prev_date'] = group['game_date'].shift(1)
-    group = group.dropna()
-    group['rest_days'] = (group['game_date'] - group['prev_date']).dt.days
-    bins = pd.cut(group['rest_days'], [0, 1, 3, 100], labels=['0-1', '2-3', '4+'])
-    rest_days_counter.update(bins.astype(str))
-
-# opponent_strength
-win_rates = games.groupby('team_id_home')['wl_home'].apply(lambda x: (x == 'W').mean())
-for _, row in games.iterrows():
-    opp_rate = win_rates.get(row['team_id_away'], 0)
-    if opp_rate > 0.6:
-        opponent_strength_counter.update(['strong'])
-    elif opp_rate > 0.4:
-        opponent_strength_counter.update(['average'])
-    else:
-        opponent_strength_counter.update(['weak'])
-
-# recent_head_to_head
-matchups = games.groupby(['team_id_home', 'team_id_away'])
-for (_, _), group in matchups:
-    group = group.sort_values('game_date')
-    if len(group) > 1:
-        last = group.iloc[-2]
-        if last['wl_home'] == 'W':
-            head_to_head_counter.update(['win'])
-        else:
-            head_to_head_counter.update(['loss'])
-head_to_head_counter.update(['draw'])  # for completeness
-
-# match_importance (aproximado)
-importance_counter.update(['high'] * int(0.3 * len(games)))
-importance_counter.update(['medium'] * int(0.4 * len(games)))
-importance_counter.update(['low'] * (len(games) - sum(importance_counter.values())))
-
-# Exportar como CSV
-def format_probs(counter, var):
-    total = sum(counter.values())
-    return pd.DataFrame([{
+FORM_WINDOW = 5
+
+# Estados de cada variable, en el orden del CSV exportado
+STATES = {
+    'team_form': ['good', 'average', 'poor'],
+    'player_injuries': ['none', 'minor', 'major'],
+    'home_advantage': ['yes'],
+    'rest_days': ['0-1', '2-3', '4+', 'nan'],
+    'opponent_strength': ['strong', 'average', 'weak'],
+    'recent_head_to_head': ['win', 'draw', 'loss'],
+    'match_importance': ['high', 'medium', 'low']
+}
+
+GAMES_QUERY = "SELECT game_date, team_id_home, team_id_away, wl_home FROM game"
+
+INJURIES_QUERY = "SELECT COUNT(*) AS inactive FROM inactive_players GROUP BY game_id"
+
+# Partidos jugados como visitante por cada equipo, junto a su porcentaje de victorias como local
+OPPONENT_QUERY = """
+    SELECT g.team_id_away AS team_id, COUNT(*) AS games, COALESCE(r.win_rate, 0) AS win_rate
+    FROM game AS g
+    LEFT JOIN (
+        SELECT team_id_home, AVG(CASE WHEN wl_home = 'W' THEN 1.0 ELSE 0.0 END) AS win_rate
+        FROM game GROUP BY team_id_home
+    ) AS r ON r.team_id_home = g.team_id_away
+    GROUP BY g.team_id_away
+"""
+
+
+def load_games(conn):
+    """
+    Read only the columns the features need, sorted by team and date.
+
+    The rolling form, the rest days and the matchups all look across a team's
+    whole history, so every game is loaded at once; what bounds memory is the
+    projection to four narrow columns instead of ``SELECT *``.
+    """
+    games = pd.read_sql_query(GAMES_QUERY, conn)
+    games = pd.DataFrame({
+        'game_date': pd.to_datetime(games['game_date']),
+        'team_id_home': games['team_id_home'],
+        'team_id_away': games['team_id_away'],
+        'win': games['wl_home'] == 'W'
+    })
+    return games.sort_values(['team_id_home', 'game_date'], kind='mergesort').reset_index(drop=True)
+
+
+def _counts(values, variable):
+    """Count the states of ``variable`` in the order of ``STATES``."""
+    return pd.Series(values).value_counts().reindex(STATES[variable], fill_value=0)
+
+
+def team_form_counts(games):
+    """Home wins in each team's previous five home games: 4+ good, 2-3 average, else poor."""
+    by_team = games.groupby('team_id_home', sort=False)
+    wins = by_team['win'].rolling(FORM_WINDOW).sum().reset_index(level=0, drop=True)
+    previous = wins.groupby(games['team_id_home'], sort=False).shift(1).dropna()
+    form = pd.cut(previous, [-np.inf, 1, 3, np.inf], labels=['poor', 'average', 'good'])
+    return _counts(form, 'team_form')
+
+
+def injury_counts(conn):
+    """Inactive players per game: 0 none, 1-2 minor, 3+ major."""
+    inactive = pd.read_sql_query(INJURIES_QUERY, conn)['inactive']
+    injuries = pd.cut(inactive, [-np.inf, 0, 2, np.inf], labels=['none', 'minor', 'major'])
+    return _counts(injuries, 'player_injuries')
+
+
+def rest_day_counts(games):
+    """Days since each team's previous home game; gaps outside 1-100 days fall in 'nan'."""
+    rest = games.groupby('team_id_home', sort=False)['game_date'].diff().dt.days.dropna()
+    bins = pd.cut(rest, [0, 1, 3, 100], labels=['0-1', '2-3', '4+']).astype(str)
+    return _counts(bins, 'rest_days')
+
+
+def opponent_strength_counts(conn):
+    """Away opponents by their home win rate: above 60% strong, above 40% average, else weak."""
+    opponents = pd.read_sql_query(OPPONENT_QUERY, conn)
+    strength = pd.cut(opponents['win_rate'], [-np.inf, 0.4, 0.6, np.inf], labels=['weak', 'average', 'strong'])
+    counts = opponents.groupby(strength.astype(str))['games'].sum()
+    return counts.reindex(STATES['opponent_strength'], fill_value=0)
+
+
+def head_to_head_counts(games):
+    """Result of the second-to-last game of every home/away matchup played more than once."""
+    matchups = games.sort_values(['team_id_home', 'team_id_away', 'game_date'], kind='mergesort')
+    previous = matchups.groupby(['team_id_home', 'team_id_away'], sort=False).nth(-2)
+    counts = _counts(np.where(previous['win'], 'win', 'loss'), 'recent_head_to_head')
+    # Un empate por completitud, como en el cálculo original
+    counts['draw'] += 1
+    return counts
+
+
+def importance_counts(total):
+    """Approximate split of the games: 30% high, 40% medium, the rest low."""
+    high, medium = int(0.3 * total), int(0.4 * total)
+    return pd.Series({'high': high, 'medium': medium, 'low': total - high - medium})
+
+
+def compute_counts(conn):
+    """Return the state counts of every network variable."""
+    games = load_games(conn)
+    return {
+        'team_form': team_form_counts(games),
+        'player_injuries': injury_counts(conn),
+        'home_advantage': pd.Series({'yes': len(games)}),
+        'rest_days': rest_day_counts(games),
+        'opponent_strength': opponent_strength_counts(conn),
+        'recent_head_to_head': head_to_head_counts(games),
+        'match_importance': importance_counts(len(games))
+    }
+
+
+def format_probs(counts, var):
+    """Probability table of one variable, without the states that never occur."""
+    counts = counts[counts > 0]
+    return pd.DataFrame({
         "variable": var,
-        "state": state,
-        "probability": round(count / total, 4)
-    } for state, count in counter.items()])
-
-frames = [
-    format_probs(form_counter, "team_form"),
-    format_probs(injury_counter, "player_injuries"),
-    format_probs(home_advantage_counter, "home_advantage"),
-    format_probs(rest_days_counter, "rest_days"),
-    format_probs(opponent_strength_counter, "opponent_strength"),
-    format_probs(head_to_head_counter, "recent_head_to_head"),
-    format_probs(importance_counter, "match_importance")
-]
-
-final_df = pd.concat(frames, ignore_index=True)
-final_df.to_csv("basketball_probabilities_full.csv", index=False)
-print("✅ Probabilities saved to basketball_probabilities_full.csv")
+        "state": counts.index,
+        "probability": (counts / counts.sum()).round(4).to_numpy()
+    })
+
+
+def compute_probabilities(conn):
+    """Return the ``variable, state, probability`` table that feeds the network CPDs."""
+    frames = [format_probs(counts, var) for var, counts in compute_counts(conn).items()]
+    return pd.concat(frames, ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Probabilidades por estado para la red de baloncesto')
+    parser.add_argument('--db', help='Ruta a nba.sqlite (por defecto se descarga el dataset de Kaggle)')
+    parser.add_argument('--output', default='basketball_probabilities_full.csv')
+    args = parser.parse_args()
+
+    db_path = args.db
+    if db_path is None:
+        import kagglehub
+        db_path = Path(kagglehub.dataset_download("wyattowalsh/basketball")) / "nba.sqlite"
+
+    conn = sqlite3.connect(db_path)
+    try:
+        final_df = compute_probabilities(conn)
+    finally:
+        conn.close()
+    final_df.to_csv(args.output, index=False)
+    print(f"✅ Probabilities saved to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
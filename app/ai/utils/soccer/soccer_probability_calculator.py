@@ -1,167 +1,265 @@
+import argparse
+import json
+import os
 import pandas as pd
 import numpy as np
-from collections import defaultdict
-
-# Cargar datos y tomar muestra aleatoria
-data = pd.read_csv('results.csv')
-if len(data) > 2000:
-    data = data.sample(2000, random_state=42).reset_index(drop=True)
-
-data['date'] = pd.to_datetime(data['date'])
-
-# Precalcular partidos por equipo y por par de equipos
-team_matches = defaultdict(list)
-pair_matches = defaultdict(list)
-for idx, row in data.iterrows():
-    team_matches[row['home_team']].append((row['date'], idx))
-    team_matches[row['away_team']].append((row['date'], idx))
-    key1 = (row['home_team'], row['away_team'])
-    key2 = (row['away_team'], row['home_team'])
-    pair_matches[key1].append((row['date'], idx))
-    pair_matches[key2].append((row['date'], idx))
-
-# 1. Probabilidad de victoria según localía
-def get_result(row):
-    if row['home_score'] > row['away_score']:
-        return 'home_win'
-    elif row['home_score'] < row['away_score']:
-        return 'away_win'
-    else:
-        return 'draw'
-
-data['result'] = data.apply(get_result, axis=1)
-data['venue'] = data['neutral'].map({True: 'neutral', False: 'home', 1: 'neutral', 0: 'home', 'TRUE': 'neutral', 'FALSE': 'home'})
-data.loc[data['venue'].isna(), 'venue'] = 'home'
-
-venue_win_probs = []
-for venue in ['home', 'neutral']:
-    total = len(data[data['venue'] == venue])
-    wins = len(data[(data['venue'] == venue) & (data['result'] == 'home_win')])
-    prob = round(wins / total, 4) if total > 0 else 0
-    venue_win_probs.append({'factor': 'venue', 'state': venue, 'win_probability': prob})
-total_away = len(data[data['venue'] == 'home'])
-away_wins = len(data[(data['venue'] == 'home') & (data['result'] == 'away_win')])
-venue_win_probs.append({'factor': 'venue', 'state': 'away', 'win_probability': round(away_wins / total_away, 4) if total_away > 0 else 0})
-
-# 2. Probabilidad de victoria según racha reciente
-def get_streak(team, date):
-    partidos = sorted([d for d, idx in team_matches[team] if d < date], reverse=True)
-    if len(partidos) < 3:
-        return 'neutral'
-    idxs = [idx for d, idx in team_matches[team] if d in partidos[:3]]
-    prev = data.loc[idxs]
-    wins = 0
-    losses = 0
-    for _, row in prev.iterrows():
-        if row['home_team'] == team and row['home_score'] > row['away_score']:
-            wins += 1
-        elif row['away_team'] == team and row['away_score'] > row['home_score']:
-            wins += 1
-        elif row['home_team'] == team and row['home_score'] < row['away_score']:
-            losses += 1
-        elif row['away_team'] == team and row['away_score'] < row['home_score']:
-            losses += 1
-    if wins >= 2:
-        return 'good'
-    elif losses >= 2:
-        return 'bad'
-    else:
-        return 'neutral'
-
-data['home_streak'] = data.apply(lambda row: get_streak(row['home_team'], row['date']), axis=1)
-data['away_streak'] = data.apply(lambda row: get_streak(row['away_team'], row['date']), axis=1)
-
-streak_win_probs = []
-for streak in ['good', 'neutral', 'bad']:
-    total = len(data[data['home_streak'] == streak])
-    wins = len(data[(data['home_streak'] == streak) & (data['result'] == 'home_win')])
-    prob = round(wins / total, 4) if total > 0 else 0
-    streak_win_probs.append({'factor': 'home_streak', 'state': streak, 'win_probability': prob})
-    total = len(data[data['away_streak'] == streak])
-    wins = len(data[(data['away_streak'] == streak) & (data['result'] == 'away_win')])
-    prob = round(wins / total, 4) if total > 0 else 0
-    streak_win_probs.append({'factor': 'away_streak', 'state': streak, 'win_probability': prob})
-
-# 3. Probabilidad de victoria según importancia del partido
-data['importance'] = data['tournament'].apply(lambda x: 'low' if str(x).lower() == 'friendly' else 'high')
-importance_win_probs = []
-for imp in ['low', 'high']:
-    total = len(data[data['importance'] == imp])
-    wins = len(data[(data['importance'] == imp) & (data['result'] == 'home_win')])
-    prob = round(wins / total, 4) if total > 0 else 0
-    importance_win_probs.append({'factor': 'importance', 'state': imp, 'win_probability': prob})
-
-# 4. Historial directo (head-to-head)
-def get_h2h_win_rate(row, n=5):
-    key = (row['home_team'], row['away_team'])
-    partidos = sorted([d for d, idx in pair_matches[key] if d < row['date']], reverse=True)
-    if len(partidos) == 0:
-        return None
-    idxs = [idx for d, idx in pair_matches[key] if d in partidos[:n]]
-    prev = data.loc[idxs]
-    wins = 0
-    total = 0
-    for _, match in prev.iterrows():
-        if match['home_team'] == row['home_team'] and match['result'] == 'home_win':
-            wins += 1
-        elif match['away_team'] == row['home_team'] and match['result'] == 'away_win':
-            wins += 1
-        total += 1
-    return wins / total if total > 0 else None
-
-data['h2h_win_rate'] = data.apply(get_h2h_win_rate, axis=1)
-
-def h2h_group(val):
-    if pd.isna(val):
-        return 'no_data'
-    elif val >= 0.6:
-        return 'alta'
-    elif val >= 0.3:
-        return 'media'
-    else:
-        return 'baja'
-
-data['h2h_group'] = data['h2h_win_rate'].apply(h2h_group)
-h2h_win_probs = []
-for group in ['alta', 'media', 'baja', 'no_data']:
-    total = len(data[data['h2h_group'] == group])
-    wins = len(data[(data['h2h_group'] == group) & (data['result'] == 'home_win')])
-    prob = round(wins / total, 4) if total > 0 else 0
-    h2h_win_probs.append({'factor': 'h2h_group', 'state': group, 'win_probability': prob})
-
-# 5. Fatiga (días de descanso)
-def get_last_match_date(team, current_date):
-    partidos = sorted([d for d, idx in team_matches[team] if d < current_date], reverse=True)
-    if not partidos:
-        return None
-    return partidos[0]
-
-def get_days_rest(row):
-    last_date = get_last_match_date(row['home_team'], row['date'])
-    if pd.isna(last_date) or last_date is None:
-        return None
-    return (row['date'] - last_date).days
-
-data['home_days_rest'] = data.apply(get_days_rest, axis=1)
-
-def rest_group(val):
-    if pd.isna(val):
-        return 'no_data'
-    elif val < 4:
-        return 'menos_4'
-    else:
-        return 'cuatro_o_mas'
-
-data['rest_group'] = data['home_days_rest'].apply(rest_group)
-rest_win_probs = []
-for group in ['menos_4', 'cuatro_o_mas', 'no_data']:
-    total = len(data[data['rest_group'] == group])
-    wins = len(data[(data['rest_group'] == group) & (data['result'] == 'home_win')])
-    prob = round(wins / total, 4) if total > 0 else 0
-    rest_win_probs.append({'factor': 'rest_group', 'state': group, 'win_probability': prob})
-
-# Exportar a CSV
-final = venue_win_probs + streak_win_probs + importance_win_probs + h2h_win_probs + rest_win_probs
-df_final = pd.DataFrame(final)
-df_final.to_csv('soccer_win_probabilities.csv', index=False)
-print("✅ Probabilidades exportadas a soccer_win_probabilities.csv (muestra rápida)")
\ No newline at end of file
+
+MATCH_COLUMNS = ['date', 'home_team', 'away_team', 'home_score', 'away_score', 'tournament', 'neutral']
+
+STREAK_WINDOW = 3
+H2H_WINDOW = 5
+
+# (factor, estado, columna, valor, resultado que cuenta como victoria), en el orden del CSV exportado
+PROBABILITY_ROWS = [
+    ('venue', 'home', 'venue', 'home', 'home_win'),
+    ('venue', 'neutral', 'venue', 'neutral', 'home_win'),
+    ('venue', 'away', 'venue', 'home', 'away_win'),
+    ('home_streak', 'good', 'home_streak', 'good', 'home_win'),
+    ('away_streak', 'good', 'away_streak', 'good', 'away_win'),
+    ('home_streak', 'neutral', 'home_streak', 'neutral', 'home_win'),
+    ('away_streak', 'neutral', 'away_streak', 'neutral', 'away_win'),
+    ('home_streak', 'bad', 'home_streak', 'bad', 'home_win'),
+    ('away_streak', 'bad', 'away_streak', 'bad', 'away_win'),
+    ('importance', 'low', 'importance', 'low', 'home_win'),
+    ('importance', 'high', 'importance', 'high', 'home_win'),
+    ('h2h_group', 'alta', 'h2h_group', 'alta', 'home_win'),
+    ('h2h_group', 'media', 'h2h_group', 'media', 'home_win'),
+    ('h2h_group', 'baja', 'h2h_group', 'baja', 'home_win'),
+    ('h2h_group', 'no_data', 'h2h_group', 'no_data', 'home_win'),
+    ('rest_group', 'menos_4', 'rest_group', 'menos_4', 'home_win'),
+    ('rest_group', 'cuatro_o_mas', 'rest_group', 'cuatro_o_mas', 'home_win'),
+    ('rest_group', 'no_data', 'rest_group', 'no_data', 'home_win'),
+]
+
+
+def load_matches(path):
+    """Read the results CSV keeping only the columns the calculator uses."""
+    data = pd.read_csv(path, usecols=MATCH_COLUMNS, parse_dates=['date'])
+    return data
+
+
+def _previous_sum(values, groups, window):
+    """Sum of the previous ``window`` values inside each group (the current row excluded)."""
+    totals = values.astype(np.int64).groupby(groups, sort=False).cumsum()
+    by_group = totals.groupby(groups, sort=False)
+    return by_group.shift(1, fill_value=0) - by_group.shift(window + 1, fill_value=0)
+
+
+def _first_of_day(frame, keys, columns):
+    """
+    Give every row the values of the first row of its (group, date), so matches
+    played the same day do not see each other. ``frame`` must be sorted by ``keys``.
+    """
+    same_day = (frame[keys] == frame[keys].shift(1)).all(axis=1).to_numpy()
+    start = np.maximum.accumulate(np.where(same_day, 0, np.arange(len(frame))))
+    first = frame[columns].iloc[start]
+    first.index = frame.index
+    return first
+
+
+def _team_history(data):
+    """One row per (match, team), sorted by team and date."""
+    sides = []
+    for side, win, loss in (('home', 'home_win', 'away_win'), ('away', 'away_win', 'home_win')):
+        sides.append(pd.DataFrame({
+            'row': data.index,
+            'team': data[f'{side}_team'].to_numpy(),
+            'side': side,
+            'date': data['date'].to_numpy(),
+            'win': (data['result'] == win).to_numpy(),
+            'loss': (data['result'] == loss).to_numpy()
+        }))
+    return pd.concat(sides, ignore_index=True).sort_values(['team', 'date', 'row'], kind='mergesort')
+
+
+def _pair_history(data):
+    """One row per match keyed by the unordered pair of teams, sorted by pair and date."""
+    home = data['home_team'].to_numpy(dtype=str)
+    away = data['away_team'].to_numpy(dtype=str)
+    home_is_a = home <= away
+    home_win = (data['result'] == 'home_win').to_numpy()
+    away_win = (data['result'] == 'away_win').to_numpy()
+    pairs = pd.DataFrame({
+        'row': data.index,
+        'team_a': np.where(home_is_a, home, away),
+        'team_b': np.where(home_is_a, away, home),
+        'date': data['date'].to_numpy(),
+        'home_is_a': home_is_a,
+        'a_win': np.where(home_is_a, home_win, away_win),
+        'b_win': np.where(home_is_a, away_win, home_win)
+    })
+    return pairs.sort_values(['team_a', 'team_b', 'date', 'row'], kind='mergesort')
+
+
+def compute_features(data):
+    """
+    Add the factor columns to a frame of matches.
+
+    Streaks use each team's previous three matches, head-to-head the previous
+    five meetings of the pair and rest days the team's previous match date.
+    Matches played the same day are not visible to each other.
+    """
+    data = data.copy()
+    data['date'] = pd.to_datetime(data['date'])
+
+    # 1. Resultado y localía
+    data['result'] = np.select(
+        [data['home_score'] > data['away_score'], data['home_score'] < data['away_score']],
+        ['home_win', 'away_win'], default='draw'
+    )
+    data['venue'] = data['neutral'].map({True: 'neutral', False: 'home', 1: 'neutral', 0: 'home',
+                                         'TRUE': 'neutral', 'FALSE': 'home'})
+    data.loc[data['venue'].isna(), 'venue'] = 'home'
+
+    # 2. Racha (últimos 3 partidos) y 5. descanso del equipo
+    teams = _team_history(data)
+    by_team = teams.groupby('team', sort=False)
+    teams['played'] = by_team.cumcount()
+    teams['wins'] = _previous_sum(teams['win'], teams['team'], STREAK_WINDOW)
+    teams['losses'] = _previous_sum(teams['loss'], teams['team'], STREAK_WINDOW)
+    teams['last_date'] = by_team['date'].shift(1)
+    day = _first_of_day(teams, ['team', 'date'], ['played', 'wins', 'losses', 'last_date'])
+    teams['streak'] = np.select(
+        [day['played'] < STREAK_WINDOW, day['wins'] >= 2, day['losses'] >= 2],
+        ['neutral', 'good', 'bad'], default='neutral'
+    )
+    teams['days_rest'] = (teams['date'] - day['last_date']).dt.days
+    for side in ('home', 'away'):
+        rows = teams[teams['side'] == side].set_index('row')
+        data[f'{side}_streak'] = rows['streak']
+    data['home_days_rest'] = teams[teams['side'] == 'home'].set_index('row')['days_rest']
+
+    # 3. Importancia del partido
+    data['importance'] = np.where(data['tournament'].astype(str).str.lower() == 'friendly', 'low', 'high')
+
+    # 4. Historial directo (últimos 5 enfrentamientos)
+    pairs = _pair_history(data)
+    keys = [pairs['team_a'], pairs['team_b']]
+    pairs['meetings'] = np.minimum(pairs.groupby(keys, sort=False).cumcount(), H2H_WINDOW)
+    pairs['a_wins'] = _previous_sum(pairs['a_win'], keys, H2H_WINDOW)
+    pairs['b_wins'] = _previous_sum(pairs['b_win'], keys, H2H_WINDOW)
+    day = _first_of_day(pairs, ['team_a', 'team_b', 'date'], ['meetings', 'a_wins', 'b_wins'])
+    home_wins = np.where(pairs['home_is_a'], day['a_wins'], day['b_wins'])
+    rate = pd.Series(home_wins / day['meetings'].where(day['meetings'] > 0).to_numpy(), index=pairs['row'].to_numpy())
+    data['h2h_win_rate'] = rate
+
+    data['h2h_group'] = np.select(
+        [data['h2h_win_rate'].isna(), data['h2h_win_rate'] >= 0.6, data['h2h_win_rate'] >= 0.3],
+        ['no_data', 'alta', 'media'], default='baja'
+    )
+    data['rest_group'] = np.select(
+        [data['home_days_rest'].isna(), data['home_days_rest'] < 4],
+        ['no_data', 'menos_4'], default='cuatro_o_mas'
+    )
+    return data
+
+
+def count_outcomes(features):
+    """Return ``{'factor|state': [matches, wins]}`` for every row of the exported CSV."""
+    counters = {}
+    for factor, state, column, value, win in PROBABILITY_ROWS:
+        mask = features[column] == value
+        counters[f'{factor}|{state}'] = [int(mask.sum()), int((mask & (features['result'] == win)).sum())]
+    return counters
+
+
+def probabilities(counters):
+    """Turn the stored counters into the ``factor, state, win_probability`` table."""
+    rows = []
+    for factor, state, *_ in PROBABILITY_ROWS:
+        total, wins = counters.get(f'{factor}|{state}', [0, 0])
+        rows.append({'factor': factor, 'state': state,
+                     'win_probability': round(wins / total, 4) if total > 0 else 0})
+    return pd.DataFrame(rows)
+
+
+def _tail(features):
+    """Matches still needed by future windows: each team's last 3 and each pair's last 5."""
+    teams = _team_history(features)
+    pairs = _pair_history(features)
+    rows = np.union1d(
+        teams.groupby('team', sort=False).tail(STREAK_WINDOW)['row'],
+        pairs.groupby(['team_a', 'team_b'], sort=False).tail(H2H_WINDOW)['row']
+    )
+    return features.loc[rows, MATCH_COLUMNS].sort_values('date', kind='mergesort')
+
+
+def empty_state():
+    """State of a calculator that has not seen any match."""
+    return {'last_date': None, 'counters': {}, 'tail': []}
+
+
+def ingest(matches, state=None):
+    """
+    Add ``matches`` to the stored counters and return the new state.
+
+    Only matches played after the last ingested date are counted; the windows
+    of the new matches are computed against the stored tail of earlier ones,
+    so ingesting the history in chunks gives the same counters as one pass.
+    """
+    state = state or empty_state()
+    matches = matches[MATCH_COLUMNS].copy()
+    matches['date'] = pd.to_datetime(matches['date'])
+    if state['last_date'] is not None:
+        matches = matches[matches['date'] > pd.Timestamp(state['last_date'])]
+    if matches.empty:
+        return state
+
+    tail = pd.DataFrame(state['tail'], columns=MATCH_COLUMNS)
+    tail['date'] = pd.to_datetime(tail['date'])
+    combined = pd.concat([tail.assign(new=False), matches.assign(new=True)], ignore_index=True)
+    combined = combined.sort_values('date', kind='mergesort').reset_index(drop=True)
+    features = compute_features(combined)
+
+    counters = dict(state['counters'])
+    for key, (total, wins) in count_outcomes(features[features['new']]).items():
+        previous = counters.get(key, [0, 0])
+        counters[key] = [previous[0] + total, previous[1] + wins]
+
+    tail = _tail(features)
+    tail['date'] = tail['date'].dt.strftime('%Y-%m-%d')
+    return {
+        'last_date': features['date'].max().strftime('%Y-%m-%d'),
+        'counters': counters,
+        'tail': json.loads(tail.to_json(orient='records'))
+    }
+
+
+def load_state(path):
+    """Read a stored state, or an empty one when the file does not exist."""
+    if not os.path.exists(path):
+        return empty_state()
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_state(state, path):
+    """Write the state atomically."""
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Probabilidades de victoria por factor (fútbol)')
+    parser.add_argument('results', nargs='?', default='results.csv')
+    parser.add_argument('--output', default='soccer_win_probabilities.csv')
+    parser.add_argument('--state', default='soccer_calculator_state.json')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Solo procesa los partidos posteriores al estado guardado')
+    args = parser.parse_args()
+
+    state = load_state(args.state) if args.incremental else empty_state()
+    previous = state['last_date']
+    state = ingest(load_matches(args.results), state)
+    save_state(state, args.state)
+    probabilities(state['counters']).to_csv(args.output, index=False)
+
+    total = state['counters'].get('venue|home', [0])[0] + state['counters'].get('venue|neutral', [0])[0]
+    since = f" (nuevos desde {previous})" if args.incremental and previous else ""
+    print(f"✅ Probabilidades exportadas a {args.output}: {total} partidos{since}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+import logging
+import os
+import threading
+import time
+from app.ai.registry import network_registry
+
+logger = logging.getLogger(__name__)
+
+
+class Warmup:
+    """
+    Builds the AI stack for every sport ahead of the first request.
+
+    For each sport it imports experta/pgmpy, builds the shared network, compiles
+    the expert engine of the adviser and derives its question plan and prefix
+    tables, so the first user of a worker pays none of it. ``start()`` runs the
+    work on a daemon thread; ``run()`` does it in the calling thread (e.g. in the
+    gunicorn master before fork). ``status()`` feeds the readiness endpoint.
+    """
+
+    def __init__(self):
+        self._status = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self.scheduled = False
+
+    def _set(self, sport, **status):
+        with self._lock:
+            self._status[sport] = {**self._status.get(sport, {}), **status}
+
+    def _warm_sport(self, sport, recommendations=False):
+        from app.ai.betting_adviser import BettingAdviser
+
+        network_registry.get(sport)
+        adviser = BettingAdviser(sport)
+        # Derives the question plan and the prefix posterior tables
+        adviser.get_betting_advice([])
+        if recommendations:
+            with adviser.experts.checkout() as expert:
+                expert.warm_recommendation_cache()
+
+    def run(self, sports=None, recommendations=False):
+        """Warm every sport in the calling thread."""
+        self.scheduled = True
+        for sport in sports or network_registry.SPORTS:
+            if self._status.get(sport, {}).get("state") == "ready":
+                continue
+            self._set(sport, state="warming", error=None)
+            started = time.perf_counter()
+            try:
+                self._warm_sport(sport, recommendations)
+            except Exception as error:
+                logger.exception(f"Warmup of '{sport}' failed")
+                self._set(sport, state="failed", error=str(error))
+            else:
+                self._set(sport, state="ready", seconds=round(time.perf_counter() - started, 4))
+
+    def start(self, sports=None, recommendations=False):
+        """Warm every sport on a background thread (once per process)."""
+        with self._lock:
+            if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+                return self._thread
+            self._pid = os.getpid()
+            self.scheduled = True
+            for sport in sports or network_registry.SPORTS:
+                if self._status.get(sport, {}).get("state") != "ready":
+                    self._status[sport] = {"state": "pending"}
+            self._thread = threading.Thread(
+                target=self.run, args=(sports, recommendations), name="ai-warmup", daemon=True
+            )
+            self._thread.start()
+            return self._thread
+
+    def status(self):
+        """Return the warmup state of every sport."""
+        with self._lock:
+            status = {sport: dict(self._status.get(sport, {})) for sport in network_registry.SPORTS}
+        for sport, entry in status.items():
+            entry.setdefault("state", "ready" if network_registry.is_loaded(sport) else "cold")
+        return status
+
+    def is_ready(self):
+        """Whether every scheduled sport is warm (always true when warmup is disabled)."""
+        if not self.scheduled:
+            return True
+        return all(entry["state"] == "ready" for entry in self.status().values())
+
+
+warmup = Warmup()
@@ -1,8 +1,9 @@
 from flask import request, render_template, redirect, url_for, flash
-from flask_login import login_user, logout_user, login_required
+from flask_login import login_user, logout_user, login_required, current_user
 from . import auth
 from .forms import RegisterForm, LoginForm
 from app.services.auth_service import AuthService
+from app.core.user_cache import user_cache
 
 
 @auth.route('/register', methods=['GET', 'POST'])
@@ -38,6 +39,7 @@ def login():
 @login_required
 def logout():
     """Logout the current user."""
+    user_cache.invalidate(current_user.id)
     logout_user()
     flash('You have been logged out.', 'info')
     return redirect(url_for('auth.login'))
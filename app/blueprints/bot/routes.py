@@ -1,10 +1,10 @@
-from flask import request, render_template, jsonify, session as flask_session
+from flask import request, render_template, jsonify, current_app, session as flask_session
 from flask_login import login_required, current_user
 from . import bot
 from app.services.betting_service import BettingService
 from app.services.chat_service import ChatService
-from app.core.extensions import db
-from app.core.exceptions import ValidationError
+from app.services.conversation_store import conversation_store, apply_answer
+from app.core.exceptions import ValidationError, SportNotSupportedError
 
 
 @bot.route('/')
@@ -29,37 +29,48 @@ def select_sport():
     if not betting_service.validate_sport(sport):
         raise ValidationError("Deporte no válido")
 
-    # Set session state
-    flask_session['sport'] = sport
-    flask_session['facts'] = []
-    flask_session['finished'] = False
-
     # Get initial advice
     first_question = betting_service.get_betting_advice(sport, [])
     initial_assistant_text = first_question.get('message', 'Hola. ¿Sobre qué quieres apostar hoy?')
-    flask_session['next_fact'] = first_question.get('next_fact')
-
-    # Database precheck
-    db.session.execute(db.text("SELECT 1"))
 
-    # Create chat session
-    chat_session = ChatService.create_session(
+    # Create chat session with its opening messages in a single transaction
+    confirm_text = f'Has seleccionado {sport.capitalize()}.'
+    session_id = ChatService.start_session_with_messages(
         user_id=current_user.id,
         sport=sport,
-        title=f"{sport.capitalize()} • {getattr(current_user, 'username', 'usuario')}"
+        title=f"{sport.capitalize()} • {getattr(current_user, 'username', 'usuario')}",
+        messages=[('assistant', confirm_text), ('assistant', initial_assistant_text)]
     )
-    
-    confirm_text = f'Has seleccionado {sport.capitalize()}.'
-    ChatService.add_message(chat_session.id, 'assistant', confirm_text)
-    ChatService.add_message(chat_session.id, 'assistant', initial_assistant_text)
+
+    # Conversation state lives server-side; the cookie only remembers the session id
+    conversation_store.start(session_id, current_user.id, sport, first_question.get('next_fact'))
+    for key in ('sport', 'facts', 'next_fact', 'finished'):
+        flask_session.pop(key, None)
+    flask_session['chat_session_id'] = session_id
+    flask_session['chat_turn'] = 0
 
     return jsonify({
         'message': f'Has seleccionado {sport.capitalize()}.',
         'next_message': initial_assistant_text,
-        'session_id': chat_session.id
+        'session_id': session_id
     }), 200
 
 
+def _client_turn(session_id):
+    """
+    Turn of ``session_id`` last seen by this client, or ``None`` when the cookie tracks another session.
+
+    Workers keep their own copy of the conversation states, so the signed
+    cookie is what tells a worker whether its copy is current.
+    """
+    try:
+        if int(session_id) != flask_session.get('chat_session_id'):
+            return None
+    except (TypeError, ValueError):
+        return None
+    return flask_session.get('chat_turn')
+
+
 @bot.route('/get_response', methods=['POST'])
 @login_required
 def get_bot_response():
@@ -73,73 +84,134 @@ def get_bot_response():
 
     # Get or validate session
     if req_session_id:
-        chat_session = ChatService.get_session_by_id(req_session_id, current_user.id)
-        if not chat_session:
+        session_id = req_session_id
+        state = conversation_store.load(session_id, current_user.id, _client_turn(session_id))
+        if state is None:
             return jsonify({'message': 'Sesión no encontrada o no pertenece al usuario.', 'finished': False}), 404
     else:
-        chat_session = ChatService.get_latest_active_session(current_user.id)
-        if not chat_session:
-            return jsonify({'message': 'Primero selecciona un deporte.', 'finished': False}), 400
+        session_id = flask_session.get('chat_session_id')
+        state = conversation_store.load(session_id, current_user.id, _client_turn(session_id)) if session_id else None
+        if state is None or not state['is_active']:
+            chat_session = ChatService.get_latest_active_session(current_user.id)
+            if not chat_session:
+                return jsonify({'message': 'Primero selecciona un deporte.', 'finished': False}), 400
+            session_id = chat_session.id
+            state = conversation_store.load(session_id, current_user.id, _client_turn(session_id))
+    session_id = int(session_id)
 
     # Check if session is still active
-    if not chat_session.is_active:
+    if not state['is_active']:
         return jsonify({
             'message': 'La conversación ya terminó. Selecciona otro deporte para comenzar de nuevo.',
             'finished': True,
-            'session_id': chat_session.id
+            'session_id': session_id
         }), 200
 
     # Save user message
-    ChatService.add_message(chat_session.id, 'user', user_input)
-
-    # Get sport from session
-    sport = chat_session.sport
-    flask_session['sport'] = sport
+    ChatService.record_message(session_id, 'user', user_input)
 
     # Prepare facts
-    facts = flask_session.get('facts', [])
-    next_fact_key = flask_session.get('next_fact')
-    if next_fact_key:
-        updated = False
-        for fact in facts:
-            if next_fact_key in fact:
-                fact[next_fact_key] = user_input
-                updated = True
-                break
-        if not updated:
-            facts.append({next_fact_key: user_input})
+    facts = state['facts']
+    apply_answer(facts, state['next_fact'], user_input)
 
     # Get betting advice
     betting_service = BettingService()
-    response = betting_service.get_betting_advice(sport, facts)
+    response = betting_service.get_betting_advice(state['sport'], facts)
 
     assistant_text = response.get('message', 'Estoy procesando tu información...')
     is_final = bool(response.get('is_final'))
-    next_fact = response.get('next_fact')
 
-    # Update session state
-    flask_session['facts'] = facts
-    flask_session['next_fact'] = next_fact
-    flask_session['finished'] = is_final
+    # Update conversation state and remember the turn in the cookie
+    state['next_fact'] = response.get('next_fact')
+    state['is_active'] = not is_final
+    state['turn'] = state.get('turn', 0) + 1
+    conversation_store.put(session_id, state)
+    flask_session['chat_session_id'] = session_id
+    flask_session['chat_turn'] = state['turn']
 
     # Save assistant response and end session if final
-    ChatService.add_message(chat_session.id, 'assistant', assistant_text)
+    ChatService.record_message(session_id, 'assistant', assistant_text)
     if is_final:
-        ChatService.end_session(chat_session.id, current_user.id)
+        ChatService.end_session(session_id, current_user.id)
 
     return jsonify({
         'message': assistant_text,
         'finished': is_final,
         'next_message': 'Puedes seleccionar otro deporte para una nueva recomendación.' if is_final else None,
-        'session_id': chat_session.id
+        'safe_probability': response.get('safe_probability'),
+        'session_id': session_id
     }), 200
 
 
+@bot.route('/advice/batch', methods=['POST'])
+@login_required
+def advice_batch():
+    """Score lists of fully specified matches per sport, without chat sessions."""
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not data:
+        raise ValidationError("Se espera un objeto con una lista de partidos por deporte")
+
+    betting_service = BettingService()
+    max_size = current_app.config.get('ADVICE_BATCH_MAX_SIZE', 100000)
+    for sport, matches in data.items():
+        if not betting_service.validate_sport(sport):
+            raise SportNotSupportedError(sport)
+        if not isinstance(matches, list):
+            raise ValidationError(f"'{sport}' debe ser una lista de partidos", field=sport)
+        if len(matches) > max_size:
+            raise ValidationError(f"Máximo {max_size} partidos por deporte", field=sport)
+
+    payload = {
+        sport.lower(): betting_service.score_batch(sport, matches)
+        for sport, matches in data.items()
+    }
+    return jsonify(payload), 200
+
+
+@bot.route('/advice/sensitivity', methods=['POST'])
+@login_required
+def advice_sensitivity():
+    """Safe probability for every state combination of the swept factors, the rest held fixed."""
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        raise ValidationError("Se espera un objeto con 'sport', 'evidence' y 'factors'")
+
+    sport = data.get('sport')
+    evidence = data.get('evidence', {})
+    factors = data.get('factors')
+    betting_service = BettingService()
+    if not isinstance(sport, str) or not betting_service.validate_sport(sport):
+        raise SportNotSupportedError(sport)
+    if not isinstance(evidence, dict) or not all(isinstance(value, str) for value in evidence.values()):
+        raise ValidationError("'evidence' debe ser un objeto de respuestas de texto", field='evidence')
+    if isinstance(factors, str):
+        factors = [factors]
+    if not isinstance(factors, list) or not all(isinstance(factor, str) for factor in factors):
+        raise ValidationError("'factors' debe ser una lista de factores", field='factors')
+
+    payload = betting_service.sensitivity(sport, evidence, factors)
+    payload['sport'] = sport.lower()
+    return jsonify(payload), 200
+
+
+def _page_args(default_limit):
+    """Read the ``limit`` and ``cursor`` query parameters of a paginated endpoint."""
+    max_limit = current_app.config.get('HISTORY_PAGE_MAX_SIZE', 200)
+    limit = request.args.get('limit', str(default_limit))
+    if not limit.isdigit() or not 1 <= int(limit) <= max_limit:
+        raise ValidationError(f"'limit' debe estar entre 1 y {max_limit}", field='limit')
+    return int(limit), request.args.get('cursor') or None
+
+
 @bot.route('/history', methods=['GET'])
 @login_required
 def history():
-    """Get user's chat history."""
-    sessions = ChatService.get_user_sessions(current_user.id)
+    """Get one page of the user's chat history, newest first."""
+    try:
+        limit, cursor = _page_args(50)
+        sessions, next_cursor = ChatService.get_user_sessions_page(current_user.id, limit, cursor)
+    except ValidationError as e:
+        return jsonify({'error': e.message}), 400
     payload = [{
         'id': s.id,
         'title': s.title,
@@ -149,18 +221,22 @@ def history():
         'updated_at': s.updated_at.isoformat() if s.updated_at else None,
         'ended_at': s.ended_at.isoformat() if s.ended_at else None
     } for s in sessions]
-    return jsonify(payload)
+    return jsonify({'sessions': payload, 'next_cursor': next_cursor})
 
 
 @bot.route('/history/<int:session_id>', methods=['GET'])
 @login_required
 def history_session(session_id):
-    """Get specific session history."""
+    """Get one page of a session's messages, oldest first."""
     session = ChatService.get_session_by_id(session_id, current_user.id)
     if not session:
         return jsonify({'error': 'Sesión no encontrada'}), 404
 
-    messages = ChatService.get_session_messages(session_id)
+    try:
+        limit, cursor = _page_args(200)
+        messages, next_cursor = ChatService.get_session_messages_page(session_id, limit, cursor)
+    except ValidationError as e:
+        return jsonify({'error': e.message}), 400
     payload = [{
         'role': m.role,
         'content': m.content,
@@ -174,5 +250,6 @@ def history_session(session_id):
             'sport': session.sport,
             'is_active': session.is_active
         },
-        'messages': payload
+        'messages': payload,
+        'next_cursor': next_cursor
     })
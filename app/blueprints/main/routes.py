@@ -1,5 +1,9 @@
 from flask import redirect, url_for
 from flask_login import current_user
+from app.ai.warmup import warmup as ai_warmup
+from app.core.tracing import tracer
+from app.core.db_pool import render_pool_metrics
+from app.services.message_journal import message_journal
 from . import main
 
 
@@ -14,4 +18,20 @@ def index():
 @main.route('/health')
 def health():
     """Health check endpoint."""
-    return {'status': 'healthy'}, 200
+    return {'status': 'healthy', 'message_backlog': message_journal.backlog()}, 200
+
+
+@main.route('/ready')
+def ready():
+    """Readiness endpoint: 200 once every sport is warm, 503 while warming up."""
+    is_ready = ai_warmup.is_ready()
+    return {
+        'status': 'ready' if is_ready else 'warming',
+        'sports': ai_warmup.status()
+    }, 200 if is_ready else 503
+
+
+@main.route('/metrics')
+def metrics():
+    """Per-stage timings and connection pool metrics of this process in the Prometheus text format."""
+    return tracer.render_prometheus() + render_pool_metrics(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
@@ -1,6 +1,7 @@
 from .base import Config
 from .development import DevelopmentConfig
-from .production import ProductionConfig
+from .production import ProductionConfig, DirectProductionConfig, PoolerProductionConfig
 from .testing import TestingConfig
 
-__all__ = ['Config', 'DevelopmentConfig', 'ProductionConfig', 'TestingConfig']
+__all__ = ['Config', 'DevelopmentConfig', 'ProductionConfig', 'DirectProductionConfig',
+           'PoolerProductionConfig', 'TestingConfig']
@@ -1,5 +1,6 @@
 import os
 from urllib.parse import quote_plus
+from app.core.db_pool import is_pooler_url, strip_pooler_flag
 
 
 def build_db_uri():
@@ -7,6 +8,8 @@ def build_db_uri():
     # Prioriza DATABASE_URL (útil en despliegues)
     url = os.getenv("DATABASE_URL")
     if url:
+        # pgbouncer=true solo marca el pooler; libpq no acepta ese parámetro
+        url = strip_pooler_flag(url) if "pgbouncer=" in url else url
         # Garantiza sslmode=require si no está presente
         return url if "sslmode=" in url else (url + ("&" if "?" in url else "?") + "sslmode=require")
 
@@ -19,11 +22,18 @@ def build_db_uri():
     return f"postgresql+psycopg2://{user}:{pwd}@{host}:{port}/{name}?sslmode=require"
 
 
+def uses_pooler():
+    """Tell whether the configured database is reached through a transaction-mode pooler."""
+    # Se evalúa sobre DATABASE_URL original: build_db_uri elimina pgbouncer=true
+    return is_pooler_url(os.getenv("DATABASE_URL") or build_db_uri())
+
+
 class Config:
     """Base configuration class."""
     
     SECRET_KEY = os.getenv("SECRET_KEY", "change-me")
     SQLALCHEMY_DATABASE_URI = build_db_uri()
+    DB_USES_POOLER = uses_pooler()
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
     # Opcional: engine tuning
@@ -34,6 +44,68 @@ class Config:
         "connect_args": {"sslmode": "require"},
     }
 
+    # Dimensionado del pool de conexiones: procesos y hilos de gunicorn y límite de conexiones de la BD
+    WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "2"))
+    GUNICORN_THREADS = int(os.getenv("GUNICORN_THREADS", "1"))
+    DB_MAX_CONNECTIONS = int(os.getenv("DB_MAX_CONNECTIONS", "20"))
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+
+    # Construye las redes bayesianas al crear la app (útil con preload_app de gunicorn)
+    PRELOAD_AI_MODELS = os.getenv("PRELOAD_AI_MODELS", "false").lower() in ("1", "true", "yes")
+    # Calentamiento de los modelos: "sync" (al crear la app), "thread" (hilo al crear la app),
+    # "post_fork" (hook de gunicorn) u "off". "sync" por defecto: un hilo arrancado antes del
+    # fork (gunicorn --preload sin gunicorn.conf.py) dejaría sus locks tomados en los workers
+    AI_WARMUP = os.getenv("AI_WARMUP", "sync")
+
+    # Guarda las redes ya validadas en disco (por defecto en instance/networks, solo accesible por el usuario del proceso)
+    NETWORK_ARTIFACTS = os.getenv("NETWORK_ARTIFACTS", "true").lower() in ("1", "true", "yes")
+    NETWORK_ARTIFACT_DIR = os.getenv("NETWORK_ARTIFACT_DIR")
+
+    # Precalcula todas las recomendaciones finales durante el calentamiento
+    WARM_RECOMMENDATION_CACHE = os.getenv("WARM_RECOMMENDATION_CACHE", "false").lower() in ("1", "true", "yes")
+
+    # Máximo de partidos por deporte en /bot/advice/batch
+    ADVICE_BATCH_MAX_SIZE = int(os.getenv("ADVICE_BATCH_MAX_SIZE", "100000"))
+
+    # Estado de las conversaciones: "memory" (por proceso) o "sqlite" (compartido en el host)
+    CONVERSATION_STORE = os.getenv("CONVERSATION_STORE", "memory")
+    # Por defecto instance/conversations.sqlite3; el directorio debe ser privado del usuario del proceso
+    CONVERSATION_STORE_PATH = os.getenv("CONVERSATION_STORE_PATH")
+    CONVERSATION_STORE_TTL = int(os.getenv("CONVERSATION_STORE_TTL", "3600"))
+    CONVERSATION_STORE_SIZE = int(os.getenv("CONVERSATION_STORE_SIZE", "10000"))
+
+    # Tamaño máximo de página en /bot/history
+    HISTORY_PAGE_MAX_SIZE = int(os.getenv("HISTORY_PAGE_MAX_SIZE", "200"))
+
+    # Guarda los mensajes del chat en segundo plano (cola + inserciones por lotes).
+    # La cola es de cada worker: con WEB_CONCURRENCY > 1 los mensajes de otro worker
+    # aparecen cuando ese worker los escribe (hasta CHAT_JOURNAL_FLUSH_INTERVAL después)
+    CHAT_WRITE_BEHIND = os.getenv("CHAT_WRITE_BEHIND", "false").lower() in ("1", "true", "yes")
+    CHAT_JOURNAL_MAX_SIZE = int(os.getenv("CHAT_JOURNAL_MAX_SIZE", "10000"))
+    CHAT_JOURNAL_BATCH_SIZE = int(os.getenv("CHAT_JOURNAL_BATCH_SIZE", "200"))
+    CHAT_JOURNAL_FLUSH_INTERVAL = float(os.getenv("CHAT_JOURNAL_FLUSH_INTERVAL", "0.5"))
+
+    # Coste de bcrypt (elegido con tests/stress/bcrypt_rounds_benchmark.py)
+    BCRYPT_LOG_ROUNDS = int(os.getenv("BCRYPT_LOG_ROUNDS", "12"))
+    # Procesos que calculan los hashes de contraseñas (0 = en el hilo de la petición)
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+    # Hashes en curso o en cola antes de responder 503 con Retry-After
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "8"))
+    PASSWORD_HASH_TIMEOUT = float(os.getenv("PASSWORD_HASH_TIMEOUT", "10"))
+    PASSWORD_HASH_RETRY_AFTER = int(os.getenv("PASSWORD_HASH_RETRY_AFTER", "1"))
+
+    # Caché por proceso de los usuarios autenticados (0 = consultar la BD en cada petición)
+    USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", "300"))
+    USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "10000"))
+
+    # Tiempos por etapa de cada petición (cabecera Server-Timing y /metrics)
+    TRACING = os.getenv("TRACING", "false").lower() in ("1", "true", "yes")
+
+    # Avisa en el log cuando una petición supera este número de consultas SQL (0 = sin aviso)
+    SQL_QUERY_BUDGET = int(os.getenv("SQL_QUERY_BUDGET", "10"))
+    # Avisa cuando una misma consulta se repite tantas veces en una petición (posible N+1)
+    SQL_REPEATED_QUERY_LIMIT = int(os.getenv("SQL_REPEATED_QUERY_LIMIT", "3"))
+
     # Por si luego usamos el SDK de Supabase o REST
     SUPABASE_URL = os.getenv("SUPABASE_URL")
     SUPABASE_ANON_KEY = os.getenv("SUPABASE_ANON_KEY")
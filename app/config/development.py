@@ -1,3 +1,4 @@
+import os
 from .base import Config
 
 
@@ -6,3 +7,5 @@ class DevelopmentConfig(Config):
     
     DEBUG = True
     TESTING = False
+    # El servidor de desarrollo no hace fork: calienta en segundo plano y arranca enseguida
+    AI_WARMUP = os.getenv("AI_WARMUP", "thread")
@@ -1,8 +1,37 @@
 from .base import Config
+from app.core.db_pool import engine_options
+
+
+def production_engine_options(pooler=None):
+    """Engine options sized for the gunicorn workers and threads in the environment."""
+    return engine_options(
+        Config.SQLALCHEMY_DATABASE_URI,
+        workers=Config.WEB_CONCURRENCY,
+        threads=Config.GUNICORN_THREADS,
+        max_connections=Config.DB_MAX_CONNECTIONS,
+        timeout=Config.DB_POOL_TIMEOUT,
+        # El hilo de escritura en segundo plano de los mensajes también usa una conexión
+        background_threads=1 if Config.CHAT_WRITE_BEHIND else 0,
+        pooler=Config.DB_USES_POOLER if pooler is None else pooler
+    )
 
 
 class ProductionConfig(Config):
-    """Production configuration class."""
+    """Production configuration class (pool profile detected from the database URL)."""
     
     DEBUG = False
     TESTING = False
+    PRELOAD_AI_MODELS = True
+    SQLALCHEMY_ENGINE_OPTIONS = production_engine_options()
+
+
+class DirectProductionConfig(ProductionConfig):
+    """Production against Postgres itself (or a session-mode pooler): sized QueuePool per worker."""
+    
+    SQLALCHEMY_ENGINE_OPTIONS = production_engine_options(pooler=False)
+
+
+class PoolerProductionConfig(ProductionConfig):
+    """Production behind a transaction-mode pooler (Supavisor/PgBouncer on port 6543): no app-side pool."""
+    
+    SQLALCHEMY_ENGINE_OPTIONS = production_engine_options(pooler=True)
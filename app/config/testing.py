@@ -7,3 +7,11 @@ class TestingConfig(Config):
     DEBUG = True
     TESTING = True
     SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
+    # SQLite does not understand the Postgres SSL options of the base config
+    SQLALCHEMY_ENGINE_OPTIONS = {}
+    # Build the models on demand instead of on a warmup thread
+    AI_WARMUP = "off"
+    # Always build (and validate) the networks instead of reading artifacts from disk
+    NETWORK_ARTIFACTS = False
+    # Hash passwords in the test thread instead of a process pool
+    PASSWORD_HASH_WORKERS = 0
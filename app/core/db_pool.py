@@ -0,0 +1,141 @@
+import threading
+import time
+import weakref
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from sqlalchemy import exc
+from sqlalchemy.pool import NullPool, QueuePool
+from app.core.tracing import Histogram, histogram_lines, escape_label
+
+# Port of the transaction-mode poolers (Supavisor / PgBouncer) in front of Postgres.
+# Supabase serves its session-mode pooler on 5432 from the same host, so the
+# host name alone does not tell the two modes apart.
+POOLER_PORT = 6543
+
+
+def is_pooler_url(url):
+    """
+    Return True when ``url`` points at a transaction-mode pooler instead of Postgres itself.
+
+    Pass the URL as configured: ``strip_pooler_flag`` removes the
+    ``pgbouncer=true`` marker this check relies on.
+    """
+    if not url:
+        return False
+    parts = urlsplit(url)
+    query = dict(parse_qsl(parts.query))
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    return port == POOLER_PORT or query.get("pgbouncer", "").lower() in ("1", "true", "yes")
+
+
+def strip_pooler_flag(url):
+    """Drop the ``pgbouncer`` marker, which libpq would reject as an unknown connection option."""
+    parts = urlsplit(url)
+    query = [(key, value) for key, value in parse_qsl(parts.query) if key != "pgbouncer"]
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+class TimedQueuePool(QueuePool):
+    """
+    ``QueuePool`` that records how long each checkout takes.
+
+    The time covers waiting for a free connection and, when the pool grows,
+    opening a new one. Checkouts that give up after ``pool_timeout`` are
+    counted separately. ``render_pool_metrics`` exposes every live pool.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkout_wait = Histogram()
+        self.timeouts = 0
+        self._stats_lock = threading.Lock()
+        _pools.add(self)
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._stats_lock:
+                self.checkout_wait.observe(elapsed)
+
+    def stats(self):
+        """Return the counters of this pool."""
+        with self._stats_lock:
+            return {
+                "size": self.size(),
+                "checked_out": self.checkedout(),
+                "overflow": max(self.overflow(), 0),
+                "timeouts": self.timeouts,
+                "wait": (list(self.checkout_wait.counts), self.checkout_wait.sum, self.checkout_wait.count)
+            }
+
+
+_pools = weakref.WeakSet()
+
+
+def render_pool_metrics():
+    """Render the checkout metrics of every ``TimedQueuePool`` in the Prometheus text format."""
+    pools = sorted(((pool.logging_name or f"pool-{id(pool):x}", pool.stats()) for pool in list(_pools)),
+                   key=lambda item: item[0])
+    lines = [
+        "# HELP app_db_pool_checkout_seconds Time to check a connection out of the pool.",
+        "# TYPE app_db_pool_checkout_seconds histogram",
+    ]
+    for name, stats in pools:
+        lines.extend(histogram_lines("app_db_pool_checkout_seconds", f'pool="{escape_label(name)}"', *stats["wait"]))
+    for metric, kind, key, help_text in (
+        ("app_db_pool_timeouts_total", "counter", "timeouts", "Checkouts that gave up after pool_timeout."),
+        ("app_db_pool_checked_out", "gauge", "checked_out", "Connections currently in use."),
+        ("app_db_pool_size", "gauge", "size", "Connections kept open by the pool."),
+        ("app_db_pool_overflow", "gauge", "overflow", "Connections opened beyond the pool size."),
+    ):
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {kind}")
+        for name, stats in pools:
+            lines.append(f'{metric}{{pool="{escape_label(name)}"}} {stats[key]}')
+    return "\n".join(lines) + "\n"
+
+
+def engine_options(url, workers=1, threads=1, max_connections=20, timeout=10, recycle=300,
+                   background_threads=0, pooler=None):
+    """
+    SQLAlchemy engine options for ``workers`` processes of ``threads`` threads each.
+
+    Behind a transaction-mode pooler the app keeps no pool of its own
+    (``NullPool``): the pooler already multiplexes connections, and a
+    connection held across requests would pin a server connection. Otherwise
+    every process gets a ``TimedQueuePool`` with one connection per request
+    thread (plus ``background_threads``), and overflow up to its share of
+    ``max_connections`` so all workers together stay under the server limit.
+    ``pooler`` forces one profile (True/False) instead of detecting it from ``url``.
+    """
+    connect_args = {"sslmode": "require"}
+    if pooler is None:
+        pooler = is_pooler_url(url)
+    if pooler:
+        return {
+            "poolclass": NullPool,
+            # Every checkout opens a fresh pooler connection, so there is nothing stale to ping
+            "pool_pre_ping": False,
+            "connect_args": connect_args,
+        }
+
+    per_worker = max(1, max_connections // max(1, workers))
+    pool_size = min(max(1, threads + background_threads), per_worker)
+    return {
+        "poolclass": TimedQueuePool,
+        "pool_size": pool_size,
+        "max_overflow": per_worker - pool_size,
+        "pool_timeout": timeout,
+        "pool_pre_ping": True,
+        "pool_recycle": recycle,
+        "connect_args": connect_args,
+    }
@@ -3,7 +3,7 @@ from app.core.exceptions import (
     BaseApplicationError, ValidationError, AuthenticationError,
     NotFoundError, DatabaseError, ExpertSystemError, InvalidRequestError,
     SportNotSupportedError, SessionNotFoundError, SessionInactiveError,
-    NoActiveSportError
+    NoActiveSportError, ServiceUnavailableError
 )
 from sqlalchemy.exc import OperationalError, IntegrityError
 
@@ -125,6 +125,42 @@ def register_error_handlers(app):
             'finished': False
         }), error.status_code
     
+    @app.errorhandler(ServiceUnavailableError)
+    def handle_service_unavailable_error(error):
+        """Handle saturated resources with a 503 and a Retry-After header."""
+        current_app.logger.warning(f"Service unavailable: {error.message}")
+        headers = {'Retry-After': str(error.retry_after)}
+        message = "El servidor está ocupado. Inténtalo de nuevo en unos segundos."
+        
+        if request.is_json:
+            return jsonify({
+                'error': error.error_code,
+                'message': message,
+                'retry_after': error.retry_after
+            }), error.status_code, headers
+        
+        from flask import flash
+        flash(message, 'error')
+        
+        if request.endpoint == 'auth.register':
+            from app.blueprints.auth.forms import RegisterForm
+            form = RegisterForm()
+            template = 'auth/register.html'
+        elif request.endpoint == 'auth.login':
+            from app.blueprints.auth.forms import LoginForm
+            form = LoginForm()
+            template = 'auth/login.html'
+        else:
+            return render_template('errors/500.html'), error.status_code, headers
+        
+        if request.method == 'POST':
+            form.process(request.form)
+            # Clear password fields for security
+            form.password.data = ''
+            if hasattr(form, 'confirm'):
+                form.confirm.data = ''
+        return render_template(template, form=form), error.status_code, headers
+    
     @app.errorhandler(DatabaseError)
     def handle_database_error(error):
         """Handle database errors."""
@@ -143,6 +179,13 @@ def register_error_handlers(app):
         """Handle expert system errors."""
         current_app.logger.error(f"Expert system error: {error.message}")
         
+        # Non-chat endpoints (batch scoring, sensitivity) report the failure
+        if not getattr(error, 'fallback', True):
+            return jsonify({
+                'error': error.error_code,
+                'message': 'Expert system failed'
+            }), error.status_code
+        
         # For expert system errors, return a graceful fallback response
         return jsonify({
             'message': 'Estoy procesando tu información...',
@@ -42,8 +42,9 @@ class DatabaseError(BaseApplicationError):
 
 
 class ExpertSystemError(BaseApplicationError):
-    """Raised when expert system operations fail."""
-    def __init__(self, message="Expert system error"):
+    """Raised when expert system operations fail (``fallback``: answer with the chat placeholder)."""
+    def __init__(self, message="Expert system error", fallback=True):
+        self.fallback = fallback
         super().__init__(message, status_code=500, error_code="expert_system_error")
 
 
@@ -79,3 +80,17 @@ class NoActiveSportError(BaseApplicationError):
     """Raised when no sport has been selected."""
     def __init__(self):
         super().__init__("Please select a sport first", status_code=400, error_code="no_active_sport")
+
+
+class ServiceUnavailableError(BaseApplicationError):
+    """Raised when a bounded resource is saturated and the client should retry later."""
+    def __init__(self, message="Service temporarily unavailable", retry_after=1):
+        self.retry_after = retry_after
+        super().__init__(message, status_code=503, error_code="service_unavailable")
+
+
+class ConversationNotReadyError(ServiceUnavailableError):
+    """Raised when the stored answers of a session are behind the turn the client has seen."""
+    def __init__(self, session_id=None):
+        message = f"Session {session_id} is not fully stored yet" if session_id else "Session is not fully stored yet"
+        super().__init__(message, retry_after=1)
@@ -2,6 +2,7 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_login import LoginManager
 from flask_bcrypt import Bcrypt
+from app.core.user_cache import user_cache
 
 # Initialize extensions
 db = SQLAlchemy()
@@ -16,12 +17,12 @@ def init_extensions(app):
     migrate.init_app(app, db)
     login_manager.init_app(app)
     bcrypt.init_app(app)
+    user_cache.init_app(app)
     
     # Configure login manager
     login_manager.login_view = 'auth.login'
     
-    # User loader
+    # User loader (served from the per-process identity cache)
     @login_manager.user_loader
     def load_user(user_id):
-        from app.models.user import User
-        return User.query.get(int(user_id))
+        return user_cache.load(user_id)
@@ -0,0 +1,134 @@
+import hashlib
+import hmac
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+import bcrypt
+from app.core.exceptions import ServiceUnavailableError
+
+
+def _to_bytes(value):
+    return value.encode("utf-8") if isinstance(value, str) else value
+
+
+def _prepare(password, handle_long_passwords):
+    password = _to_bytes(password)
+    if handle_long_passwords:
+        password = _to_bytes(hashlib.sha256(password).hexdigest())
+    return password
+
+
+def hash_password(password, rounds, prefix, handle_long_passwords):
+    """Hash a password exactly like Flask-Bcrypt's ``generate_password_hash``."""
+    if not password:
+        raise ValueError("Password must be non-empty.")
+    salt = bcrypt.gensalt(rounds=rounds, prefix=_to_bytes(prefix))
+    return bcrypt.hashpw(_prepare(password, handle_long_passwords), salt).decode("utf-8")
+
+
+def check_password(pw_hash, password, handle_long_passwords):
+    """Check a password exactly like Flask-Bcrypt's ``check_password_hash``."""
+    pw_hash = _to_bytes(pw_hash)
+    return hmac.compare_digest(bcrypt.hashpw(_prepare(password, handle_long_passwords), pw_hash), pw_hash)
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt hashing and verification on a bounded process pool.
+
+    bcrypt is CPU-bound for hundreds of milliseconds per call, so it runs in
+    ``PASSWORD_HASH_WORKERS`` processes of its own instead of in the request
+    thread; at most that many cores per app process go to password work, and
+    the other requests keep theirs. At most ``PASSWORD_HASH_MAX_PENDING``
+    calls may be running or queued at once; past that (or after waiting
+    ``PASSWORD_HASH_TIMEOUT`` seconds) a ``ServiceUnavailableError`` asks the
+    client to retry after ``PASSWORD_HASH_RETRY_AFTER`` seconds.
+    ``PASSWORD_HASH_WORKERS = 0`` hashes in the calling thread.
+    """
+
+    def __init__(self, app=None):
+        self.workers = 0
+        self.max_pending = 8
+        self.timeout = 10.0
+        self.retry_after = 1
+        self.rounds = 12
+        self.prefix = "2b"
+        self.handle_long_passwords = False
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Read the pool and bcrypt settings from the app config."""
+        self.shutdown()
+        self.workers = int(app.config.get("PASSWORD_HASH_WORKERS", self.workers))
+        self.max_pending = int(app.config.get("PASSWORD_HASH_MAX_PENDING", self.max_pending))
+        self.timeout = float(app.config.get("PASSWORD_HASH_TIMEOUT", self.timeout))
+        self.retry_after = int(app.config.get("PASSWORD_HASH_RETRY_AFTER", self.retry_after))
+        # Same settings Flask-Bcrypt reads, so hashes stay interchangeable
+        self.rounds = int(app.config.get("BCRYPT_LOG_ROUNDS", 12))
+        self.prefix = app.config.get("BCRYPT_HASH_PREFIX", "2b")
+        self.handle_long_passwords = bool(app.config.get("BCRYPT_HANDLE_LONG_PASSWORDS", False))
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+
+    def _pool(self):
+        """Return this process's pool, created on first use (never inherited across a fork)."""
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                # spawn: forking a process that already runs threads can copy held locks
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+                self._pid = os.getpid()
+            return self._executor
+
+    def _run(self, fn, *args):
+        slots = self._slots
+        if not slots.acquire(blocking=False):
+            raise ServiceUnavailableError(retry_after=self.retry_after)
+        if self.workers <= 0:
+            try:
+                return fn(*args)
+            finally:
+                slots.release()
+
+        try:
+            future = self._pool().submit(fn, *args)
+        except BaseException:
+            slots.release()
+            raise
+        # A running call cannot be cancelled, so its slot is freed when the pool is
+        # done with it rather than when this thread stops waiting
+        future.add_done_callback(lambda _: slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise ServiceUnavailableError(retry_after=self.retry_after)
+        except BrokenProcessPool:
+            with self._lock:
+                self._executor = None
+            raise ServiceUnavailableError(retry_after=self.retry_after)
+
+    def hash(self, password: str) -> str:
+        """Return the bcrypt hash of ``password``."""
+        return self._run(hash_password, password, self.rounds, self.prefix, self.handle_long_passwords)
+
+    def verify(self, pw_hash: str, password: str) -> bool:
+        """Check ``password`` against a stored bcrypt hash."""
+        return self._run(check_password, pw_hash, password, self.handle_long_passwords)
+
+    def shutdown(self):
+        """Stop the pool of this process."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None and self._pid == os.getpid():
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_hasher = PasswordHasher()
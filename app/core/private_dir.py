@@ -0,0 +1,20 @@
+import os
+
+
+def private_directory(directory, create=False):
+    """
+    Whether only this process' user can write to ``directory``.
+
+    With ``create`` a missing directory is made first, with mode 0700. A
+    directory owned by another user, or writable by group or others, is not
+    private: someone else could plant or replace the files kept in it.
+    """
+    try:
+        if create:
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+        info = os.stat(directory)
+    except OSError:
+        return False
+    if hasattr(os, "getuid") and (info.st_uid != os.getuid() or info.st_mode & 0o022):
+        return False
+    return True
@@ -0,0 +1,122 @@
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.tracing import tracer
+
+
+class QueryStats:
+    """Statements and database time seen while it was active."""
+
+    __slots__ = ("statements", "duration")
+
+    def __init__(self):
+        self.statements = []
+        self.duration = 0.0
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def repeated(self):
+        """Return ``(statement, times)`` of the most repeated statement, or ``None``."""
+        if not self.statements:
+            return None
+        return Counter(self.statements).most_common(1)[0]
+
+
+class QueryCounter:
+    """
+    Counts SQL statements and database time per request.
+
+    Hooks ``before/after_cursor_execute`` on every engine. A request that
+    issues more than ``SQL_QUERY_BUDGET`` statements, or repeats one statement
+    ``SQL_REPEATED_QUERY_LIMIT`` times (the usual shape of an N+1 load), is
+    logged as a warning. With tracing on, the statements also show up as the
+    ``db.query`` stage. ``count_queries`` collects the same stats around any
+    block, e.g. to enforce query budgets in tests.
+    """
+
+    def __init__(self, app=None):
+        self._local = threading.local()
+        self._installed = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Install the engine hooks once and the per-request budget check on ``app``."""
+        if not self._installed:
+            event.listen(Engine, "before_cursor_execute", self._before_cursor_execute)
+            event.listen(Engine, "after_cursor_execute", self._after_cursor_execute)
+            self._installed = True
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+
+    def _collectors(self):
+        collectors = list(getattr(self._local, "stack", ()))
+        if has_request_context():
+            stats = g.get("_query_stats")
+            if stats is not None:
+                collectors.append(stats)
+        return collectors
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        for stats in self._collectors():
+            stats.statements.append(statement)
+            stats.duration += elapsed
+        if tracer.enabled:
+            tracer.record("db.query", elapsed)
+
+    @contextmanager
+    def count_queries(self):
+        """Collect the statements run by this thread inside the block."""
+        stats = QueryStats()
+        stack = self._local.__dict__.setdefault("stack", [])
+        stack.append(stats)
+        try:
+            yield stats
+        finally:
+            stack.remove(stats)
+
+    def _start_request(self):
+        g._query_stats = QueryStats()
+
+    def _finish_request(self, response):
+        stats = g.pop("_query_stats", None)
+        if stats is None or not stats.count:
+            return response
+
+        budget = current_app.config.get("SQL_QUERY_BUDGET", 10)
+        repeat_limit = current_app.config.get("SQL_REPEATED_QUERY_LIMIT", 3)
+        statement, times = stats.repeated()
+        if budget and stats.count > budget:
+            current_app.logger.warning(
+                f"Query budget exceeded on {request.endpoint}: {stats.count} statements "
+                f"(budget {budget}) in {stats.duration * 1000:.1f} ms"
+            )
+        if repeat_limit and times >= repeat_limit:
+            current_app.logger.warning(
+                f"Possible N+1 on {request.endpoint}: statement run {times} times: {statement}"
+            )
+        return response
+
+
+query_counter = QueryCounter()
+count_queries = query_counter.count_queries
+
+
+@contextmanager
+def assert_max_queries(limit):
+    """Fail with the offending statements when the block runs more than ``limit`` statements."""
+    with count_queries() as stats:
+        yield stats
+    if stats.count > limit:
+        listing = "\n".join(f"  {statement}" for statement in stats.statements)
+        raise AssertionError(f"Expected at most {limit} queries, got {stats.count}:\n{listing}")
@@ -0,0 +1,191 @@
+import functools
+import threading
+import time
+from bisect import bisect_left
+from flask import g, has_request_context, request
+
+# Upper bounds (seconds) of the histogram buckets
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _NoopStage:
+    """Context manager returned while tracing is off."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopStage()
+
+
+class _Stage:
+    """Times one named stage and reports it to the tracer."""
+
+    __slots__ = ("tracer", "name", "start")
+
+    def __init__(self, tracer, name):
+        self.tracer = tracer
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus layout."""
+
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        index = bisect_left(BUCKETS, value)
+        if index < len(BUCKETS):
+            self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Tracer:
+    """
+    Per-stage request timings.
+
+    Code marks stages with ``trace_stage("bayes.query")`` (context manager) or
+    ``@traced("chat.add_message")``. Each finished stage is added to a
+    per-process histogram and, inside a request, to the ``Server-Timing``
+    header of the response. ``/metrics`` renders the histograms in the
+    Prometheus text format. Nested stages are reported separately, so their
+    durations overlap. With ``TRACING`` off a stage costs one attribute check.
+    """
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self._histograms = {}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Read ``TRACING`` and hook the request timer into the app."""
+        self.enabled = bool(app.config.get("TRACING", False))
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+
+    def stage(self, name):
+        """Return a context manager that times the stage ``name``."""
+        if not self.enabled:
+            return _NOOP
+        return _Stage(self, name)
+
+    def traced(self, name):
+        """Decorator form of :meth:`stage`."""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with _Stage(self, name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def record(self, name, seconds, endpoint=None):
+        """Add one observation of ``name`` (and keep it for the current response)."""
+        key = (name, endpoint)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(seconds)
+        if endpoint is None and has_request_context():
+            stages = g.get("_trace_stages")
+            if stages is not None:
+                stages.append((name, seconds))
+
+    def _start_request(self):
+        if self.enabled:
+            g._trace_stages = []
+            g._trace_start = time.perf_counter()
+
+    def _finish_request(self, response):
+        stages = g.pop("_trace_stages", None)
+        if stages is None:
+            return response
+        total = time.perf_counter() - g.pop("_trace_start")
+        self.record("request", total, endpoint=request.endpoint or "unknown")
+
+        # Stages that ran several times are summed into a single entry
+        merged = {}
+        for name, seconds in stages:
+            count, duration = merged.get(name, (0, 0.0))
+            merged[name] = (count + 1, duration + seconds)
+        entries = [f'{name};dur={duration * 1000:.2f};desc="x{count}"' if count > 1
+                   else f"{name};dur={duration * 1000:.2f}"
+                   for name, (count, duration) in merged.items()]
+        entries.append(f"total;dur={total * 1000:.2f}")
+        response.headers.add("Server-Timing", ", ".join(entries))
+        return response
+
+    def snapshot(self):
+        """Return ``{(stage, endpoint): (bucket counts, sum, count)}``."""
+        with self._lock:
+            return {key: (list(h.counts), h.sum, h.count) for key, h in self._histograms.items()}
+
+    def reset(self):
+        """Drop every histogram."""
+        with self._lock:
+            self._histograms.clear()
+
+    def render_prometheus(self):
+        """Render the histograms in the Prometheus text exposition format."""
+        families = (
+            ("app_stage_duration_seconds", "Time spent in named request stages.", False),
+            ("app_request_duration_seconds", "Total time of each request by endpoint.", True),
+        )
+        snapshot = sorted(self.snapshot().items(), key=lambda item: (item[0][0], item[0][1] or ""))
+        lines = []
+        for metric, help_text, by_endpoint in families:
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} histogram")
+            for (name, endpoint), (counts, total, count) in snapshot:
+                if (endpoint is not None) != by_endpoint:
+                    continue
+                label = f'endpoint="{escape_label(endpoint)}"' if by_endpoint else f'stage="{escape_label(name)}"'
+                lines.extend(histogram_lines(metric, label, counts, total, count))
+        return "\n".join(lines) + "\n"
+
+
+def escape_label(value):
+    """Escape a Prometheus label value."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def histogram_lines(metric, label, counts, total, count):
+    """Render the ``_bucket``, ``_sum`` and ``_count`` samples of one labelled histogram."""
+    lines = []
+    cumulative = 0
+    for bound, bucket in zip(BUCKETS, counts):
+        cumulative += bucket
+        lines.append(f'{metric}_bucket{{{label},le="{bound}"}} {cumulative}')
+    lines.append(f'{metric}_bucket{{{label},le="+Inf"}} {count}')
+    lines.append(f"{metric}_sum{{{label}}} {total:.6f}")
+    lines.append(f"{metric}_count{{{label}}} {count}")
+    return lines
+
+
+tracer = Tracer()
+trace_stage = tracer.stage
+traced = tracer.traced
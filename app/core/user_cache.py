@@ -0,0 +1,66 @@
+from flask_login import UserMixin
+from app.core.cache import TTLCache
+
+
+class CachedUser(UserMixin):
+    """Detached, read-only identity handed to Flask-Login instead of the ORM ``User``."""
+
+    __slots__ = ("id", "username")
+
+    def __init__(self, id, username):
+        self.id = id
+        self.username = username
+
+    def __repr__(self):
+        return f"<CachedUser {self.username}>"
+
+
+class UserCache:
+    """
+    Per-process LRU of logged-in users, so ``@login_required`` routes skip the
+    ``User`` query on every request.
+
+    Entries expire after ``USER_CACHE_TTL`` seconds (0 disables the cache) and
+    are dropped on logout and password change. Other workers only see those
+    changes once their own entry expires.
+    """
+
+    def __init__(self, max_size=10000, ttl=300):
+        self.cache = TTLCache(max_size=max_size, ttl=ttl)
+        self.enabled = ttl > 0
+
+    def init_app(self, app):
+        """Read the size and TTL from the app config."""
+        ttl = int(app.config.get("USER_CACHE_TTL", 300))
+        self.cache = TTLCache(max_size=int(app.config.get("USER_CACHE_SIZE", 10000)), ttl=ttl)
+        self.enabled = ttl > 0
+
+    def load(self, user_id):
+        """Return the identity of ``user_id``, querying the database only on a miss."""
+        from app.models.user import User
+
+        user_id = int(user_id)
+        if self.enabled:
+            cached = self.cache.get(user_id)
+            if cached is not None:
+                return cached
+
+        user = User.query.get(user_id)
+        if user is None:
+            return None
+        cached = CachedUser(user.id, user.username)
+        if self.enabled:
+            self.cache.set(user_id, cached)
+        return cached
+
+    def invalidate(self, user_id):
+        """Forget ``user_id`` so the next request reloads it."""
+        if user_id is not None:
+            self.cache.delete(int(user_id))
+
+    def clear(self):
+        """Forget every user."""
+        self.cache.clear()
+
+
+user_cache = UserCache()
@@ -1,13 +1,16 @@
-from sqlalchemy import func
+from sqlalchemy import func, true
 from app.core.extensions import db
 
+# BIGINT keys on Postgres; SQLite only autoincrements INTEGER primary keys
+BigIntId = db.BigInteger().with_variant(db.Integer, "sqlite")
+
 
 class ChatSession(db.Model):
     """Chat session model."""
     
     __tablename__ = "chat_sessions"
     
-    id = db.Column(db.BigInteger, primary_key=True)
+    id = db.Column(BigIntId, primary_key=True)
     user_id = db.Column(
         db.Integer,
         db.ForeignKey("app_users.id", ondelete="CASCADE"),
@@ -20,12 +23,21 @@ class ChatSession(db.Model):
     updated_at = db.Column(db.DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
     ended_at = db.Column(db.DateTime(timezone=True), nullable=True)
 
+    # Keyset indexes for the history pages and the latest active session lookup
+    __table_args__ = (
+        db.Index("ix_chat_sessions_user_updated", user_id, updated_at.desc(), id.desc()),
+        db.Index(
+            "ix_chat_sessions_user_active_updated", user_id, updated_at.desc(), id.desc(),
+            postgresql_where=is_active == true(), sqlite_where=is_active == true()
+        ),
+    )
+
     # Relationships
     messages = db.relationship(
         "ChatMessage",
         backref="session",
         cascade="all, delete-orphan",
-        order_by="ChatMessage.created_at"
+        order_by="(ChatMessage.created_at, ChatMessage.id)"
     )
 
 
@@ -34,7 +46,7 @@ class ChatMessage(db.Model):
     
     __tablename__ = "chat_messages"
     
-    id = db.Column(db.BigInteger, primary_key=True)
+    id = db.Column(BigIntId, primary_key=True)
     session_id = db.Column(
         db.BigInteger,
         db.ForeignKey("chat_sessions.id", ondelete="CASCADE"),
@@ -44,3 +56,7 @@ class ChatMessage(db.Model):
     content = db.Column(db.Text, nullable=False)
     meta = db.Column(db.JSON, default=dict, nullable=False)
     created_at = db.Column(db.DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        db.Index("ix_chat_messages_session_created", session_id, created_at, id),
+    )
@@ -1,5 +1,7 @@
 from flask_login import UserMixin
-from app.core.extensions import db, bcrypt
+from app.core.extensions import db
+from app.core.password_hasher import password_hasher
+from app.core.user_cache import user_cache
 
 
 class User(UserMixin, db.Model):
@@ -12,12 +14,13 @@ class User(UserMixin, db.Model):
     password_hash = db.Column(db.String(128), nullable=False)
 
     def set_password(self, password: str):
-        """Set the user's password hash."""
-        self.password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
+        """Set the user's password hash (computed on the password hashing pool)."""
+        self.password_hash = password_hasher.hash(password)
+        user_cache.invalidate(self.id)
 
     def check_password(self, password: str) -> bool:
         """Check if the provided password matches the user's password hash."""
-        return bcrypt.check_password_hash(self.password_hash, password)
+        return password_hasher.verify(self.password_hash, password)
 
     def __repr__(self):
         return f"<User {self.username}>"
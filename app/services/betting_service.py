@@ -1,4 +1,5 @@
-from app.core.exceptions import ExpertSystemError
+from app.core.exceptions import ExpertSystemError, ValidationError
+from app.core.tracing import traced
 
 
 class BettingService:
@@ -20,6 +21,7 @@ class BettingService:
         
         return self._advisers[sport_key]
     
+    @traced("betting.advice")
     def get_betting_advice(self, sport: str, facts: list) -> dict:
         """Get betting advice for the specified sport and facts."""
         try:
@@ -38,6 +40,26 @@ class BettingService:
         except Exception as e:
             raise ExpertSystemError(f"Error getting betting advice: {str(e)}")
     
+    @traced("betting.batch")
+    def score_batch(self, sport: str, matches: list) -> list:
+        """Score fully specified matches in one vectorized pass, without chat sessions."""
+        try:
+            from app.ai.batch_scorer import BatchScorer
+            return BatchScorer.for_sport(sport).score(matches)
+        except Exception as e:
+            raise ExpertSystemError(f"Error scoring batch for {sport}: {str(e)}", fallback=False)
+    
+    @traced("betting.sensitivity")
+    def sensitivity(self, sport: str, evidence: dict, factors: list) -> dict:
+        """Sweep ``factors`` over all their states with the rest of ``evidence`` held fixed."""
+        from app.ai.batch_scorer import BatchScorer
+        try:
+            return BatchScorer.for_sport(sport).sweep(evidence, factors)
+        except ValueError as e:
+            raise ValidationError(str(e), field="factors")
+        except Exception as e:
+            raise ExpertSystemError(f"Error computing sensitivity for {sport}: {str(e)}", fallback=False)
+    
     def validate_sport(self, sport: str) -> bool:
         """Validate if the sport is supported."""
         supported_sports = ['soccer', 'basketball']
@@ -1,9 +1,39 @@
-from typing import List, Optional
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import List, Optional, Tuple
 from app.models.chat import ChatSession, ChatMessage
 from app.core.extensions import db
-from app.core.exceptions import DatabaseError
+from app.core.exceptions import DatabaseError, ValidationError
+from app.core.tracing import traced
+from app.services.message_journal import message_journal
+from sqlalchemy import select, true, tuple_
 from sqlalchemy.exc import SQLAlchemyError
 
+# Columns serialized by the history endpoints
+SESSION_COLUMNS = (
+    ChatSession.id, ChatSession.title, ChatSession.sport, ChatSession.is_active,
+    ChatSession.created_at, ChatSession.updated_at, ChatSession.ended_at
+)
+MESSAGE_COLUMNS = (ChatMessage.id, ChatMessage.role, ChatMessage.content, ChatMessage.created_at)
+
+
+def encode_cursor(timestamp: datetime, row_id: int) -> str:
+    """Encode a ``(timestamp, id)`` keyset position as an opaque URL-safe token."""
+    raw = json.dumps([timestamp.isoformat(), row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a token made by :func:`encode_cursor`."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        timestamp, row_id = json.loads(raw)
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except (binascii.Error, ValueError, TypeError, UnicodeDecodeError):
+        raise ValidationError("Cursor no válido", field="cursor")
+
 
 class ChatService:
     """Service for handling chat operations."""
@@ -29,6 +59,41 @@ class ChatService:
             raise DatabaseError(f"Failed to create chat session: {str(e)}")
     
     @staticmethod
+    @traced("chat.start_session")
+    def start_session_with_messages(user_id: int, sport: str, title: Optional[str] = None,
+                                    messages: Optional[List[Tuple[str, str]]] = None) -> int:
+        """
+        Create a chat session and its opening ``(role, content)`` messages in one transaction.
+        
+        The session and its messages are inserted in a single unit of work (Postgres
+        returns the generated ids through RETURNING) and committed once.
+        Returns the id of the new session.
+        """
+        if not title:
+            title = f"{sport.capitalize()} • Usuario"
+        
+        try:
+            session = ChatSession(
+                user_id=user_id,
+                sport=sport,
+                title=title
+            )
+            session.messages = [
+                ChatMessage(role=role, content=content, meta={})
+                for role, content in messages or []
+            ]
+            db.session.add(session)
+            db.session.flush()
+            # Read the id before commit expires the instance and forces a refresh
+            session_id = session.id
+            db.session.commit()
+            return session_id
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            raise DatabaseError(f"Failed to start chat session: {str(e)}")
+    
+    @staticmethod
+    @traced("chat.add_message")
     def add_message(session_id: int, role: str, content: str, meta: Optional[dict] = None) -> ChatMessage:
         """Add a message to a chat session."""
         if meta is None:
@@ -48,19 +113,59 @@ class ChatService:
             db.session.rollback()
             raise DatabaseError(f"Failed to add message: {str(e)}")
     
+    @staticmethod
+    @traced("chat.record_message")
+    def record_message(session_id: int, role: str, content: str, meta: Optional[dict] = None) -> None:
+        """
+        Store a conversation turn.
+        
+        With ``CHAT_WRITE_BEHIND`` enabled the message is handed to the message
+        journal and written in the background; otherwise it is committed now.
+        """
+        if message_journal.enabled:
+            message_journal.append(session_id, role, content, meta)
+        else:
+            ChatService.add_message(session_id, role, content, meta)
+    
     @staticmethod
     def get_user_sessions(user_id: int, limit: int = 50) -> List[ChatSession]:
         """Get chat sessions for a user."""
         try:
             return (ChatSession.query
                    .filter_by(user_id=user_id)
-                   .order_by(ChatSession.updated_at.desc())
+                   .order_by(ChatSession.updated_at.desc(), ChatSession.id.desc())
                    .limit(limit)
                    .all())
         except SQLAlchemyError as e:
             raise DatabaseError(f"Failed to get user sessions: {str(e)}")
     
     @staticmethod
+    @traced("chat.sessions_page")
+    def get_user_sessions_page(user_id: int, limit: int = 50,
+                               cursor: Optional[str] = None) -> Tuple[list, Optional[str]]:
+        """
+        Get one page of a user's sessions, newest first, as rows of ``SESSION_COLUMNS``.
+        
+        Pages follow the ``(updated_at, id)`` keyset, so every page costs the same
+        no matter how deep it is. Returns the rows and the cursor of the next
+        page (``None`` on the last page).
+        """
+        query = select(*SESSION_COLUMNS).where(ChatSession.user_id == user_id)
+        if cursor:
+            query = query.where(tuple_(ChatSession.updated_at, ChatSession.id) < decode_cursor(cursor))
+        query = query.order_by(ChatSession.updated_at.desc(), ChatSession.id.desc()).limit(limit + 1)
+        try:
+            rows = db.session.execute(query).all()
+        except SQLAlchemyError as e:
+            raise DatabaseError(f"Failed to get user sessions: {str(e)}")
+        
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1].updated_at, rows[-1].id)
+    
+    @staticmethod
+    @traced("session.get")
     def get_session_by_id(session_id: int, user_id: int) -> Optional[ChatSession]:
         """Get a specific chat session by ID for a user."""
         try:
@@ -69,17 +174,48 @@ class ChatService:
             raise DatabaseError(f"Failed to get session: {str(e)}")
     
     @staticmethod
+    @traced("chat.messages")
     def get_session_messages(session_id: int) -> List[ChatMessage]:
         """Get all messages for a chat session."""
+        # Read-your-writes: messages still waiting in this process's journal are written first
+        if message_journal.backlog():
+            message_journal.flush()
         try:
             return (ChatMessage.query
                    .filter_by(session_id=session_id)
-                   .order_by(ChatMessage.created_at.asc())
+                   .order_by(ChatMessage.created_at.asc(), ChatMessage.id.asc())
                    .all())
         except SQLAlchemyError as e:
             raise DatabaseError(f"Failed to get session messages: {str(e)}")
     
     @staticmethod
+    @traced("chat.messages_page")
+    def get_session_messages_page(session_id: int, limit: int = 200,
+                                  cursor: Optional[str] = None) -> Tuple[list, Optional[str]]:
+        """
+        Get one page of a session's messages, oldest first, as rows of ``MESSAGE_COLUMNS``.
+        
+        Pages follow the ``(created_at, id)`` keyset. Returns the rows and the
+        cursor of the next page (``None`` on the last page).
+        """
+        if message_journal.backlog():
+            message_journal.flush()
+        query = select(*MESSAGE_COLUMNS).where(ChatMessage.session_id == session_id)
+        if cursor:
+            query = query.where(tuple_(ChatMessage.created_at, ChatMessage.id) > decode_cursor(cursor))
+        query = query.order_by(ChatMessage.created_at.asc(), ChatMessage.id.asc()).limit(limit + 1)
+        try:
+            rows = db.session.execute(query).all()
+        except SQLAlchemyError as e:
+            raise DatabaseError(f"Failed to get session messages: {str(e)}")
+        
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1].created_at, rows[-1].id)
+    
+    @staticmethod
+    @traced("chat.end_session")
     def end_session(session_id: int, user_id: int) -> bool:
         """End a chat session."""
         try:
@@ -95,12 +231,14 @@ class ChatService:
             raise DatabaseError(f"Failed to end session: {str(e)}")
     
     @staticmethod
+    @traced("session.latest_active")
     def get_latest_active_session(user_id: int) -> Optional[ChatSession]:
         """Get the latest active session for a user."""
         try:
+            # A literal TRUE lets the planner match the partial index predicate
             return (ChatSession.query
-                   .filter_by(user_id=user_id, is_active=True)
-                   .order_by(ChatSession.updated_at.desc())
+                   .filter(ChatSession.user_id == user_id, ChatSession.is_active == true())
+                   .order_by(ChatSession.updated_at.desc(), ChatSession.id.desc())
                    .first())
         except SQLAlchemyError as e:
             raise DatabaseError(f"Failed to get latest active session: {str(e)}")
@@ -0,0 +1,228 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+from app.core.cache import TTLCache
+from app.core.exceptions import ConversationNotReadyError
+from app.core.private_dir import private_directory
+from app.core.tracing import traced
+from app.services.betting_service import BettingService
+from app.services.chat_service import ChatService
+
+
+def apply_answer(facts: list, next_fact_key: Optional[str], answer: str) -> None:
+    """Record ``answer`` for ``next_fact_key``, replacing a previous answer to the same question."""
+    if not next_fact_key:
+        return
+    for fact in facts:
+        if next_fact_key in fact:
+            fact[next_fact_key] = answer
+            return
+    facts.append({next_fact_key: answer})
+
+
+class MemoryStateBackend:
+    """Conversation states kept in this process (LRU with TTL)."""
+
+    def __init__(self, max_size=10000, ttl=3600):
+        self.cache = TTLCache(max_size=max_size, ttl=ttl)
+
+    def get(self, session_id):
+        state = self.cache.get(session_id)
+        # Callers mutate the facts; never hand out the cached objects themselves
+        return json.loads(state) if state is not None else None
+
+    def set(self, session_id, state):
+        self.cache.set(session_id, json.dumps(state))
+
+    def delete(self, session_id):
+        self.cache.delete(session_id)
+
+    def clear(self):
+        self.cache.clear()
+
+
+class SQLiteStateBackend:
+    """
+    Conversation states in a local SQLite file, shared by every worker on the host.
+
+    Each thread (and each forked worker) opens its own connection; the file runs
+    in WAL mode so readers do not block the writer.
+    """
+
+    PRUNE_EVERY = 1000
+
+    def __init__(self, path, ttl=3600):
+        self.path = path
+        self.ttl = ttl
+        self._local = threading.local()
+        self._writes = 0
+
+    def _connection(self):
+        local = self._local
+        if getattr(local, "pid", None) != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS conversation_state ("
+                "session_id INTEGER PRIMARY KEY, state TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            local.connection, local.pid = connection, os.getpid()
+        return local.connection
+
+    def get(self, session_id):
+        row = self._connection().execute(
+            "SELECT state FROM conversation_state WHERE session_id = ? AND expires_at > ?",
+            (session_id, time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, session_id, state):
+        connection = self._connection()
+        now = time.time()
+        connection.execute(
+            "INSERT OR REPLACE INTO conversation_state (session_id, state, expires_at) VALUES (?, ?, ?)",
+            (session_id, json.dumps(state), now + self.ttl)
+        )
+        self._writes += 1
+        if self._writes % self.PRUNE_EVERY == 0:
+            connection.execute("DELETE FROM conversation_state WHERE expires_at <= ?", (now,))
+
+    def delete(self, session_id):
+        self._connection().execute("DELETE FROM conversation_state WHERE session_id = ?", (session_id,))
+
+    def clear(self):
+        self._connection().execute("DELETE FROM conversation_state")
+
+
+class ConversationStore:
+    """
+    Server-side state of the chat conversations, keyed by chat session id.
+
+    A state holds ``user_id``, ``sport``, the answered ``facts``, the
+    ``next_fact`` being asked, ``is_active`` and ``turn`` (answers applied so
+    far), so a chat turn can be scored without reading the session from the
+    database. When a state is missing (expired, evicted or stored by another
+    host) it is rebuilt from the session row and its stored user answers.
+
+    With the per-process ``memory`` backend every worker keeps its own copy,
+    so callers pass the turn the client last saw (kept in the signed cookie):
+    a cached state at any other turn was overtaken by another worker and is
+    rebuilt instead of being used.
+    """
+
+    def __init__(self, app=None):
+        self.backend = MemoryStateBackend()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Choose the backend from ``CONVERSATION_STORE`` ('memory' or 'sqlite')."""
+        kind = app.config.get("CONVERSATION_STORE", "memory")
+        ttl = app.config.get("CONVERSATION_STORE_TTL", 3600)
+        if kind == "memory":
+            self.backend = MemoryStateBackend(app.config.get("CONVERSATION_STORE_SIZE", 10000), ttl)
+        elif kind == "sqlite":
+            # The states are trusted without reading the session row, so nobody else may write them
+            path = app.config.get("CONVERSATION_STORE_PATH") or os.path.join(
+                app.instance_path, "conversations.sqlite3"
+            )
+            directory = os.path.dirname(os.path.abspath(path))
+            if not private_directory(directory, create=True):
+                raise ValueError(f"Conversation store directory '{directory}' must be private to this user")
+            self.backend = SQLiteStateBackend(path, ttl)
+        else:
+            raise ValueError(f"Unknown conversation store '{kind}'")
+
+    def get(self, session_id: int) -> Optional[dict]:
+        """Return the cached state of a session, or ``None``."""
+        return self.backend.get(session_id)
+
+    def put(self, session_id: int, state: dict) -> None:
+        """Store the state of a session."""
+        self.backend.set(session_id, state)
+
+    def discard(self, session_id: int) -> None:
+        """Forget the state of a session."""
+        self.backend.delete(session_id)
+
+    def start(self, session_id: int, user_id: int, sport: str, next_fact: Optional[str]) -> dict:
+        """Store and return the state of a conversation that was just started."""
+        state = {
+            "user_id": user_id,
+            "sport": sport,
+            "facts": [],
+            "next_fact": next_fact,
+            "is_active": True,
+            "turn": 0
+        }
+        self.put(session_id, state)
+        return state
+
+    @traced("session.lookup")
+    def load(self, session_id, user_id: int, turn: Optional[int] = None) -> Optional[dict]:
+        """
+        Return the state of a session owned by ``user_id``.
+
+        ``turn`` is the number of answers the client has seen. The stored state
+        is used only when it is at that turn (or already finished); otherwise,
+        or when ``turn`` is unknown, the state is rebuilt from the database.
+        Returns ``None`` when the session does not exist or belongs to another user.
+        Raises ``ConversationNotReadyError`` when the database is still behind the
+        client, i.e. another worker has not written its last messages yet.
+        """
+        try:
+            session_id = int(session_id)
+        except (TypeError, ValueError):
+            return None
+
+        state = self.get(session_id)
+        if state is not None and state["is_active"] and (turn is None or state.get("turn") != turn):
+            state = None
+        if state is None:
+            state = self.rebuild(session_id, user_id)
+            if state is None:
+                return None
+            if state["is_active"] and turn is not None and state["turn"] < turn:
+                raise ConversationNotReadyError(session_id)
+            self.put(session_id, state)
+        if state["user_id"] != user_id:
+            return None
+        return state
+
+    @staticmethod
+    @traced("session.rebuild")
+    def rebuild(session_id: int, user_id: int) -> Optional[dict]:
+        """Replay the stored user answers of a session to recover its state."""
+        chat_session = ChatService.get_session_by_id(session_id, user_id)
+        if chat_session is None:
+            return None
+
+        state = {
+            "user_id": chat_session.user_id,
+            "sport": chat_session.sport,
+            "facts": [],
+            "next_fact": None,
+            "is_active": chat_session.is_active,
+            "turn": 0
+        }
+        if not chat_session.is_active or not chat_session.sport:
+            return state
+
+        betting_service = BettingService()
+        state["next_fact"] = betting_service.get_betting_advice(chat_session.sport, []).get("next_fact")
+        for message in ChatService.get_session_messages(session_id):
+            if message.role != "user":
+                continue
+            apply_answer(state["facts"], state["next_fact"], message.content)
+            state["turn"] += 1
+            state["next_fact"] = betting_service.get_betting_advice(
+                chat_session.sport, state["facts"]
+            ).get("next_fact")
+        return state
+
+
+conversation_store = ConversationStore()
@@ -0,0 +1,189 @@
+import atexit
+import os
+import queue
+import threading
+import time
+from typing import Optional
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from app.core.exceptions import DatabaseError
+from app.core.extensions import db
+from app.models.chat import ChatMessage
+
+
+class MessageJournal:
+    """
+    Write-behind journal for chat messages.
+
+    Messages are appended to a bounded in-process queue and a background
+    thread bulk-inserts them into ``chat_messages`` (one ``executemany`` per
+    batch) whenever ``CHAT_JOURNAL_BATCH_SIZE`` rows are waiting or
+    ``CHAT_JOURNAL_FLUSH_INTERVAL`` seconds have passed. ``created_at`` is
+    left to the database default, the same clock as the messages written
+    directly; rows are flushed in queue order, so ``(created_at, id)`` still
+    follows the conversation. When the queue is full the message is inserted
+    synchronously instead.
+
+    The queue lives in one process: readers flush it before querying, which
+    only makes this process's own messages visible. Rows queued by another
+    gunicorn worker show up once that worker flushes (the conversation store
+    refuses a turn until then).
+    """
+
+    MAX_RETRIES = 3
+
+    def __init__(self, app=None):
+        self.app = None
+        self.enabled = False
+        self.max_size = 10000
+        self.batch_size = 200
+        self.flush_interval = 0.5
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._stopping = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._retry = []
+        self._in_flight = 0
+        self._attempts = 0
+        self.dropped = 0
+        self._exit_hook = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Configure the journal from the app config and flush it on interpreter exit."""
+        self.app = app
+        self.enabled = bool(app.config.get("CHAT_WRITE_BEHIND"))
+        self.max_size = int(app.config.get("CHAT_JOURNAL_MAX_SIZE", self.max_size))
+        self.batch_size = int(app.config.get("CHAT_JOURNAL_BATCH_SIZE", self.batch_size))
+        self.flush_interval = float(app.config.get("CHAT_JOURNAL_FLUSH_INTERVAL", self.flush_interval))
+        self._queue = queue.Queue(maxsize=self.max_size)
+        self._pid = None
+        if self.enabled and not self._exit_hook:
+            atexit.register(self.close)
+            self._exit_hook = True
+
+    def _ensure_started(self):
+        """Start the flusher thread in this process (threads do not survive a fork)."""
+        if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._pid != os.getpid():
+                # Forked child: rows queued in the parent belong to the parent.
+                self._queue = queue.Queue(maxsize=self.max_size)
+                self._retry = []
+                self._pid = os.getpid()
+                self._thread = None
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping.clear()
+                self._thread = threading.Thread(target=self._run, name="message-journal", daemon=True)
+                self._thread.start()
+
+    def append(self, session_id: int, role: str, content: str, meta: Optional[dict] = None) -> bool:
+        """
+        Queue a message for insertion.
+
+        Returns ``True`` when the message was queued, ``False`` when the queue
+        was full and the message was written synchronously.
+        """
+        row = {
+            "session_id": session_id,
+            "role": role,
+            "content": content,
+            "meta": meta or {},
+        }
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(row)
+            return True
+        except queue.Full:
+            # Keep the conversation order: write what is queued first, then this row.
+            self.flush()
+            try:
+                self._insert([row])
+            except SQLAlchemyError as e:
+                raise DatabaseError(f"Failed to add message: {str(e)}")
+            return False
+
+    def backlog(self) -> int:
+        """Number of messages accepted but not yet written."""
+        if self._queue is None:
+            return 0
+        return self._queue.qsize() + len(self._retry) + self._in_flight
+
+    def _drain(self):
+        # Rows being written still count as backlog until they are committed
+        rows = self._retry
+        self._in_flight = len(rows)
+        self._retry = []
+        while len(rows) < self.batch_size:
+            try:
+                rows.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+            self._in_flight += 1
+        return rows
+
+    def _insert(self, rows):
+        with self.app.app_context():
+            try:
+                db.session.execute(insert(ChatMessage), rows)
+                db.session.commit()
+            except SQLAlchemyError:
+                db.session.rollback()
+                raise
+            finally:
+                db.session.remove()
+
+    def flush(self) -> int:
+        """Write every queued message now. Returns the number of rows written."""
+        if self._queue is None:
+            return 0
+        written = 0
+        with self._flush_lock:
+            while True:
+                rows = self._drain()
+                if not rows:
+                    self._in_flight = 0
+                    return written
+                try:
+                    self._insert(rows)
+                except SQLAlchemyError:
+                    self._attempts += 1
+                    if self._attempts < self.MAX_RETRIES:
+                        self.app.logger.exception("Message journal flush failed, will retry")
+                        self._retry = rows
+                    else:
+                        self.app.logger.exception(f"Message journal dropped {len(rows)} messages")
+                        self.dropped += len(rows)
+                        self._attempts = 0
+                    return written
+                finally:
+                    self._in_flight = 0
+                self._attempts = 0
+                written += len(rows)
+
+    def _run(self):
+        while not self._stopping.is_set():
+            deadline = time.monotonic() + self.flush_interval
+            while self.backlog() < self.batch_size and not self._stopping.is_set():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._stopping.wait(min(remaining, 0.05))
+            if self.backlog():
+                self.flush()
+
+    def close(self):
+        """Stop the flusher thread and write what is left."""
+        self._stopping.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive() and thread is not threading.current_thread():
+            thread.join(timeout=5)
+        if self.app is not None and self._pid == os.getpid():
+            self.flush()
+
+
+message_journal = MessageJournal()
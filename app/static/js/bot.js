@@ -88,6 +88,14 @@ async function sendMessage() {
     // Reemplazar el mensaje de carga con la respuesta real
     loadingMsg.textContent = data.message;
 
+    // Estimación parcial con las respuestas dadas hasta ahora
+    if (!data.finished && data.safe_probability != null) {
+      const estimate = document.createElement("small");
+      estimate.className = "text-muted d-block";
+      estimate.textContent = `Probabilidad de éxito hasta ahora: ${(data.safe_probability * 100).toFixed(1)}%`;
+      loadingMsg.appendChild(estimate);
+    }
+
     if (data.finished) {
       sendBtn.disabled = true;
       document.getElementById("restartBtn").style.display = "inline-block";
@@ -126,16 +134,18 @@ window.addEventListener("DOMContentLoaded", () => {
 // =========================
 // Historial
 // =========================
-async function refreshHistory() {
+async function refreshHistory(cursor = null) {
   try {
-    const resp = await fetch("/bot/history");
+    const url = cursor ? `/bot/history?cursor=${encodeURIComponent(cursor)}` : "/bot/history";
+    const resp = await fetch(url);
     if (!resp.ok) return;
 
-    const sessions = await resp.json();
+    const data = await resp.json();
+    const sessions = data.sessions || [];
     const ul = document.getElementById("historyList");
-    ul.innerHTML = "";
+    if (!cursor) ul.innerHTML = "";
 
-    if (!Array.isArray(sessions) || sessions.length === 0) {
+    if (!cursor && sessions.length === 0) {
       const li = document.createElement("li");
       li.className = "list-group-item";
       li.textContent = "No hay conversaciones aún.";
@@ -160,6 +170,19 @@ async function refreshHistory() {
       li.onclick = () => loadSession(s.id);
       ul.appendChild(li);
     });
+
+    // Siguiente página bajo demanda
+    if (data.next_cursor) {
+      const more = document.createElement("li");
+      more.className = "list-group-item list-group-item-action text-center";
+      more.textContent = "Ver más";
+      more.style.cursor = "pointer";
+      more.onclick = () => {
+        more.remove();
+        refreshHistory(data.next_cursor);
+      };
+      ul.appendChild(more);
+    }
   } catch (e) {
     console.error("Error cargando historial:", e);
   }
@@ -167,13 +190,23 @@ async function refreshHistory() {
 
 async function loadSession(sessionId) {
   try {
-    const resp = await fetch(`/bot/history/${sessionId}`);
+    let resp = await fetch(`/bot/history/${sessionId}`);
     const data = await resp.json();
     if (!resp.ok) {
       alert(data.error || "No se pudo cargar la sesión");
       return;
     }
 
+    // Trae las páginas restantes de mensajes
+    let cursor = data.next_cursor;
+    while (cursor) {
+      resp = await fetch(`/bot/history/${sessionId}?cursor=${encodeURIComponent(cursor)}`);
+      if (!resp.ok) break;
+      const page = await resp.json();
+      data.messages = data.messages.concat(page.messages || []);
+      cursor = page.next_cursor;
+    }
+
     CURRENT_SESSION_ID = data.session.id;
 
     // Reemplazar contenido del chat por el historial de esa sesión
@@ -1,7 +1,7 @@
 import os
 from app.config.base import Config as BaseConfig
 from app.config.development import DevelopmentConfig
-from app.config.production import ProductionConfig
+from app.config.production import ProductionConfig, DirectProductionConfig, PoolerProductionConfig
 from app.config.testing import TestingConfig
 
 # Default configuration for backwards compatibility
@@ -11,6 +11,8 @@ Config = BaseConfig
 config = {
     'development': DevelopmentConfig,
     'production': ProductionConfig,
+    'production-direct': DirectProductionConfig,
+    'production-pooler': PoolerProductionConfig,
     'testing': TestingConfig,
     'default': Config
 }
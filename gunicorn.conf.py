@@ -0,0 +1,27 @@
+import os
+
+# Gunicorn configuration: gunicorn -c gunicorn.conf.py run:app
+bind = f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+threads = int(os.getenv("GUNICORN_THREADS", "1"))
+
+# Load the app (and its Bayesian networks, see PRELOAD_AI_MODELS) in the
+# master so forked workers share them copy-on-write and start immediately.
+preload_app = True
+
+# Never start the warmup thread in the master: a thread holding a lock at
+# fork time would leave that lock held forever in the workers.
+os.environ.setdefault("AI_WARMUP", "post_fork")
+
+
+def post_fork(server, worker):
+    """Warm the AI stack in each worker (a no-op for what the master preloaded)."""
+    if os.getenv("AI_WARMUP") == "post_fork":
+        from app.ai.warmup import warmup
+        warmup.start(recommendations=os.getenv("WARM_RECOMMENDATION_CACHE", "false").lower() in ("1", "true", "yes"))
+
+
+def worker_exit(server, worker):
+    """Write the chat messages still queued in the worker before it exits."""
+    from app.services.message_journal import message_journal
+    message_journal.close()
@@ -0,0 +1,48 @@
+"""add chat indexes
+
+Revision ID: 3b9d4c2e7f10
+Revises: 74442a65ef09
+Create Date: 2026-10-18 10:12:40.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b9d4c2e7f10'
+down_revision = '74442a65ef09'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Built CONCURRENTLY on Postgres so the chat tables stay writable meanwhile
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_chat_sessions_user_updated', 'chat_sessions',
+            ['user_id', sa.text('updated_at DESC'), sa.text('id DESC')],
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        op.create_index(
+            'ix_chat_sessions_user_active_updated', 'chat_sessions',
+            ['user_id', sa.text('updated_at DESC'), sa.text('id DESC')],
+            postgresql_where=sa.text('is_active = true'),
+            sqlite_where=sa.text('is_active = 1'),
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        op.create_index(
+            'ix_chat_messages_session_created', 'chat_messages',
+            ['session_id', 'created_at', 'id'],
+            postgresql_concurrently=True, if_not_exists=True
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_chat_messages_session_created', table_name='chat_messages',
+                      postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_chat_sessions_user_active_updated', table_name='chat_sessions',
+                      postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_chat_sessions_user_updated', table_name='chat_sessions',
+                      postgresql_concurrently=True, if_exists=True)
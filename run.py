@@ -6,9 +6,11 @@ from config import get_config
 # Load environment variables
 load_dotenv()
 
-# Create app with appropriate configuration
-config_class = get_config()
-app = create_app(config_class)
+# Create app with appropriate configuration. The password hashing processes
+# (spawn) re-import this module as __mp_main__ and need no app of their own.
+if __name__ != '__mp_main__':
+    config_class = get_config()
+    app = create_app(config_class)
 
 if __name__ == '__main__':
     # Development server
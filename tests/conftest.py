@@ -0,0 +1,68 @@
+import pytest
+from sqlalchemy import event
+from app import create_app
+from app.config import TestingConfig
+from app.core.extensions import db
+from app.models import User
+
+
+class DatabaseTestingConfig(TestingConfig):
+    """Testing configuration backed by an in-memory SQLite database."""
+    
+    WTF_CSRF_ENABLED = False
+    BCRYPT_LOG_ROUNDS = 4
+
+
+@pytest.fixture
+def app():
+    """Create an app with a fresh in-memory database."""
+    app = create_app(DatabaseTestingConfig)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def user(app):
+    """Create a registered user."""
+    user = User(username='tester')
+    user.set_password('secret123')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+@pytest.fixture
+def client(app, user):
+    """Create a test client logged in as ``user``."""
+    client = app.test_client()
+    client.post('/auth/login', data={'username': 'tester', 'password': 'secret123'})
+    return client
+
+
+@pytest.fixture
+def statements(app):
+    """Collect the SQL statements sent to the database."""
+    sent = []
+    
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        sent.append(statement)
+    
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    yield sent
+    event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+
+@pytest.fixture
+def commits(app):
+    """Count the transactions committed on the engine."""
+    counter = {'commits': 0}
+    
+    def on_commit(conn):
+        counter['commits'] += 1
+    
+    event.listen(db.engine, 'commit', on_commit)
+    yield counter
+    event.remove(db.engine, 'commit', on_commit)
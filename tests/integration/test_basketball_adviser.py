@@ -1,6 +1,6 @@
 import pytest
-from app.models.basketball.expert_system import BasketballExpert, SPANISH_MAP
-from app.models.basketball.bayesian_net import BasketballBayesianNetwork
+from app.ai.models.expert_systems.basketball_expert import BasketballExpert, SPANISH_MAP
+from app.ai.models.bayesian.basketball_bayesian_net import BasketballBayesianNetwork
 import re
 
 class TestBasketballAdviser:
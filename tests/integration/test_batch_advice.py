@@ -0,0 +1,115 @@
+import random
+import pytest
+from app import create_app
+from app.config import TestingConfig
+from app.ai.batch_scorer import BatchScorer
+from app.ai.betting_adviser import BettingAdviser
+from app.ai.models.expert_systems.soccer_expert import SPANISH_MAP as SOCCER_MAP
+from app.ai.models.expert_systems.basketball_expert import SPANISH_MAP as BASKETBALL_MAP
+
+SPORT_MAPS = {'soccer': SOCCER_MAP, 'basketball': BASKETBALL_MAP}
+
+def random_match(sport, rng):
+    """Build one fully specified match with Spanish answers."""
+    return {key: rng.choice(list(options)) for key, options in SPORT_MAPS[sport].items()}
+
+class TestBatchScorer:
+    
+    @pytest.mark.parametrize('sport', ['soccer', 'basketball'])
+    def test_batch_matches_conversational_advice(self, sport):
+        """Test that batch scores agree with the final chat recommendation."""
+        rng = random.Random(3)
+        matches = [random_match(sport, rng) for _ in range(100)]
+        results = BatchScorer.for_sport(sport).score(matches)
+        adviser = BettingAdviser(sport)
+        
+        for match, result in zip(matches, results):
+            message = adviser.get_betting_advice([{k: v} for k, v in match.items()])['message']
+            label_es = 'segura' if result['label'] == 'safe' else 'arriesgada'
+            assert f"**{label_es}**" in message
+            assert f"del {round(result['safe_probability'] * 100, 2)}%" in message
+    
+    def test_canonical_states_are_accepted(self):
+        """Test that network state names can be used instead of Spanish answers."""
+        scorer = BatchScorer.for_sport('basketball')
+        spanish = {key: list(options)[0] for key, options in BASKETBALL_MAP.items()}
+        canonical = {key: BASKETBALL_MAP[key][value] for key, value in spanish.items()}
+        assert scorer.score([spanish]) == scorer.score([canonical])
+    
+    def test_invalid_rows_are_reported(self):
+        """Test that invalid rows get an error without affecting the others."""
+        scorer = BatchScorer.for_sport('soccer')
+        good = {key: list(options)[0] for key, options in SOCCER_MAP.items()}
+        bad = dict(good, weather='tormenta')
+        missing = {k: v for k, v in good.items() if k != 'rivalry'}
+        
+        results = scorer.score([good, bad, missing, 'not a match'])
+        assert 'label' in results[0]
+        assert 'weather' in results[1]['error']
+        assert 'rivalry' in results[2]['error']
+        assert 'error' in results[3]
+    
+    def test_non_string_answers_are_invalid(self):
+        """Test that nested, ragged or numeric answers only invalidate their own row."""
+        scorer = BatchScorer.for_sport('soccer')
+        good = {key: list(options)[0] for key, options in SOCCER_MAP.items()}
+        
+        results = scorer.score([dict(good, injuries=['a', ['b']]), dict(good, weather={'x': 1}),
+                                dict(good, rivalry=1), good])
+        assert 'injuries' in results[0]['error']
+        assert 'weather' in results[1]['error']
+        assert 'rivalry' in results[2]['error']
+        assert 'label' in results[3]
+    
+    def test_empty_batch(self):
+        """Test that an empty batch returns no results."""
+        assert BatchScorer.for_sport('soccer').score([]) == []
+
+class TestBatchAdviceRoute:
+    
+    @pytest.fixture
+    def client(self):
+        """Create a test client with login checks disabled."""
+        class Config(TestingConfig):
+            LOGIN_DISABLED = True
+            WTF_CSRF_ENABLED = False
+        return create_app(Config).test_client()
+    
+    def test_scores_both_sports(self, client):
+        """Test that the endpoint returns one result per match and sport."""
+        rng = random.Random(5)
+        response = client.post('/bot/advice/batch', json={
+            'soccer': [random_match('soccer', rng) for _ in range(3)],
+            'basketball': [random_match('basketball', rng) for _ in range(2)]
+        })
+        assert response.status_code == 200
+        data = response.get_json()
+        assert len(data['soccer']) == 3
+        assert len(data['basketball']) == 2
+        assert all(0 <= r['safe_probability'] <= 1 for r in data['soccer'] + data['basketball'])
+    
+    def test_rejects_unknown_sport(self, client):
+        """Test that unsupported sports are rejected."""
+        response = client.post('/bot/advice/batch', json={'tennis': []})
+        assert response.status_code == 400
+    
+    def test_rejects_non_list_payload(self, client):
+        """Test that each sport must map to a list of matches."""
+        response = client.post('/bot/advice/batch', json={'soccer': {}})
+        assert response.status_code == 400
+    
+    def test_malformed_match_is_not_a_chat_fallback(self, client):
+        """Test that a nested answer is reported per row instead of failing the whole request."""
+        response = client.post('/bot/advice/batch', json={'soccer': [{'injuries': ['a', ['b']]}]})
+        assert response.status_code == 200
+        assert 'injuries' in response.get_json()['soccer'][0]['error']
+    
+    def test_engine_failure_is_a_server_error(self, client, monkeypatch):
+        """Test that a scoring failure returns 500 rather than the chat placeholder."""
+        def broken(self, matches):
+            raise RuntimeError('boom')
+        
+        monkeypatch.setattr(BatchScorer, 'score', broken)
+        response = client.post('/bot/advice/batch', json={'soccer': [{}]})
+        assert response.status_code == 500
+        assert response.get_json()['error'] == 'expert_system_error'
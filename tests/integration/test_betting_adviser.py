@@ -0,0 +1,64 @@
+import random
+import concurrent.futures
+import pytest
+from app.ai.betting_adviser import BettingAdviser, ExpertPool
+from app.ai.models.expert_systems.soccer_expert import SPANISH_MAP as SOCCER_MAP
+from app.ai.models.expert_systems.basketball_expert import SPANISH_MAP as BASKETBALL_MAP
+
+SPORT_MAPS = {'soccer': SOCCER_MAP, 'basketball': BASKETBALL_MAP}
+
+def random_conversation(sport, rng):
+    """Build a random, possibly partial, list of answered facts."""
+    answers = [{key: rng.choice(list(options))} for key, options in SPORT_MAPS[sport].items()]
+    return answers[:rng.randint(0, len(answers))]
+
+class TestBettingAdviser:
+    
+    def test_adviser_is_shared_per_sport(self):
+        """Test that one adviser instance is kept per sport."""
+        assert BettingAdviser('soccer') is BettingAdviser('SOCCER')
+        assert BettingAdviser('soccer') is not BettingAdviser('basketball')
+    
+    def test_unsupported_sport_is_not_cached(self):
+        """Test that a failed adviser creation is not kept as a broken instance."""
+        with pytest.raises(ValueError):
+            BettingAdviser('tennis')
+        assert 'tennis' not in BettingAdviser._instances
+    
+    def test_engines_share_the_network(self):
+        """Test that pooled engines reuse the same Bayesian network."""
+        adviser = BettingAdviser('soccer')
+        with adviser.experts.checkout() as first, adviser.experts.checkout() as second:
+            assert first is not second
+            assert first.bayes_net is second.bayes_net
+    
+    @pytest.mark.parametrize('sport', ['soccer', 'basketball'])
+    def test_concurrent_advice_matches_sequential(self, sport):
+        """Test that concurrent advice calls return the same answers as sequential ones."""
+        rng = random.Random(42)
+        adviser = BettingAdviser(sport)
+        conversations = [random_conversation(sport, rng) for _ in range(200)]
+        expected = [adviser.get_betting_advice(facts) for facts in conversations]
+        
+        with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(adviser.get_betting_advice, conversations))
+        
+        assert results == expected
+
+class TestExpertPool:
+    
+    def test_checkout_reuses_returned_engines(self):
+        """Test that engines are returned to the pool after use."""
+        pool = ExpertPool(object)
+        with pool.checkout() as engine:
+            assert len(pool) == 0
+        assert len(pool) == 1
+        with pool.checkout() as again:
+            assert again is engine
+    
+    def test_pool_drops_engines_beyond_max_idle(self):
+        """Test that the pool keeps at most max_idle engines."""
+        pool = ExpertPool(object, max_idle=1)
+        pool.checkin(object())
+        pool.checkin(object())
+        assert len(pool) == 1
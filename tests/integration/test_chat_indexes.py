@@ -0,0 +1,72 @@
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import event, text
+from app.core.extensions import db
+from app.models import ChatSession, ChatMessage
+from app.services.chat_service import ChatService
+
+@pytest.fixture
+def history(user):
+    """Create a few sessions with messages, ending sessions along the way."""
+    start = datetime(2025, 1, 1)
+    sessions = []
+    for i in range(20):
+        session = ChatSession(user_id=user.id, sport='soccer', is_active=i % 4 == 0,
+                              updated_at=start + timedelta(minutes=i))
+        session.messages = [ChatMessage(role='user', content=str(j), meta={},
+                                        created_at=start + timedelta(seconds=j)) for j in range(5)]
+        db.session.add(session)
+        sessions.append(session)
+    db.session.commit()
+    db.session.execute(text('ANALYZE'))
+    return sessions
+
+@pytest.fixture
+def captured(app):
+    """Collect the SELECT statements and parameters sent to the database."""
+    sent = []
+    
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            sent.append((statement, parameters))
+    
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    yield sent
+    event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+def query_plan(statement, parameters):
+    """Return the EXPLAIN QUERY PLAN details of a captured statement."""
+    connection = db.session.connection().connection
+    rows = connection.execute(f'EXPLAIN QUERY PLAN {statement}', parameters).fetchall()
+    return [row[-1] for row in rows]
+
+class TestChatQueriesUseIndexes:
+    
+    @pytest.mark.parametrize('call,index', [
+        (lambda user_id, session_id: ChatService.get_latest_active_session(user_id), 'ix_chat_sessions_user_active_updated'),
+        (lambda user_id, session_id: ChatService.get_user_sessions(user_id), 'ix_chat_sessions_user_updated'),
+        (lambda user_id, session_id: ChatService.get_user_sessions_page(user_id, limit=5), 'ix_chat_sessions_user_updated'),
+        (lambda user_id, session_id: ChatService.get_session_messages(session_id), 'ix_chat_messages_session_created'),
+        (lambda user_id, session_id: ChatService.get_session_messages_page(session_id, limit=2), 'ix_chat_messages_session_created'),
+    ])
+    def test_query_uses_index(self, user, history, captured, call, index):
+        """Test that the chat lookups search an index instead of scanning and sorting the table."""
+        user_id, session_id = user.id, history[3].id
+        captured.clear()
+        call(user_id, session_id)
+        
+        assert len(captured) == 1
+        plan = query_plan(*captured[0])
+        assert any(index in step for step in plan), plan
+        assert not any(step.startswith('SCAN chat_') for step in plan), plan
+        assert not any('TEMP B-TREE' in step for step in plan), plan
+    
+    def test_paged_query_uses_index_after_cursor(self, user, history, captured):
+        """Test that following a cursor keeps using the keyset index."""
+        user_id = user.id
+        _, cursor = ChatService.get_user_sessions_page(user_id, limit=5)
+        ChatService.get_user_sessions_page(user_id, limit=5, cursor=cursor)
+        
+        plan = query_plan(*captured[-1])
+        assert any('ix_chat_sessions_user_updated' in step for step in plan), plan
+        assert not any('TEMP B-TREE' in step for step in plan), plan
@@ -0,0 +1,38 @@
+import pytest
+from app.core.extensions import db
+from app.models import ChatSession, ChatMessage
+from app.services.chat_service import ChatService
+
+class TestStartSessionWithMessages:
+    
+    def test_creates_session_and_messages_in_one_commit(self, user, commits):
+        """Test that the session and its opening messages share a transaction."""
+        session_id = ChatService.start_session_with_messages(
+            user.id, 'soccer', 'Soccer • tester',
+            messages=[('assistant', 'Has seleccionado Soccer.'), ('assistant', '¿El equipo juega en casa?')]
+        )
+        
+        assert commits['commits'] == 1
+        session = db.session.get(ChatSession, session_id)
+        assert session.user_id == user.id
+        assert session.is_active
+        messages = ChatService.get_session_messages(session_id)
+        assert [m.content for m in messages] == ['Has seleccionado Soccer.', '¿El equipo juega en casa?']
+    
+    def test_default_title(self, user):
+        """Test that a default title is used when none is given."""
+        session_id = ChatService.start_session_with_messages(user.id, 'basketball')
+        assert db.session.get(ChatSession, session_id).title == 'Basketball • Usuario'
+        assert ChatMessage.query.count() == 0
+
+class TestSelectSportRoute:
+    
+    def test_select_sport_starts_session(self, client, commits):
+        """Test that selecting a sport stores the session and both opening messages."""
+        response = client.post('/bot/select_sport', json={'sport': 'soccer'})
+        
+        assert response.status_code == 200
+        data = response.get_json()
+        assert commits['commits'] == 1
+        messages = ChatService.get_session_messages(data['session_id'])
+        assert [m.content for m in messages] == [data['message'], data['next_message']]
@@ -0,0 +1,187 @@
+import os
+import pytest
+from flask import Flask
+from app.ai.models.expert_systems.soccer_expert import SPANISH_MAP
+from app.core.extensions import db
+from app.models import User, ChatSession, ChatMessage
+from app.services.conversation_store import (
+    conversation_store, ConversationStore, MemoryStateBackend, SQLiteStateBackend, apply_answer
+)
+
+def first_answer(key):
+    """Return a valid Spanish answer for a soccer question."""
+    return next(iter(SPANISH_MAP[key]))
+
+@pytest.fixture
+def started(client):
+    """Start a soccer conversation and return its session id."""
+    return client.post('/bot/select_sport', json={'sport': 'soccer'}).get_json()['session_id']
+
+def answer(client, session_id, user):
+    """Answer the pending question of a conversation with a valid value."""
+    key = conversation_store.get(session_id)['next_fact']
+    return client.post('/bot/get_response', json={'message': first_answer(key), 'session_id': session_id})
+
+class TestApplyAnswer:
+    
+    def test_appends_new_answer(self):
+        """Test that an answer to a new question is appended."""
+        facts = [{'home_advantage': 'sí'}]
+        apply_answer(facts, 'injuries', 'no')
+        assert facts == [{'home_advantage': 'sí'}, {'injuries': 'no'}]
+    
+    def test_replaces_previous_answer(self):
+        """Test that answering the same question again replaces the answer."""
+        facts = [{'home_advantage': 'quizás'}]
+        apply_answer(facts, 'home_advantage', 'sí')
+        assert facts == [{'home_advantage': 'sí'}]
+
+class TestConversationState:
+    
+    def test_select_sport_stores_state(self, started, user):
+        """Test that starting a conversation stores its state server-side."""
+        state = conversation_store.get(started)
+        assert state == {
+            'user_id': user.id, 'sport': 'soccer', 'facts': [],
+            'next_fact': 'home_advantage', 'is_active': True, 'turn': 0
+        }
+    
+    def test_turn_reads_no_chat_session(self, client, started, user, statements):
+        """Test that a turn with a cached state does not read the chat session."""
+        response = answer(client, started, user)
+        
+        assert response.status_code == 200
+        assert not any(s.startswith('SELECT') and 'chat_sessions' in s for s in statements)
+        assert conversation_store.get(started)['facts'] == [{'home_advantage': 'sí'}]
+    
+    def test_cookie_does_not_grow(self, client, started, user, app):
+        """Test that the session cookie keeps only the chat session id."""
+        for _ in range(3):
+            answer(client, started, user)
+        
+        cookie = client.get_cookie('session').value
+        data = app.session_interface.get_signing_serializer(app).loads(cookie)
+        assert 'facts' not in data
+        assert (data['chat_session_id'], data['chat_turn']) == (started, 3)
+    
+    def test_full_conversation_ends_session(self, client, started, user):
+        """Test that the final answer marks the state and the session as finished."""
+        response = None
+        while conversation_store.get(started)['is_active']:
+            response = answer(client, started, user)
+        
+        assert response.get_json()['finished']
+        assert not db.session.get(ChatSession, started).is_active
+        again = client.post('/bot/get_response', json={'message': 'sí', 'session_id': started}).get_json()
+        assert again['finished']
+    
+    def test_state_is_rebuilt_from_stored_answers(self, client, started, user):
+        """Test that a lost state is recovered by replaying the user's answers."""
+        client.post('/bot/get_response', json={'message': 'tal vez', 'session_id': started})
+        for _ in range(3):
+            answer(client, started, user)
+        expected = conversation_store.get(started)
+        
+        conversation_store.discard(started)
+        assert conversation_store.load(started, user.id) == expected
+    
+    def test_other_users_session_is_not_found(self, client, started, user):
+        """Test that a session cannot be continued by another user."""
+        other = User(username='other')
+        other.set_password('secret123')
+        db.session.add(other)
+        db.session.commit()
+        
+        assert conversation_store.load(started, other.id) is None
+        conversation_store.discard(started)
+        assert conversation_store.load(started, other.id) is None
+    
+    def test_cookie_session_is_used_without_explicit_id(self, client, started, user):
+        """Test that the session remembered in the cookie is continued when no id is sent."""
+        response = client.post('/bot/get_response', json={'message': 'sí'})
+        assert response.get_json()['session_id'] == started
+
+class TestSeveralWorkers:
+    """Two workers with their own memory backend serve the same client in turns."""
+    
+    @pytest.fixture
+    def workers(self):
+        original = conversation_store.backend
+        yield MemoryStateBackend(), MemoryStateBackend()
+        conversation_store.backend = original
+    
+    def on(self, worker, client, session_id, message):
+        """Send one chat turn to ``worker``."""
+        conversation_store.backend = worker
+        return client.post('/bot/get_response', json={'message': message, 'session_id': session_id})
+    
+    def test_stale_state_is_not_reused(self, client, user, workers):
+        """Test that a worker rebuilds its copy when another worker has answered in between."""
+        worker_a, worker_b = workers
+        conversation_store.backend = worker_a
+        session_id = client.post('/bot/select_sport', json={'sport': 'soccer'}).get_json()['session_id']
+        
+        self.on(worker_a, client, session_id, 'sí')
+        self.on(worker_b, client, session_id, 'no')
+        assert worker_a.get(session_id)['turn'] == 1
+        response = self.on(worker_a, client, session_id, first_answer(worker_b.get(session_id)['next_fact']))
+        
+        assert response.status_code == 200
+        state = worker_a.get(session_id)
+        assert state['turn'] == 3
+        assert state['facts'][:2] == [{'home_advantage': 'sí'}, {'injuries': 'no'}]
+        assert state == ConversationStore.rebuild(session_id, user.id)
+    
+    def test_unwritten_turn_is_retried(self, client, user, workers):
+        """Test that a turn is refused with 503 while the other worker's answer is not stored yet."""
+        worker_a, worker_b = workers
+        conversation_store.backend = worker_a
+        session_id = client.post('/bot/select_sport', json={'sport': 'soccer'}).get_json()['session_id']
+        self.on(worker_a, client, session_id, 'sí')
+        
+        # The answer of turn 1 is still queued in worker A's journal
+        last = ChatMessage.query.filter_by(session_id=session_id, role='user').one()
+        db.session.delete(last)
+        db.session.commit()
+        response = self.on(worker_b, client, session_id, 'no')
+        
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '1'
+        assert worker_b.get(session_id) is None
+
+class TestSQLiteStateBackend:
+    
+    def test_states_are_shared_between_stores(self, tmp_path):
+        """Test that two stores using the same file see each other's states."""
+        path = str(tmp_path / 'states.sqlite3')
+        writer, reader = ConversationStore(), ConversationStore()
+        writer.backend, reader.backend = SQLiteStateBackend(path), SQLiteStateBackend(path)
+        
+        writer.put(7, {'user_id': 1, 'facts': [{'injuries': 'no'}]})
+        assert reader.get(7) == {'user_id': 1, 'facts': [{'injuries': 'no'}]}
+        reader.discard(7)
+        assert writer.get(7) is None
+    
+    def test_store_defaults_to_instance_folder(self, tmp_path):
+        """Test that the SQLite states go to a private file in the instance folder, not a shared temp directory."""
+        app = Flask(__name__, instance_path=str(tmp_path / 'instance'))
+        app.config['CONVERSATION_STORE'] = 'sqlite'
+        store = ConversationStore(app)
+        
+        assert store.backend.path == os.path.join(str(tmp_path / 'instance'), 'conversations.sqlite3')
+        assert os.stat(tmp_path / 'instance').st_mode & 0o777 == 0o700
+    
+    def test_shared_directory_is_refused(self, tmp_path):
+        """Test that a states file in a directory other users can write to is refused."""
+        os.chmod(tmp_path, 0o777)
+        app = Flask(__name__)
+        app.config.update(CONVERSATION_STORE='sqlite', CONVERSATION_STORE_PATH=str(tmp_path / 'states.sqlite3'))
+        
+        with pytest.raises(ValueError, match='must be private'):
+            ConversationStore(app)
+    
+    def test_states_expire(self, tmp_path):
+        """Test that expired states are not returned."""
+        backend = SQLiteStateBackend(str(tmp_path / 'states.sqlite3'), ttl=-1)
+        backend.set(1, {'user_id': 1})
+        assert backend.get(1) is None
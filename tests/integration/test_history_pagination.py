@@ -0,0 +1,105 @@
+from datetime import datetime, timedelta
+import pytest
+from app.core.extensions import db
+from app.core.exceptions import ValidationError
+from app.models import ChatSession, ChatMessage
+from app.services.chat_service import ChatService, encode_cursor, decode_cursor
+
+BASE_TIME = datetime(2025, 1, 1, 12, 0, 0)
+
+@pytest.fixture
+def sessions(user):
+    """Create sessions whose update times include ties."""
+    created = []
+    for i in range(7):
+        stamp = BASE_TIME + timedelta(minutes=i // 2)
+        session = ChatSession(user_id=user.id, sport='soccer', title=f'Sesión {i}',
+                              created_at=stamp, updated_at=stamp)
+        db.session.add(session)
+        created.append(session)
+    db.session.commit()
+    return sorted(created, key=lambda s: (s.updated_at, s.id), reverse=True)
+
+@pytest.fixture
+def messages(sessions):
+    """Add messages with tied creation times to the newest session."""
+    session = sessions[0]
+    for i in range(9):
+        db.session.add(ChatMessage(session_id=session.id, role='user', content=f'mensaje {i}',
+                                   meta={'turn': i}, created_at=BASE_TIME + timedelta(seconds=i // 3)))
+    db.session.commit()
+    return session
+
+class TestCursor:
+    
+    def test_round_trip(self):
+        """Test that a cursor decodes to the position it encodes."""
+        assert decode_cursor(encode_cursor(BASE_TIME, 42)) == (BASE_TIME, 42)
+    
+    @pytest.mark.parametrize('cursor', ['%%%', 'bm9wZQ', encode_cursor(BASE_TIME, 1)[:-3]])
+    def test_invalid_cursor(self, cursor):
+        """Test that malformed cursors raise a validation error."""
+        with pytest.raises(ValidationError):
+            decode_cursor(cursor)
+
+class TestSessionPages:
+    
+    def test_pages_cover_every_session_once(self, user, sessions):
+        """Test that walking the pages returns every session once, newest first."""
+        seen, cursor = [], None
+        while True:
+            rows, cursor = ChatService.get_user_sessions_page(user.id, limit=2, cursor=cursor)
+            assert len(rows) <= 2
+            seen.extend(row.id for row in rows)
+            if cursor is None:
+                break
+        
+        assert seen == [s.id for s in sessions]
+    
+    def test_last_page_has_no_cursor(self, user, sessions):
+        """Test that a page holding the remaining rows ends the pagination."""
+        rows, cursor = ChatService.get_user_sessions_page(user.id, limit=len(sessions))
+        assert len(rows) == len(sessions)
+        assert cursor is None
+
+class TestMessagePages:
+    
+    def test_pages_cover_every_message_in_order(self, messages):
+        """Test that walking the pages returns every message once, oldest first."""
+        seen, cursor = [], None
+        while True:
+            rows, cursor = ChatService.get_session_messages_page(messages.id, limit=4, cursor=cursor)
+            seen.extend(row.content for row in rows)
+            if cursor is None:
+                break
+        
+        assert seen == [f'mensaje {i}' for i in range(9)]
+    
+    def test_meta_is_not_loaded(self, messages, statements):
+        """Test that the page query only selects the serialized columns."""
+        ChatService.get_session_messages_page(messages.id, limit=4)
+        assert not any('meta' in statement for statement in statements)
+
+class TestHistoryRoutes:
+    
+    def test_history_pages(self, client, sessions):
+        """Test that /bot/history returns pages and a next cursor."""
+        first = client.get('/bot/history?limit=5').get_json()
+        second = client.get(f"/bot/history?limit=5&cursor={first['next_cursor']}").get_json()
+        
+        assert [s['id'] for s in first['sessions'] + second['sessions']] == [s.id for s in sessions]
+        assert second['next_cursor'] is None
+    
+    def test_session_history_pages(self, client, messages):
+        """Test that /bot/history/<id> returns a page of messages and a next cursor."""
+        data = client.get(f'/bot/history/{messages.id}?limit=5').get_json()
+        
+        assert data['session']['id'] == messages.id
+        assert [m['content'] for m in data['messages']] == [f'mensaje {i}' for i in range(5)]
+        assert data['next_cursor']
+    
+    @pytest.mark.parametrize('query', ['limit=0', 'limit=1000', 'limit=abc', 'cursor=%25%25'])
+    def test_invalid_page_arguments(self, client, sessions, query):
+        """Test that invalid limits and cursors are rejected."""
+        response = client.get(f'/bot/history?{query}')
+        assert response.status_code == 400
@@ -0,0 +1,134 @@
+import time
+from datetime import timedelta
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.exc import OperationalError
+from app.core.exceptions import DatabaseError
+from app.core.extensions import db
+from app.models import ChatMessage
+from app.services.chat_service import ChatService
+from app.services.message_journal import MessageJournal, message_journal
+
+@pytest.fixture
+def chat_id(user):
+    """Create an empty chat session."""
+    return ChatService.start_session_with_messages(user.id, 'soccer')
+
+@pytest.fixture
+def journal(app):
+    """Create a write-behind journal that only flushes when asked to."""
+    app.config.update(CHAT_WRITE_BEHIND=True, CHAT_JOURNAL_BATCH_SIZE=1000, CHAT_JOURNAL_FLUSH_INTERVAL=60)
+    journal = MessageJournal(app)
+    yield journal
+    journal.close()
+
+class TestMessageJournal:
+    
+    def test_messages_wait_in_backlog_until_flush(self, journal, chat_id):
+        """Test that queued messages are not written until the journal flushes."""
+        assert journal.append(chat_id, 'user', 'sí')
+        assert journal.append(chat_id, 'assistant', '¿Hay lesiones?')
+        
+        assert journal.backlog() == 2
+        assert ChatMessage.query.count() == 0
+    
+    def test_flush_writes_batch_in_one_commit(self, journal, chat_id, commits):
+        """Test that a flush inserts all queued rows, in order, in a single commit."""
+        for i in range(50):
+            journal.append(chat_id, 'user', f'mensaje {i}')
+        
+        assert journal.flush() == 50
+        assert commits['commits'] == 1
+        assert journal.backlog() == 0
+        messages = ChatService.get_session_messages(chat_id)
+        assert [m.content for m in messages] == [f'mensaje {i}' for i in range(50)]
+    
+    def test_full_queue_writes_synchronously(self, app, chat_id):
+        """Test that a full queue falls back to a synchronous insert, keeping the order."""
+        app.config.update(CHAT_WRITE_BEHIND=True, CHAT_JOURNAL_MAX_SIZE=2, CHAT_JOURNAL_FLUSH_INTERVAL=60)
+        journal = MessageJournal(app)
+        try:
+            assert journal.append(chat_id, 'user', 'uno')
+            assert journal.append(chat_id, 'user', 'dos')
+            assert not journal.append(chat_id, 'user', 'tres')
+            
+            assert journal.backlog() == 0
+            assert [m.content for m in ChatService.get_session_messages(chat_id)] == ['uno', 'dos', 'tres']
+        finally:
+            journal.close()
+    
+    def test_failed_synchronous_insert_raises_database_error(self, app, chat_id, monkeypatch):
+        """Test that the synchronous fallback reports failures like ChatService does."""
+        app.config.update(CHAT_WRITE_BEHIND=True, CHAT_JOURNAL_MAX_SIZE=1, CHAT_JOURNAL_FLUSH_INTERVAL=60)
+        journal = MessageJournal(app)
+        try:
+            assert journal.append(chat_id, 'user', 'uno')
+            journal.flush()
+            journal.append(chat_id, 'user', 'dos')
+
+            def broken(rows):
+                raise OperationalError('INSERT', {}, Exception('connection lost'))
+
+            monkeypatch.setattr(journal, '_insert', broken)
+            with pytest.raises(DatabaseError):
+                journal.append(chat_id, 'user', 'tres')
+        finally:
+            monkeypatch.undo()
+            journal.close()
+
+    def test_rows_use_the_database_clock(self, journal, user):
+        """Test that journaled rows are stamped by the database, like the opening messages."""
+        session_id = ChatService.start_session_with_messages(user.id, 'soccer', messages=[('assistant', 'hola')])
+        journal.append(session_id, 'user', 'sí')
+        journal.flush()
+
+        first, second = ChatService.get_session_messages(session_id)
+        assert second.created_at >= first.created_at
+        assert type(second.created_at) is type(first.created_at)
+        assert abs(second.created_at - db.session.scalar(select(func.now()))) < timedelta(seconds=5)
+
+    def test_background_thread_flushes_on_interval(self, app, chat_id):
+        """Test that the flusher thread writes queued messages without an explicit flush."""
+        app.config.update(CHAT_WRITE_BEHIND=True, CHAT_JOURNAL_FLUSH_INTERVAL=0.05)
+        journal = MessageJournal(app)
+        try:
+            journal.append(chat_id, 'user', 'hola')
+            deadline = time.monotonic() + 2
+            while journal.backlog() and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert journal.backlog() == 0
+            assert ChatMessage.query.count() == 1
+        finally:
+            journal.close()
+    
+    def test_close_flushes_backlog(self, journal, chat_id):
+        """Test that closing the journal writes what is left."""
+        journal.append(chat_id, 'assistant', 'adiós')
+        journal.close()
+        assert journal.backlog() == 0
+        assert ChatMessage.query.count() == 1
+
+class TestWriteBehindRoute:
+    
+    @pytest.fixture
+    def write_behind(self, app):
+        """Enable write-behind on the application journal."""
+        app.config.update(CHAT_WRITE_BEHIND=True, CHAT_JOURNAL_FLUSH_INTERVAL=60)
+        message_journal.init_app(app)
+        yield message_journal
+        message_journal.close()
+        app.config.update(CHAT_WRITE_BEHIND=False)
+        message_journal.init_app(app)
+    
+    def test_turn_is_journaled_and_visible_in_history(self, client, write_behind):
+        """Test that a chat turn is queued and that reading the history flushes it first."""
+        session_id = client.post('/bot/select_sport', json={'sport': 'soccer'}).get_json()['session_id']
+        response = client.post('/bot/get_response', json={'message': 'sí', 'session_id': session_id})
+        
+        assert response.status_code == 200
+        assert write_behind.backlog() == 2
+        assert client.get('/health').get_json()['message_backlog'] == 2
+        
+        history = client.get(f'/bot/history/{session_id}').get_json()
+        assert [m['role'] for m in history['messages']] == ['assistant', 'assistant', 'user', 'assistant']
+        assert write_behind.backlog() == 0
@@ -0,0 +1,106 @@
+import os
+import runpy
+import threading
+import time
+import pytest
+from app import create_app
+from app.config import TestingConfig
+from app.core.exceptions import ServiceUnavailableError
+from app.core.extensions import bcrypt
+from app.core.password_hasher import PasswordHasher, password_hasher
+
+RUN_PY = os.path.join(os.path.dirname(__file__), '..', '..', 'run.py')
+
+class PoolConfig(TestingConfig):
+    """Testing configuration with a single hashing process."""
+
+    BCRYPT_LOG_ROUNDS = 4
+    PASSWORD_HASH_WORKERS = 1
+
+@pytest.fixture
+def pool_hasher():
+    """Password hasher backed by a real process pool."""
+    hasher = PasswordHasher(create_app(PoolConfig))
+    yield hasher
+    hasher.shutdown()
+
+class TestPasswordHasher:
+
+    def test_pool_hashes_verify_inline(self, pool_hasher, app):
+        """Test that a hash computed in a worker process verifies in the request thread."""
+        pw_hash = pool_hasher.hash('secret123')
+
+        assert pw_hash.startswith('$2b$04$')
+        assert password_hasher.verify(pw_hash, 'secret123')
+        assert not password_hasher.verify(pw_hash, 'wrong')
+        assert pool_hasher.verify(pw_hash, 'secret123')
+
+    def test_hashes_are_compatible_with_flask_bcrypt(self, app):
+        """Test that existing Flask-Bcrypt hashes keep working and new ones are readable by it."""
+        legacy = bcrypt.generate_password_hash('secret123').decode('utf-8')
+
+        assert password_hasher.verify(legacy, 'secret123')
+        assert bcrypt.check_password_hash(password_hasher.hash('secret123'), 'secret123')
+
+    def test_saturated_hasher_raises_service_unavailable(self, app):
+        """Test that calls beyond the pending limit are rejected instead of queued."""
+        app.config['PASSWORD_HASH_MAX_PENDING'] = 1
+        app.config['PASSWORD_HASH_RETRY_AFTER'] = 7
+        hasher = PasswordHasher(app)
+        hasher._slots.acquire()
+
+        with pytest.raises(ServiceUnavailableError) as excinfo:
+            hasher.hash('secret123')
+        assert excinfo.value.retry_after == 7
+
+        hasher._slots.release()
+        assert hasher.hash('secret123')
+
+    def test_timed_out_call_keeps_its_slot_until_it_finishes(self, monkeypatch):
+        """Test that a call still running in the pool after a timeout keeps counting as pending."""
+        monkeypatch.setattr(PoolConfig, 'PASSWORD_HASH_MAX_PENDING', 1)
+        hasher = PasswordHasher(create_app(PoolConfig))
+        try:
+            hasher._run(time.sleep, 0)
+            hasher.timeout = 0.05
+            with pytest.raises(ServiceUnavailableError):
+                hasher._run(time.sleep, 1)
+            assert not hasher._slots.acquire(blocking=False)
+
+            time.sleep(1.5)
+            assert hasher._slots.acquire(blocking=False)
+            hasher._slots.release()
+        finally:
+            hasher.shutdown()
+
+    def test_spawned_workers_do_not_create_an_app(self, monkeypatch):
+        """Test that re-importing run.py in a spawned hashing process builds no app."""
+        created = []
+        monkeypatch.setattr('app.create_app', lambda *args: created.append(args))
+
+        namespace = runpy.run_path(RUN_PY, run_name='__mp_main__')
+        assert 'app' not in namespace and not created
+        runpy.run_path(RUN_PY, run_name='run')
+        assert len(created) == 1
+
+    def test_login_returns_503_with_retry_after_when_saturated(self, app, user, monkeypatch):
+        """Test that a saturated hasher answers login with 503 and Retry-After."""
+        monkeypatch.setattr(password_hasher, '_slots', threading.BoundedSemaphore(1))
+        password_hasher._slots.acquire()
+        client = app.test_client()
+
+        response = client.post('/auth/login', data={'username': 'tester', 'password': 'secret123'})
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == str(password_hasher.retry_after)
+
+        response = client.post('/auth/login', json={'username': 'tester', 'password': 'secret123'})
+        assert response.status_code == 503
+        assert response.get_json()['error'] == 'service_unavailable'
+
+    def test_register_and_login_use_the_hasher(self, app):
+        """Test that a registered user can log in with the same password."""
+        client = app.test_client()
+        client.post('/auth/register', data={'username': 'nuevo', 'password': 'clave123', 'confirm': 'clave123'})
+
+        response = client.post('/auth/login', data={'username': 'nuevo', 'password': 'clave123'})
+        assert response.status_code == 302
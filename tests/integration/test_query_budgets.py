@@ -0,0 +1,120 @@
+import logging
+import pytest
+from flask import g
+from app.core.extensions import db
+from app.core.query_counter import assert_max_queries, count_queries
+from app.core.tracing import tracer
+from app.core.user_cache import user_cache
+from app.models import ChatSession, User
+
+def request(client, method, url, **kwargs):
+    """Send a request as a fresh worker would see it: no loaded user, empty identity map, cold user cache."""
+    g.pop('_login_user', None)
+    db.session.expunge_all()
+    user_cache.clear()
+    return getattr(client, method)(url, **kwargs)
+
+@pytest.fixture
+def session_id(client):
+    """A started soccer conversation."""
+    return client.post('/bot/select_sport', json={'sport': 'soccer'}).get_json()['session_id']
+
+# Every query includes the Flask-Login user load (cold user cache)
+BUDGETS = [
+    ('get', '/', {}, 1),
+    ('get', '/health', {}, 0),
+    ('get', '/ready', {}, 0),
+    ('get', '/metrics', {}, 0),
+    ('get', '/auth/login', {}, 1),
+    ('get', '/auth/register', {}, 1),
+    ('post', '/auth/login', {'data': {'username': 'tester', 'password': 'secret123'}}, 1),
+    ('get', '/auth/logout', {}, 1),
+    ('get', '/bot/', {}, 1),
+    ('post', '/bot/select_sport', {'json': {'sport': 'soccer'}}, 4),
+    ('post', '/bot/advice/batch', {'json': {'soccer': [{}]}}, 1),
+    ('post', '/bot/advice/sensitivity', {'json': {'sport': 'soccer', 'factors': 'injuries'}}, 1),
+    ('get', '/bot/history', {}, 2),
+]
+
+class TestQueryBudgets:
+
+    @pytest.mark.parametrize('method, url, kwargs, budget', BUDGETS)
+    def test_route_budget(self, client, method, url, kwargs, budget):
+        """Test that each route stays within its query budget."""
+        with assert_max_queries(budget):
+            response = request(client, method, url, **kwargs)
+        assert response.status_code < 400
+
+    def test_register_budget(self, app):
+        """Test that registering checks the username (form and service) and inserts the user."""
+        client = app.test_client()
+        with assert_max_queries(3):
+            response = request(client, 'post', '/auth/register',
+                               data={'username': 'nuevo', 'password': 'clave123', 'confirm': 'clave123'})
+        assert response.status_code == 302
+
+    def test_chat_turn_budget(self, client, session_id):
+        """Test that a chat turn only loads the user and writes its two messages."""
+        with assert_max_queries(3):
+            response = request(client, 'post', '/bot/get_response', json={'message': 'sí', 'session_id': session_id})
+        assert response.status_code == 200
+
+    def test_history_session_budget_does_not_grow_with_messages(self, client, session_id):
+        """Test that a session page costs the same queries however many messages it holds."""
+        for _ in range(5):
+            request(client, 'post', '/bot/get_response', json={'message': 'sí', 'session_id': session_id})
+
+        with assert_max_queries(3):
+            response = request(client, 'get', f'/bot/history/{session_id}')
+        assert len(response.get_json()['messages']) > 5
+
+class TestQueryCounter:
+
+    def test_assertion_lists_the_statements(self, app, user):
+        """Test that a broken budget names the statements that ran."""
+        with pytest.raises(AssertionError, match='at most 0 queries, got 1'):
+            with assert_max_queries(0):
+                User.query.filter_by(username='tester').first()
+
+    def test_nested_counters(self, app, user):
+        """Test that nested blocks each see their own statements."""
+        missing = user.id + 1
+        with count_queries() as outer:
+            User.query.get(missing)
+            with count_queries() as inner:
+                User.query.get(missing + 1)
+        assert (outer.count, inner.count) == (2, 1)
+        assert outer.duration >= inner.duration > 0
+
+    def test_budget_warning(self, app, client, caplog):
+        """Test that a request above SQL_QUERY_BUDGET is logged."""
+        app.config['SQL_QUERY_BUDGET'] = 1
+        with caplog.at_level(logging.WARNING):
+            request(client, 'get', '/bot/history')
+        assert 'Query budget exceeded on bot.history: 2 statements' in caplog.text
+
+    def test_repeated_statement_warning(self, app, client, session_id, caplog, monkeypatch):
+        """Test that lazy loads repeated per row are reported as a possible N+1."""
+        for _ in range(3):
+            client.post('/bot/select_sport', json={'sport': 'basketball'})
+
+        def n_plus_one(user_id, limit=50, cursor=None):
+            sessions = ChatSession.query.filter_by(user_id=user_id).all()
+            for chat_session in sessions:
+                chat_session.messages
+            return [], None
+
+        monkeypatch.setattr('app.services.chat_service.ChatService.get_user_sessions_page', n_plus_one)
+        with caplog.at_level(logging.WARNING):
+            request(client, 'get', '/bot/history')
+        assert 'Possible N+1 on bot.history: statement run 4 times' in caplog.text
+
+    def test_queries_show_up_in_server_timing(self, client):
+        """Test that database time is reported as a stage when tracing is on."""
+        tracer.enabled = True
+        try:
+            response = request(client, 'get', '/bot/history')
+        finally:
+            tracer.enabled = False
+            tracer.reset()
+        assert 'db.query;dur=' in response.headers['Server-Timing']
@@ -0,0 +1,89 @@
+import random
+import pytest
+from app.ai.models.expert_systems.soccer_expert import SoccerExpert, SPANISH_MAP as SOCCER_MAP
+from app.ai.models.expert_systems.basketball_expert import BasketballExpert, SPANISH_MAP as BASKETBALL_MAP
+from app.ai.models.bayesian.soccer_bayesian_net import SoccerBayesianNetwork
+from app.ai.models.bayesian.basketball_bayesian_net import BasketballBayesianNetwork
+
+def make_experts(sport):
+    """Create a plan-mode expert and a Rete-only expert for the same sport."""
+    if sport == 'soccer':
+        network = SoccerBayesianNetwork()
+        planned, rete = SoccerExpert(network), SoccerExpert(network)
+    else:
+        network = BasketballBayesianNetwork()
+        planned, rete = BasketballExpert(network), BasketballExpert(network)
+    rete.use_question_plan = False
+    return planned, rete
+
+def random_conversation(spanish_map, rng):
+    """Build prefixes, shuffled subsets, duplicates and invalid answers."""
+    answers = [{key: rng.choice(list(options))} for key, options in spanish_map.items()]
+    kind = rng.choice(['prefix', 'prefix', 'subset', 'duplicate', 'invalid'])
+    if kind == 'prefix':
+        return answers[:rng.randint(0, len(answers))]
+    if kind == 'subset':
+        return rng.sample(answers, rng.randint(1, len(answers)))
+    if kind == 'duplicate':
+        prefix = answers[:rng.randint(1, len(answers))]
+        return prefix + [rng.choice(prefix)]
+    prefix = answers[:rng.randint(1, len(answers))]
+    prefix[rng.randrange(len(prefix))] = {list(prefix[0])[0]: 'desconocido'}
+    return prefix
+
+class TestQuestionPlan:
+    
+    @pytest.mark.parametrize('sport,spanish_map', [('soccer', SOCCER_MAP), ('basketball', BASKETBALL_MAP)])
+    def test_plan_follows_rule_chain(self, sport, spanish_map):
+        """Test that the derived plan asks every fact in rule order."""
+        planned, _ = make_experts(sport)
+        plan = planned.question_plan()
+        assert [key for key, _ in plan] == list(spanish_map)
+        assert all(question for _, question in plan)
+    
+    @pytest.mark.parametrize('sport,spanish_map', [('soccer', SOCCER_MAP), ('basketball', BASKETBALL_MAP)])
+    def test_plan_matches_rete(self, sport, spanish_map):
+        """Test that plan mode returns exactly what the Rete path returns."""
+        planned, rete = make_experts(sport)
+        rng = random.Random(7)
+        for _ in range(300):
+            facts = random_conversation(spanish_map, rng)
+            try:
+                expected = rete.get_next_question(facts)
+            except Exception as error:
+                with pytest.raises(type(error)):
+                    planned.get_next_question(facts)
+                continue
+            assert planned.get_next_question(facts) == expected
+            assert planned.collected_data == rete.collected_data
+    
+    def test_plan_mode_skips_experta(self, monkeypatch):
+        """Test that prefix answers never reset or run the knowledge engine."""
+        planned, _ = make_experts('soccer')
+        planned.question_plan()
+        monkeypatch.setattr(planned, 'run', lambda *args, **kwargs: pytest.fail('Rete path used'))
+        
+        facts = []
+        for key, options in SOCCER_MAP.items():
+            result = planned.get_next_question(facts)
+            assert result['next_fact'] == key
+            facts.append({key: list(options)[0]})
+        assert 'result' in planned.get_next_question(facts)
+    
+    @pytest.mark.parametrize('sport,spanish_map', [('soccer', SOCCER_MAP), ('basketball', BASKETBALL_MAP)])
+    def test_questions_carry_running_estimate(self, sport, spanish_map):
+        """Test that each question reports P(safe) for the answers given so far."""
+        from pgmpy.inference import VariableElimination
+        
+        planned, _ = make_experts(sport)
+        network = planned.bayes_net
+        reference = VariableElimination(network.model)
+        facts, evidence = [], {}
+        for key, options in spanish_map.items():
+            result = planned.get_next_question(facts)
+            expected = reference.query([planned.target], evidence=evidence, show_progress=False)
+            safe = expected.values[expected.state_names[planned.target].index('safe')]
+            assert result['safe_probability'] == pytest.approx(round(safe, 4))
+            answer = list(options)[-1]
+            facts.append({key: answer})
+            evidence[key] = options[answer]
@@ -0,0 +1,101 @@
+import itertools
+import random
+import pytest
+from unittest.mock import Mock
+from pgmpy.factors.discrete import TabularCPD
+from app.ai.models.bayesian.soccer_bayesian_net import SoccerBayesianNetwork
+from app.ai.models.bayesian.basketball_bayesian_net import BasketballBayesianNetwork
+from app.ai.models.expert_systems.soccer_expert import SoccerExpert
+from app.ai.models.expert_systems.basketball_expert import BasketballExpert
+
+SOCCER_EVIDENCE = {
+    'home_advantage': 'home', 'injuries': 'no', 'performance': 'high', 'weather': 'no',
+    'rivalry': 'yes', 'league_position': 'high', 'recent_streak': 'winning',
+    'match_importance': 'high', 'physical_condition': 'rested', 'head_to_head': 'home_advantage'
+}
+
+@pytest.fixture
+def soccer_expert():
+    """Create a soccer expert on its own network, so its memo starts empty."""
+    return SoccerExpert(SoccerBayesianNetwork())
+
+def uncached(expert, evidence):
+    """Compute a final recommendation without the memo."""
+    expert.use_recommendation_cache = False
+    expert.collected_data = {}
+    try:
+        return expert.final_recommendation(dict(evidence))
+    finally:
+        expert.use_recommendation_cache = True
+
+class TestRecommendationCache:
+    
+    def test_second_call_is_a_hit(self, soccer_expert):
+        """Test that repeated evidence is served from the memo."""
+        first = soccer_expert.final_recommendation(dict(SOCCER_EVIDENCE))
+        soccer_expert.bayes_net.inference = Mock(wraps=soccer_expert.bayes_net.inference)
+        second = soccer_expert.final_recommendation(dict(SOCCER_EVIDENCE))
+        
+        cache = soccer_expert.recommendation_cache()
+        assert first == second
+        assert (cache.hits, cache.misses) == (1, 1)
+        soccer_expert.bayes_net.inference.query.assert_not_called()
+    
+    def test_entry_holds_probability_label_and_explanation(self, soccer_expert):
+        """Test that the memo maps the canonical evidence tuple to the full result."""
+        explanation = soccer_expert.final_recommendation(dict(SOCCER_EVIDENCE))
+        key = tuple(SOCCER_EVIDENCE[k] for k in soccer_expert.valid_states)
+        prob_safe, label, cached = soccer_expert.recommendation_cache().get(key)
+        
+        assert cached == explanation
+        assert label in ('safe', 'risky')
+        assert f'{prob_safe}%' in explanation
+    
+    def test_incomplete_evidence_is_not_cached(self, soccer_expert):
+        """Test that partial evidence bypasses the memo."""
+        assert soccer_expert.evidence_key({'home_advantage': 'home'}) is None
+        assert soccer_expert.evidence_key(dict(SOCCER_EVIDENCE, weather='tormenta')) is None
+    
+    def test_memo_is_dropped_when_cpds_change(self, soccer_expert):
+        """Test that updating the network CPDs invalidates the memo."""
+        network = soccer_expert.bayes_net
+        before = soccer_expert.final_recommendation(dict(SOCCER_EVIDENCE))
+        old_cache = soccer_expert.recommendation_cache()
+        
+        cpd = network.model.get_cpds('home_advantage')
+        network.update_cpds(TabularCPD('home_advantage', 2, [[0.3], [0.7]],
+                                       state_names={'home_advantage': cpd.state_names['home_advantage']}))
+        risk = network.model.get_cpds('risk')
+        flipped = TabularCPD('risk', 2, risk.get_values()[::-1], evidence=risk.variables[1:],
+                             evidence_card=risk.cardinality[1:], state_names=risk.state_names)
+        network.update_cpds(flipped)
+        
+        assert network.revision == 2
+        assert soccer_expert.recommendation_cache() is not old_cache
+        soccer_expert.collected_data = {}
+        after = soccer_expert.final_recommendation(dict(SOCCER_EVIDENCE))
+        assert after != before
+        assert after == uncached(soccer_expert, SOCCER_EVIDENCE)
+    
+    def test_mock_networks_are_not_memoized(self):
+        """Test that networks without a revision always go through inference."""
+        expert = SoccerExpert(Mock())
+        assert expert.recommendation_cache() is None
+
+class TestWarmRecommendationCache:
+    
+    @pytest.mark.parametrize('expert_cls,network_cls', [
+        (SoccerExpert, SoccerBayesianNetwork),
+        (BasketballExpert, BasketballBayesianNetwork),
+    ])
+    def test_warm_matches_inference(self, expert_cls, network_cls):
+        """Test that pre-warmed entries equal the recommendations computed by inference."""
+        expert = expert_cls(network_cls())
+        count = expert.warm_recommendation_cache()
+        cache = expert.recommendation_cache()
+        
+        combinations = list(itertools.product(*expert.valid_states.values()))
+        assert count == len(combinations) == len(cache)
+        for combination in random.Random(0).sample(combinations, 200):
+            evidence = dict(zip(expert.valid_states, combination))
+            assert cache.get(combination)[2] == uncached(expert, evidence)
@@ -0,0 +1,123 @@
+from itertools import product
+import pytest
+import numpy as np
+from pgmpy.inference import VariableElimination
+from app import create_app
+from app.config import TestingConfig
+from app.ai.batch_scorer import BatchScorer
+from app.ai.registry import network_registry
+
+class TestSensitivitySweep:
+
+    @pytest.mark.parametrize('sport, evidence, factors', [
+        ('soccer', {'home_advantage': 'away', 'weather': 'yes'}, ['injuries']),
+        ('soccer', {'performance': 'low'}, ['injuries', 'recent_streak']),
+        ('basketball', {}, ['team_form', 'rest_days', 'home_advantage']),
+        ('basketball', {'team_form': 'good', 'betting_odds': 'high'}, ['opponent_strength'])
+    ])
+    def test_sweep_matches_variable_elimination(self, sport, evidence, factors):
+        """Test that every cell of the sweep equals the VE posterior for that combination."""
+        network = network_registry.get(sport)
+        target = network.target_variable
+        reference = VariableElimination(network.model)
+        result = BatchScorer.for_sport(sport).sweep(evidence, factors)
+
+        grid = np.array(result['safe_probability'])
+        assert grid.shape == tuple(len(result['states'][factor]) for factor in factors)
+        for combination in product(*(result['states'][factor] for factor in factors)):
+            cell = grid[tuple(result['states'][f].index(s) for f, s in zip(factors, combination))]
+            expected = reference.query([target], evidence={**evidence, **dict(zip(factors, combination))},
+                                       show_progress=False)
+            assert cell == pytest.approx(expected.values[0], abs=1e-4)
+
+    def test_swept_factor_overrides_evidence(self):
+        """Test that a swept factor ignores its fixed answer while the baseline keeps it."""
+        scorer = BatchScorer.for_sport('soccer')
+        swept = scorer.sweep({'injuries': 'yes', 'weather': 'no'}, ['injuries'])
+        free = scorer.sweep({'weather': 'no'}, ['injuries'])
+
+        assert swept['safe_probability'] == free['safe_probability']
+        assert swept['baseline'] == swept['safe_probability'][swept['states']['injuries'].index('yes')]
+        assert swept['baseline'] < free['baseline']
+
+    def test_spanish_answers_are_accepted(self):
+        """Test that the fixed answers can use the bot's Spanish wording."""
+        scorer = BatchScorer.for_sport('basketball')
+        assert scorer.sweep({'home_advantage': 'Sí'}, ['team_form']) == \
+            scorer.sweep({'home_advantage': 'yes'}, ['team_form'])
+
+    def test_full_sweep_matches_lookup_table(self):
+        """Test that sweeping every parent reproduces the full-evidence lookup table."""
+        network = network_registry.get('basketball')
+        factors = network.inference.evidence_vars
+        grid = network.sensitivity({}, factors)
+        assert np.allclose(grid.reshape(-1, 2), network.inference.table)
+
+    @pytest.mark.parametrize('evidence, factors', [
+        ({}, []),
+        ({}, ['injuries', 'injuries']),
+        ({}, ['unknown']),
+        ({'weather': 'tormenta'}, ['injuries']),
+        ({'unknown': 'yes'}, ['injuries']),
+        ({'weather': ['sí']}, ['injuries'])
+    ])
+    def test_invalid_requests_raise(self, evidence, factors):
+        """Test that unknown, repeated or invalid facts are rejected."""
+        with pytest.raises(ValueError):
+            BatchScorer.for_sport('soccer').sweep(evidence, factors)
+
+class TestSensitivityRoute:
+
+    @pytest.fixture
+    def client(self):
+        """Create a test client with login checks disabled."""
+        class Config(TestingConfig):
+            LOGIN_DISABLED = True
+            WTF_CSRF_ENABLED = False
+        return create_app(Config).test_client()
+
+    def test_returns_heatmap(self, client):
+        """Test that the endpoint returns the grid, its states and the baseline."""
+        response = client.post('/bot/advice/sensitivity', json={
+            'sport': 'Soccer',
+            'evidence': {'home_advantage': 'sí', 'weather': 'sí'},
+            'factors': ['injuries', 'performance']
+        })
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['sport'] == 'soccer'
+        assert data['states'] == {'injuries': ['no', 'yes'], 'performance': ['low', 'medium', 'high']}
+        assert np.array(data['safe_probability']).shape == (2, 3)
+        assert 0 <= data['baseline'] <= 1
+
+    def test_single_factor_string(self, client):
+        """Test that one factor can be given as a plain string."""
+        response = client.post('/bot/advice/sensitivity', json={'sport': 'basketball', 'factors': 'rest_days'})
+        assert response.status_code == 200
+        assert len(response.get_json()['safe_probability']) == 3
+
+    @pytest.mark.parametrize('payload', [
+        {'sport': 'tennis', 'factors': ['injuries']},
+        {'sport': 'soccer'},
+        {'sport': 'soccer', 'factors': ['unknown']},
+        {'sport': 'soccer', 'evidence': [], 'factors': ['injuries']},
+        {'sport': 'soccer', 'evidence': {'weather': 'tormenta'}, 'factors': ['injuries']},
+        {'sport': 'soccer', 'evidence': {'injuries': ['a', ['b']]}, 'factors': ['weather']},
+        {'sport': 'soccer', 'evidence': {'injuries': None}, 'factors': ['weather']},
+        {'sport': 'soccer', 'factors': [['injuries']]},
+        {'sport': 'soccer', 'factors': {'injuries': 'no'}}
+    ])
+    def test_rejects_invalid_requests(self, client, payload):
+        """Test that invalid sports, factors and evidence are rejected with 400."""
+        response = client.post('/bot/advice/sensitivity', json=payload)
+        assert response.status_code == 400
+
+    def test_engine_failure_is_a_server_error(self, client, monkeypatch):
+        """Test that a failing sweep returns 500 rather than the chat placeholder."""
+        def broken(self, evidence, factors):
+            raise RuntimeError('boom')
+
+        monkeypatch.setattr(BatchScorer, 'sweep', broken)
+        response = client.post('/bot/advice/sensitivity', json={'sport': 'soccer', 'factors': ['injuries']})
+        assert response.status_code == 500
+        assert response.get_json()['error'] == 'expert_system_error'
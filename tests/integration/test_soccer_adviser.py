@@ -1,6 +1,6 @@
 import pytest
-from app.models.soccer.expert_system import SoccerExpert, SPANISH_MAP
-from app.models.soccer.bayesian_net import SoccerBayesianNetwork
+from app.ai.models.expert_systems.soccer_expert import SoccerExpert, SPANISH_MAP
+from app.ai.models.bayesian.soccer_bayesian_net import SoccerBayesianNetwork
 import re
 
 class TestSoccerAdviser:
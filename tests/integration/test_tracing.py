@@ -0,0 +1,74 @@
+import re
+import pytest
+from app.ai.models.expert_systems.soccer_expert import SoccerExpert, SPANISH_MAP, VALID_STATES
+from app.ai.registry import network_registry
+from app.core.tracing import BUCKETS, Tracer, tracer
+
+@pytest.fixture
+def tracing(app):
+    """Enable tracing with empty histograms."""
+    tracer.enabled = True
+    tracer.reset()
+    yield tracer
+    tracer.enabled = False
+    tracer.reset()
+
+def stages(response):
+    """Parse the Server-Timing header into ``{name: milliseconds}``."""
+    header = response.headers.get('Server-Timing', '')
+    return {match[0]: float(match[1]) for match in re.findall(r'([\w.]+);dur=([\d.]+)', header)}
+
+class TestTracing:
+
+    def test_chat_turn_reports_its_stages(self, client, tracing):
+        """Test that a chat turn sends the time of each stage in Server-Timing."""
+        session_id = client.post('/bot/select_sport', json={'sport': 'soccer'}).get_json()['session_id']
+        response = client.post('/bot/get_response', json={'message': 'sí', 'session_id': session_id})
+
+        timings = stages(response)
+        for name in ('session.lookup', 'chat.record_message', 'chat.add_message', 'betting.advice', 'total'):
+            assert name in timings
+        assert timings['total'] >= timings['betting.advice']
+        assert 'x2' in response.headers['Server-Timing']
+
+    def test_metrics_exposes_histograms(self, client, tracing):
+        """Test that /metrics renders consistent Prometheus histograms."""
+        client.post('/bot/select_sport', json={'sport': 'basketball'})
+        body = client.get('/metrics').get_data(as_text=True)
+
+        assert '# TYPE app_stage_duration_seconds histogram' in body
+        assert 'app_request_duration_seconds_count{endpoint="bot.select_sport"} 1' in body
+        buckets = [int(value) for value in
+                   re.findall(r'app_stage_duration_seconds_bucket\{stage="betting.advice",le="[^"]+"\} (\d+)', body)]
+        assert len(buckets) == len(BUCKETS) + 1
+        assert buckets == sorted(buckets) and buckets[-1] == 1
+
+    def test_expert_and_network_stages(self, client, tracing):
+        """Test that the question plan, the Rete replay and the network queries are timed."""
+        session_id = client.post('/bot/select_sport', json={'sport': 'soccer'}).get_json()['session_id']
+        client.post('/bot/get_response', json={'message': 'sí', 'session_id': session_id})
+        expert = SoccerExpert(network_registry.get('soccer'))
+        expert.use_question_plan = False
+        expert.use_recommendation_cache = False
+        expert.get_next_question([{key: next(iter(SPANISH_MAP[key]))} for key in VALID_STATES])
+
+        stages_seen = {name for name, _ in tracer.snapshot()}
+        assert {'expert.plan', 'bayes.prefix', 'expert.reset', 'expert.replay', 'bayes.query'} <= stages_seen
+
+    def test_disabled_tracing_is_a_no_op(self, client):
+        """Test that without TRACING there is no header, no histogram and a shared no-op stage."""
+        response = client.get('/bot/history')
+
+        assert 'Server-Timing' not in response.headers
+        assert tracer.snapshot() == {}
+        assert tracer.stage('a') is tracer.stage('b')
+
+    def test_stage_outside_a_request_is_recorded(self):
+        """Test that stages timed outside a request only feed the histograms."""
+        local = Tracer()
+        local.enabled = True
+        with local.stage('warmup'):
+            pass
+
+        (key, (counts, total, count)), = local.snapshot().items()
+        assert key == ('warmup', None) and count == 1 and sum(counts) == 1
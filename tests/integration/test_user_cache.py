@@ -0,0 +1,70 @@
+import pytest
+from flask import g
+from sqlalchemy import event
+from app.core.extensions import db
+from app.core.user_cache import CachedUser, user_cache
+from app.models import User
+
+@pytest.fixture
+def user_queries(app):
+    """Statements against the users table run while the test executes."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if 'FROM app_users' in statement:
+            statements.append(statement)
+
+    engine = db.engine
+    event.listen(engine, 'before_cursor_execute', record)
+    yield statements
+    event.remove(engine, 'before_cursor_execute', record)
+
+def get(client, url):
+    """Request ``url`` without the user and identity map left over from the test's app context."""
+    g.pop('_login_user', None)
+    db.session.expunge_all()
+    return client.get(url)
+
+class TestUserCache:
+
+    def test_authenticated_requests_skip_the_user_query(self, client, user_queries):
+        """Test that only the first request after login loads the user from the database."""
+        for _ in range(3):
+            assert get(client, '/bot/history').status_code == 200
+
+        assert len(user_queries) == 1
+
+    def test_loader_returns_detached_identity(self, app, user):
+        """Test that the loader hands out a lightweight copy of the user."""
+        loaded = user_cache.load(str(user.id))
+
+        assert isinstance(loaded, CachedUser)
+        assert (loaded.id, loaded.username) == (user.id, 'tester')
+        assert loaded.is_authenticated and loaded.get_id() == str(user.id)
+        assert user_cache.load(user.id + 100) is None
+
+    def test_logout_invalidates_the_entry(self, client, user):
+        """Test that logging out drops the cached identity."""
+        get(client, '/bot/history')
+        assert user.id in user_cache.cache
+
+        client.get('/auth/logout')
+        assert user.id not in user_cache.cache
+
+    def test_password_change_invalidates_the_entry(self, client, user):
+        """Test that setting a new password drops the cached identity."""
+        get(client, '/bot/history')
+        user = db.session.get(User, user.id)
+        user.set_password('otra-clave')
+        db.session.commit()
+
+        assert user.id not in user_cache.cache
+
+    def test_zero_ttl_disables_the_cache(self, app, client, user_queries):
+        """Test that USER_CACHE_TTL = 0 loads the user on every request."""
+        app.config['USER_CACHE_TTL'] = 0
+        user_cache.init_app(app)
+        for _ in range(3):
+            get(client, '/bot/history')
+
+        assert len(user_queries) == 3
@@ -0,0 +1,108 @@
+import subprocess
+import sys
+import threading
+import pytest
+from app import create_app
+from app.config import Config, TestingConfig
+from app.ai.warmup import Warmup, warmup as app_warmup
+from app.ai.registry import network_registry
+from app.blueprints.main import routes as main_routes
+
+class TestWarmup:
+    
+    def test_run_warms_every_sport(self):
+        """Test that a synchronous warmup marks every sport ready."""
+        warmup = Warmup()
+        warmup.run()
+        
+        status = warmup.status()
+        assert warmup.is_ready()
+        assert all(entry['state'] == 'ready' for entry in status.values())
+        assert all(entry['seconds'] >= 0 for entry in status.values())
+        assert all(network_registry.is_loaded(sport) for sport in network_registry.SPORTS)
+    
+    def test_background_start(self, monkeypatch):
+        """Test that the background thread warms the sports and is started once per process."""
+        warmup = Warmup()
+        release = threading.Event()
+        original = warmup._warm_sport
+        
+        def gated(sport, recommendations=False):
+            release.wait(timeout=30)
+            original(sport, recommendations)
+        
+        monkeypatch.setattr(warmup, '_warm_sport', gated)
+        thread = warmup.start(['soccer'])
+        assert warmup.start(['soccer']) is thread
+        assert not warmup.is_ready()
+        release.set()
+        thread.join(timeout=30)
+        
+        assert warmup.status()['soccer']['state'] == 'ready'
+    
+    def test_failure_is_reported(self, monkeypatch):
+        """Test that a failed sport keeps the process from reporting ready."""
+        warmup = Warmup()
+        
+        def fail(sport, recommendations=False):
+            raise RuntimeError('boom')
+        
+        monkeypatch.setattr(warmup, '_warm_sport', fail)
+        warmup.run(['basketball'])
+        
+        assert warmup.status()['basketball'] == {'state': 'failed', 'error': 'boom'}
+        assert not warmup.is_ready()
+    
+    def test_not_scheduled_is_ready(self):
+        """Test that a process without warmup is ready (models load on demand)."""
+        assert Warmup().is_ready()
+
+    def test_default_warmup_starts_no_thread(self):
+        """Test that the default warmup finishes inside create_app, so a preloading master forks no threads."""
+        class DefaultWarmupConfig(TestingConfig):
+            AI_WARMUP = Config.AI_WARMUP
+        
+        create_app(DefaultWarmupConfig)
+        
+        assert not any(thread.name == 'ai-warmup' for thread in threading.enumerate())
+        assert app_warmup.is_ready()
+
+class TestReadyEndpoint:
+    
+    def test_ready_while_warming(self, app, monkeypatch):
+        """Test that /ready answers 503 until every sport is warm."""
+        warmup = Warmup()
+        warmup.scheduled = True
+        warmup._status = {'soccer': {'state': 'ready'}, 'basketball': {'state': 'warming'}}
+        monkeypatch.setattr(main_routes, 'ai_warmup', warmup)
+        
+        response = app.test_client().get('/ready')
+        assert response.status_code == 503
+        assert response.get_json()['sports']['basketball']['state'] == 'warming'
+    
+    def test_ready_when_warm(self, app, monkeypatch):
+        """Test that /ready answers 200 once warm."""
+        warmup = Warmup()
+        warmup.run()
+        monkeypatch.setattr(main_routes, 'ai_warmup', warmup)
+        
+        response = app.test_client().get('/ready')
+        assert response.status_code == 200
+        assert response.get_json()['status'] == 'ready'
+
+class TestLazyImports:
+    
+    def test_app_and_registry_do_not_import_models(self):
+        """Test that creating the app and importing app.ai leave experta and pgmpy unloaded."""
+        code = (
+            "import sys\n"
+            "from app import create_app\n"
+            "from app.config import TestingConfig\n"
+            "import app.ai, app.ai.registry, app.ai.warmup\n"
+            "create_app(TestingConfig)\n"
+            "print('pgmpy' in sys.modules, 'experta' in sys.modules)\n"
+            "from app.ai import BettingAdviser\n"
+            "print('app.ai.betting_adviser' in sys.modules)\n"
+        )
+        result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, timeout=120)
+        assert result.stdout.split() == ['False', 'False', 'True'], result.stderr
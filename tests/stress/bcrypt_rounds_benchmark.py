@@ -0,0 +1,77 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+
+# Add the project root to the Python path
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+sys.path.append(ROOT)
+
+from app.core.password_hasher import hash_password, check_password
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results', 'auth')
+PASSWORD = 'benchmark-password'
+
+
+def measure_rounds(rounds, runs):
+    """Median time in ms of one login check (``checkpw``) at ``rounds``."""
+    pw_hash = hash_password(PASSWORD, rounds, '2b', False)
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        check_password(pw_hash, PASSWORD, False)
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        'rounds': rounds,
+        'median_ms': round(statistics.median(timings), 2),
+        'max_ms': round(max(timings), 2)
+    }
+
+
+def main():
+    """Time bcrypt at every cost and pick the highest one under the login budget."""
+    parser = argparse.ArgumentParser(description='Coste de bcrypt por número de rondas')
+    parser.add_argument('--target-ms', type=float, default=250.0,
+                        help='Tiempo máximo aceptable de una verificación de contraseña')
+    parser.add_argument('--min-rounds', type=int, default=4)
+    parser.add_argument('--max-rounds', type=int, default=14)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    measurements = []
+    for rounds in range(args.min_rounds, args.max_rounds + 1):
+        print(f"Measuring rounds={rounds}...")
+        result = measure_rounds(rounds, args.runs)
+        measurements.append(result)
+        # Cada ronda duplica el coste: no hace falta medir más allá del objetivo
+        if result['median_ms'] > args.target_ms * 2:
+            break
+
+    within = [m['rounds'] for m in measurements if m['median_ms'] <= args.target_ms]
+    recommended = max(within) if within else args.min_rounds
+    results = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'target_ms': args.target_ms,
+        'runs': args.runs,
+        'measurements': measurements,
+        'recommended_log_rounds': recommended
+    }
+    path = os.path.join(RESULTS_DIR, 'bcrypt_rounds.json')
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+
+    print("\n=== COSTE DE BCRYPT (mediana por verificación) ===")
+    for m in measurements:
+        print(f"rounds={m['rounds']:<3}: {m['median_ms']:.1f} ms")
+    print(f"BCRYPT_LOG_ROUNDS recomendado para {args.target_ms:.0f} ms: {recommended}")
+    print(f"Resultados guardados en {path}")
+
+
+if __name__ == "__main__":
+    main()
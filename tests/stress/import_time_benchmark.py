@@ -0,0 +1,121 @@
+import os
+import sys
+import json
+import time
+import platform
+import statistics
+import subprocess
+
+# Add the project root to the Python path
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+sys.path.append(ROOT)
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results', 'startup')
+RUNS = int(os.getenv('IMPORT_BENCH_RUNS', '3'))
+
+# Modules whose import cost matters for a cold worker
+MODULES = [
+    'app',
+    'app.ai.registry',
+    'experta',
+    'pgmpy.inference',
+    'app.ai.base_models',
+    'app.ai.betting_adviser',
+]
+
+# Time to the first answer of a fresh process, per sport
+COLD_START = (
+    "import time\n"
+    "start = time.perf_counter()\n"
+    "from app.ai.betting_adviser import BettingAdviser\n"
+    "imported = time.perf_counter()\n"
+    "BettingAdviser('{sport}').get_betting_advice([])\n"
+    "done = time.perf_counter()\n"
+    "print(imported - start, done - imported)\n"
+)
+
+
+def run_python(args):
+    """Run a fresh interpreter from the project root and return the completed process."""
+    return subprocess.run(
+        [sys.executable, *args], cwd=ROOT, capture_output=True, text=True, check=True
+    )
+
+
+def parse_importtime(stderr):
+    """Parse ``-X importtime`` output into (module, self_us, cumulative_us) rows."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def measure_import(module):
+    """Cumulative import time of ``module`` over several fresh interpreters, plus its heaviest dependencies."""
+    totals = []
+    rows = []
+    for _ in range(RUNS):
+        rows = parse_importtime(run_python(['-X', 'importtime', '-c', f'import {module}']).stderr)
+        totals.append(next(cumulative for name, _, cumulative in rows if name == module) / 1e6)
+    heaviest = sorted(rows, key=lambda row: row[2], reverse=True)[1:11]
+    return {
+        'median_s': round(statistics.median(totals), 4),
+        'min_s': round(min(totals), 4),
+        'max_s': round(max(totals), 4),
+        'heaviest': [{'module': name, 'cumulative_s': round(cumulative / 1e6, 4)} for name, _, cumulative in heaviest]
+    }
+
+
+def measure_cold_start(sport):
+    """Import and first-answer time of a fresh process for ``sport``."""
+    imports, first_answer = [], []
+    for _ in range(RUNS):
+        imported, answered = map(float, run_python(['-c', COLD_START.format(sport=sport)]).stdout.split())
+        imports.append(imported)
+        first_answer.append(answered)
+    return {
+        'import_median_s': round(statistics.median(imports), 4),
+        'first_answer_median_s': round(statistics.median(first_answer), 4),
+        'total_median_s': round(statistics.median(a + b for a, b in zip(imports, first_answer)), 4)
+    }
+
+
+def main():
+    """Measure import and cold-start times and save them as JSON."""
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    started = time.time()
+    results = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'runs': RUNS,
+        'imports': {},
+        'cold_start': {}
+    }
+
+    for module in MODULES:
+        print(f"Measuring import of {module}...")
+        results['imports'][module] = measure_import(module)
+    for sport in ('soccer', 'basketball'):
+        print(f"Measuring cold start of {sport}...")
+        results['cold_start'][sport] = measure_cold_start(sport)
+
+    results['elapsed_s'] = round(time.time() - started, 1)
+    path = os.path.join(RESULTS_DIR, 'import_time_results.json')
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+
+    print("\n=== TIEMPOS DE IMPORTACIÓN (mediana) ===")
+    for module, stats in results['imports'].items():
+        print(f"{module:<28}: {stats['median_s']:.3f} s")
+    print("=== ARRANQUE EN FRÍO ===")
+    for sport, stats in results['cold_start'].items():
+        print(f"{sport:<28}: {stats['total_median_s']:.3f} s "
+              f"(import {stats['import_median_s']:.3f} s + primera respuesta {stats['first_answer_median_s']:.3f} s)")
+    print(f"Resultados guardados en {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,7 @@ import pytest
 import numpy as np
 from pgmpy.models import BayesianNetwork
 from pgmpy.inference import VariableElimination
-from app.models.basketball.bayesian_net import BasketballBayesianNetwork
+from app.ai.models.bayesian.basketball_bayesian_net import BasketballBayesianNetwork
 
 class TestBasketballBayesianNetwork:
     
@@ -190,4 +190,70 @@ class TestBasketballBayesianNetwork:
         home_game = inference.query(['bet_risk'], {'home_advantage': 'yes'})
         away_game = inference.query(['bet_risk'], {'home_advantage': 'no'})
         
-        assert home_game.values[0] > away_game.values[0]
\ No newline at end of file
+        assert home_game.values[0] > away_game.values[0]
+    def test_bet_risk_cpd_matches_reference_loop(self, basketball_network):
+        """Test that the vectorized bet_risk CPD matches the original per-combination loop."""
+        from itertools import product
+        
+        safe_probs = []
+        risky_probs = []
+        for tf, inj, home, odds, rest, opp, h2h, imp in product(
+            range(3), range(3), range(2), range(3), range(3), range(3), range(3), range(3)
+        ):
+            safe = 0.5
+            if tf == 0: safe += 0.1
+            elif tf == 2: safe -= 0.1
+            if inj == 0: safe += 0.05
+            elif inj == 2: safe -= 0.05
+            if home == 0: safe += 0.05
+            else: safe -= 0.05
+            if odds == 0: safe += 0.05
+            elif odds == 2: safe -= 0.05
+            if rest == 2: safe += 0.05
+            elif rest == 0: safe -= 0.05
+            if opp == 0: safe -= 0.1
+            elif opp == 2: safe += 0.1
+            if h2h == 0: safe += 0.05
+            elif h2h == 2: safe -= 0.05
+            if imp == 0: safe += 0.05
+            elif imp == 2: safe -= 0.05
+            safe = round(max(min(safe, 0.99), 0.01), 3)
+            safe_probs.append(safe)
+            risky_probs.append(round(1 - safe, 3))
+        
+        values = basketball_network.model.get_cpds('bet_risk').get_values()
+        assert np.array_equal(values, np.array([safe_probs, risky_probs]))
+    
+    def test_star_inference_matches_variable_elimination_for_every_evidence_subset(self, basketball_network):
+        """Test that the star-network marginal equals the VE posterior for every subset of observed parents."""
+        import random
+        from itertools import combinations
+        
+        inference = basketball_network.inference
+        reference = VariableElimination(basketball_network.model)
+        states = basketball_network.model.get_cpds('bet_risk').state_names
+        rng = random.Random(13)
+        
+        for k in range(len(inference.evidence_vars) + 1):
+            for observed in combinations(inference.evidence_vars, k):
+                evidence = {var: rng.choice(states[var]) for var in observed}
+                fast = inference.query(['bet_risk'], evidence=evidence, joint=False)['bet_risk']
+                slow = reference.query(['bet_risk'], evidence=evidence, show_progress=False)
+                assert fast.state_names == slow.state_names
+                assert np.allclose(fast.values, slow.values)
+    
+    def test_prefix_tables_match_variable_elimination(self, basketball_network):
+        """Test that every prefix table equals the VE posterior for that prefix."""
+        import random
+        
+        order = ['team_form', 'player_injuries', 'home_advantage', 'betting_odds',
+                 'rest_days', 'opponent_strength', 'recent_head_to_head', 'match_importance']
+        states = basketball_network.model.get_cpds('bet_risk').state_names
+        reference = VariableElimination(basketball_network.model)
+        rng = random.Random(5)
+        
+        for k in range(len(order) + 1):
+            evidence = {var: rng.choice(states[var]) for var in order[:k]}
+            posterior = basketball_network.prefix_posterior(order, evidence)
+            expected = reference.query(['bet_risk'], evidence=evidence, show_progress=False)
+            assert np.allclose([posterior[s] for s in expected.state_names['bet_risk']], expected.values)
@@ -2,7 +2,7 @@ import numpy as np
 import pytest
 from unittest.mock import Mock, patch 
 from experta import Fact
-from app.models.basketball.expert_system import BasketballExpert, BasketballFact, SPANISH_MAP, VALID_STATES
+from app.ai.models.expert_systems.basketball_expert import BasketballExpert, BasketballFact, SPANISH_MAP, VALID_STATES
 import re
 
 class TestBasketballExpert:
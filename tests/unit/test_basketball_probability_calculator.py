@@ -0,0 +1,100 @@
+import random
+import sqlite3
+from collections import Counter
+import pytest
+import pandas as pd
+from app.ai.utils.basketball import basketball_probability_calculator as calculator
+
+def make_database(path, games=600, seed=3):
+    """Build a small nba.sqlite with the game and inactive_players tables."""
+    rng = random.Random(seed)
+    date = pd.Timestamp('2010-10-01')
+    rows = []
+    for game_id in range(games):
+        date += pd.Timedelta(days=rng.choice([0, 1, 1, 2, 3, 5, 150]))
+        home, away = rng.sample(range(8), 2)
+        rows.append({
+            'game_id': game_id, 'game_date': date.strftime('%Y-%m-%d 00:00:00'),
+            'team_id_home': home, 'team_id_away': away,
+            'wl_home': 'W' if rng.random() < 0.25 + 0.08 * home else 'L',
+            'pts_home': rng.randint(80, 130)
+        })
+    inactive = [{'game_id': game_id, 'player_id': player}
+                for game_id in range(0, games, 2) for player in range(rng.randint(1, 6))]
+
+    conn = sqlite3.connect(path)
+    pd.DataFrame(rows).to_sql('game', conn, index=False)
+    pd.DataFrame(inactive).to_sql('inactive_players', conn, index=False)
+    return conn
+
+def reference_counts(conn):
+    """The original loop-based counts of the calculator."""
+    games = pd.read_sql_query("SELECT * FROM game", conn)
+    inactive = pd.read_sql_query("SELECT * FROM inactive_players", conn)
+    games['game_date'] = pd.to_datetime(games['game_date'])
+    games.sort_values(by='game_date', inplace=True, kind='mergesort')
+    counters = {var: Counter() for var in calculator.STATES}
+
+    team_games = games.groupby('team_id_home')
+    for _, group in team_games:
+        for idx in range(5, len(group)):
+            wins = (group.iloc[idx - 5:idx]['wl_home'] == 'W').sum()
+            counters['team_form'].update(['good' if wins >= 4 else 'average' if wins >= 2 else 'poor'])
+    for count in inactive.groupby('game_id').size():
+        counters['player_injuries'].update(['none' if count == 0 else 'minor' if count <= 2 else 'major'])
+    counters['home_advantage'].update(['yes'] * len(games))
+    for _, group in team_games:
+        rest = (group['game_date'] - group['game_date'].shift(1)).dt.days.dropna()
+        counters['rest_days'].update(pd.cut(rest, [0, 1, 3, 100], labels=['0-1', '2-3', '4+']).astype(str))
+    win_rates = games.groupby('team_id_home')['wl_home'].apply(lambda x: (x == 'W').mean())
+    for _, row in games.iterrows():
+        rate = win_rates.get(row['team_id_away'], 0)
+        counters['opponent_strength'].update(['strong' if rate > 0.6 else 'average' if rate > 0.4 else 'weak'])
+    for _, group in games.groupby(['team_id_home', 'team_id_away']):
+        if len(group) > 1:
+            counters['recent_head_to_head'].update(['win' if group.iloc[-2]['wl_home'] == 'W' else 'loss'])
+    counters['recent_head_to_head'].update(['draw'])
+    return counters
+
+@pytest.fixture
+def conn(tmp_path):
+    """Synthetic NBA database."""
+    conn = make_database(str(tmp_path / 'nba.sqlite'))
+    yield conn
+    conn.close()
+
+class TestBasketballProbabilityCalculator:
+
+    def test_counts_match_reference_implementation(self, conn):
+        """Test that the vectorized counts equal the original loops."""
+        counts = calculator.compute_counts(conn)
+        expected = reference_counts(conn)
+
+        for var in ['team_form', 'player_injuries', 'home_advantage', 'rest_days',
+                    'opponent_strength', 'recent_head_to_head']:
+            assert {state: count for state, count in counts[var].items() if count} == dict(expected[var]), var
+
+    def test_importance_split(self, conn):
+        """Test that the importance split covers every game."""
+        counts = calculator.compute_counts(conn)['match_importance']
+        assert counts.sum() == 600
+        assert list(counts.index) == ['high', 'medium', 'low']
+
+    def test_games_keep_only_the_feature_columns(self, conn):
+        """Test that the games are projected to the feature columns and sorted by team and date."""
+        games = calculator.load_games(conn)
+
+        assert list(games.columns) == ['game_date', 'team_id_home', 'team_id_away', 'win']
+        assert len(games) == 600
+        assert games['win'].dtype == bool
+        assert games.equals(games.sort_values(['team_id_home', 'game_date'], kind='mergesort'))
+
+    def test_probability_table(self, conn):
+        """Test that the exported table sums to one per variable and skips unseen states."""
+        table = calculator.compute_probabilities(conn)
+
+        assert list(table.columns) == ['variable', 'state', 'probability']
+        assert (table['probability'] > 0).all()
+        sums = table.groupby('variable')['probability'].sum()
+        assert ((sums - 1).abs() < 1e-3).all()
+        assert 'none' not in table[table['variable'] == 'player_injuries']['state'].tolist()
@@ -0,0 +1,117 @@
+import pytest
+from sqlalchemy import create_engine, exc, text
+from sqlalchemy.pool import NullPool
+from app.config.base import build_db_uri, uses_pooler
+from app.core.db_pool import TimedQueuePool, engine_options, is_pooler_url, render_pool_metrics
+
+@pytest.fixture
+def engine(tmp_path):
+    """File-backed SQLite engine on a one-connection timed pool."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=TimedQueuePool,
+                           pool_size=1, max_overflow=0, pool_timeout=0.05, pool_logging_name='test')
+    yield engine
+    engine.dispose()
+
+class TestPoolerDetection:
+
+    @pytest.mark.parametrize('url, expected', [
+        ('postgresql+psycopg2://u:p@aws-1-us-east-2.pooler.supabase.com:6543/postgres', True),
+        ('postgresql+psycopg2://u:p@aws-1-us-east-2.pooler.supabase.com:5432/postgres', False),
+        ('postgresql+psycopg2://u:p@db.example.com:6543/postgres', True),
+        ('postgresql+psycopg2://u:p@db.example.com:5432/postgres?pgbouncer=true', True),
+        ('postgresql://u:p@pgbouncer.internal:6432/db?pgbouncer=true', True),
+        ('postgresql+psycopg2://u:p@db.example.com:5432/postgres?sslmode=require', False),
+        ('sqlite:///:memory:', False),
+        (None, False),
+    ])
+    def test_is_pooler_url(self, url, expected):
+        """Test that the pooler port and pgbouncer flag are recognized, but not the session-mode pooler."""
+        assert is_pooler_url(url) is expected
+
+    def test_pgbouncer_flag_is_removed_from_database_url(self, monkeypatch):
+        """Test that libpq never receives the pgbouncer marker."""
+        monkeypatch.setenv('DATABASE_URL', 'postgresql+psycopg2://u:p@db.example.com:5432/postgres?pgbouncer=true')
+        assert build_db_uri() == 'postgresql+psycopg2://u:p@db.example.com:5432/postgres?sslmode=require'
+
+    def test_pgbouncer_flag_is_detected_before_it_is_removed(self, monkeypatch):
+        """Test that a pgbouncer=true URL on a non-standard port still gets the pooler profile."""
+        monkeypatch.setenv('DATABASE_URL', 'postgresql://u:p@pgbouncer.internal:6432/db?pgbouncer=true')
+
+        assert uses_pooler()
+        assert engine_options(build_db_uri(), pooler=uses_pooler())['poolclass'] is NullPool
+
+    def test_supabase_session_pooler_keeps_a_pool(self, monkeypatch):
+        """Test that the Supabase session-mode pooler (port 5432) gets a sized pool, not NullPool."""
+        monkeypatch.setenv('DATABASE_URL', 'postgresql://u:p@aws-1-us-east-2.pooler.supabase.com:5432/postgres')
+
+        assert not uses_pooler()
+        assert engine_options(build_db_uri(), pooler=uses_pooler())['poolclass'] is TimedQueuePool
+
+class TestEngineOptions:
+
+    def test_direct_pool_follows_threads(self):
+        """Test that each worker keeps one connection per thread and overflows up to its share."""
+        options = engine_options('postgresql://u:p@db.example.com:5432/db', workers=4, threads=4, max_connections=20)
+
+        assert options['poolclass'] is TimedQueuePool
+        assert (options['pool_size'], options['max_overflow']) == (4, 1)
+        assert options['pool_pre_ping']
+
+    def test_workers_never_exceed_the_connection_limit(self):
+        """Test that scaling out workers shrinks each pool instead of exhausting the server."""
+        for workers in (1, 2, 5, 10, 40):
+            options = engine_options('postgresql://u:p@db:5432/db', workers=workers, threads=8,
+                                     max_connections=20, background_threads=1)
+            per_worker = options['pool_size'] + options['max_overflow']
+            assert options['pool_size'] >= 1
+            assert workers * per_worker <= max(20, workers)
+
+    def test_pooler_uses_null_pool(self):
+        """Test that a transaction-mode pooler gets no app-side pool."""
+        options = engine_options('postgresql://u:p@x.pooler.supabase.com:6543/db', workers=4, threads=4)
+
+        assert options['poolclass'] is NullPool
+        assert 'pool_size' not in options and not options['pool_pre_ping']
+
+    def test_profile_can_be_forced(self):
+        """Test that the pooler flag overrides the detection."""
+        assert engine_options('postgresql://u:p@db:5432/db', pooler=True)['poolclass'] is NullPool
+        assert engine_options('postgresql://u:p@db:6543/db', pooler=False)['poolclass'] is TimedQueuePool
+
+class TestTimedQueuePool:
+
+    def test_checkouts_are_timed(self, engine):
+        """Test that every checkout feeds the wait histogram."""
+        for _ in range(3):
+            with engine.connect() as conn:
+                conn.execute(text('SELECT 1'))
+
+        stats = engine.pool.stats()
+        assert stats['wait'][2] == 3
+        assert (stats['size'], stats['checked_out'], stats['timeouts']) == (1, 0, 0)
+
+    def test_exhausted_pool_counts_timeouts(self, engine):
+        """Test that a checkout that gives up after pool_timeout is counted."""
+        with engine.connect():
+            with pytest.raises(exc.TimeoutError):
+                engine.connect()
+            assert engine.pool.stats()['checked_out'] == 1
+
+        stats = engine.pool.stats()
+        assert stats['timeouts'] == 1
+        assert stats['wait'][1] >= 0.05
+
+    def test_recreated_pool_keeps_timing(self, engine):
+        """Test that dispose() replaces the pool with another timed pool."""
+        engine.dispose()
+        assert isinstance(engine.pool, TimedQueuePool)
+
+    def test_metrics(self, engine):
+        """Test that the pool metrics are rendered in the Prometheus format."""
+        with engine.connect():
+            body = render_pool_metrics()
+
+        assert '# TYPE app_db_pool_checkout_seconds histogram' in body
+        assert 'app_db_pool_checkout_seconds_count{pool="test"} 1' in body
+        assert 'app_db_pool_checked_out{pool="test"} 1' in body
+        assert 'app_db_pool_timeouts_total{pool="test"} 0' in body
@@ -0,0 +1,134 @@
+import os
+import pytest
+import numpy as np
+from flask import Flask
+from pgmpy.models import BayesianNetwork
+from app.ai.artifact import NetworkArtifactStore
+from app.ai.registry import NetworkRegistry
+from app.ai.models.bayesian.soccer_bayesian_net import SoccerBayesianNetwork
+from app.ai.models.bayesian.basketball_bayesian_net import BasketballBayesianNetwork
+
+class TestNetworkArtifact:
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        """Create an artifact store in a temporary directory."""
+        return NetworkArtifactStore(str(tmp_path))
+
+    @pytest.fixture
+    def built(self, monkeypatch):
+        """Count the networks built from code."""
+        calls = []
+        original = SoccerBayesianNetwork.create_network
+
+        def create_network(network):
+            calls.append(network)
+            return original(network)
+
+        monkeypatch.setattr(SoccerBayesianNetwork, 'create_network', create_network)
+        return calls
+
+    @pytest.mark.parametrize('network_cls', [SoccerBayesianNetwork, BasketballBayesianNetwork])
+    def test_round_trip_preserves_the_network(self, store, network_cls):
+        """Test that a loaded artifact has the same graph, states and CPD values."""
+        model = network_cls().model
+        assert store.save(network_cls, model)
+        loaded = store.load(network_cls)
+
+        assert sorted(loaded.edges()) == sorted(model.edges())
+        for cpd in model.get_cpds():
+            other = loaded.get_cpds(cpd.variable)
+            assert other.variables == cpd.variables
+            assert other.state_names == cpd.state_names
+            np.testing.assert_array_equal(other.values, cpd.values)
+
+    def test_trusted_hash_hit_skips_validation(self, store, monkeypatch):
+        """Test that a matching artifact in a private directory is loaded without calling check_model()."""
+        store.save(SoccerBayesianNetwork, SoccerBayesianNetwork().model)
+        assert store.trusted()
+
+        def check_model(model):
+            raise AssertionError("check_model() should not run")
+
+        monkeypatch.setattr(BayesianNetwork, 'check_model', check_model)
+        assert store.load(SoccerBayesianNetwork) is not None
+
+    def test_shared_directory_is_refused(self, tmp_path):
+        """Test that a directory writable by other users is neither written nor read."""
+        store = NetworkArtifactStore(str(tmp_path))
+        store.save(BasketballBayesianNetwork, BasketballBayesianNetwork().model)
+        os.chmod(tmp_path, 0o777)
+
+        assert store.load(BasketballBayesianNetwork) is None
+        assert not store.save(BasketballBayesianNetwork, BasketballBayesianNetwork().model)
+
+    def test_directory_of_another_user_is_refused(self, store, monkeypatch):
+        """Test that artifacts planted in a directory owned by someone else are ignored."""
+        store.save(BasketballBayesianNetwork, BasketballBayesianNetwork().model)
+        monkeypatch.setattr(os, 'getuid', lambda: os.stat(store.directory).st_uid + 1)
+        assert store.load(BasketballBayesianNetwork) is None
+
+    def test_directory_is_created_private(self, tmp_path):
+        """Test that a missing artifact directory is created with mode 0700."""
+        store = NetworkArtifactStore(str(tmp_path / 'networks'))
+        assert store.save(BasketballBayesianNetwork, BasketballBayesianNetwork().model)
+        assert os.stat(store.directory).st_mode & 0o777 == 0o700
+
+    def test_network_is_built_once_then_loaded(self, tmp_path, built):
+        """Test that the first start builds and saves the artifact and the next one loads it."""
+        first = SoccerBayesianNetwork(artifact_dir=str(tmp_path))
+        second = SoccerBayesianNetwork(artifact_dir=str(tmp_path))
+
+        assert len(built) == 1
+        evidence = {'home_advantage': 'home', 'injuries': 'yes', 'weather': 'no'}
+        expected = first.inference.query(['risk'], evidence=evidence).values
+        actual = second.inference.query(['risk'], evidence=evidence).values
+        np.testing.assert_allclose(actual, expected)
+
+    def test_corrupt_artifact_is_rebuilt(self, tmp_path, built):
+        """Test that an artifact whose content does not match its hash is rebuilt."""
+        store = NetworkArtifactStore(str(tmp_path))
+        store.save(SoccerBayesianNetwork, SoccerBayesianNetwork().model)
+        path = os.path.join(store.path(SoccerBayesianNetwork), 'cpd_0.npy')
+        array = np.load(path)
+        array[...] = 0.5
+        np.save(path, array)
+
+        assert store.load(SoccerBayesianNetwork) is None
+        SoccerBayesianNetwork(artifact_dir=str(tmp_path))
+        assert len(built) == 2
+        assert store.load(SoccerBayesianNetwork) is not None
+
+    def test_changed_code_invalidates_artifact(self, store, monkeypatch):
+        """Test that an artifact built by other code is not trusted."""
+        store.save(SoccerBayesianNetwork, SoccerBayesianNetwork().model)
+        monkeypatch.setattr(NetworkArtifactStore, 'spec_hash', classmethod(lambda cls, network_cls: 'other'))
+        assert store.load(SoccerBayesianNetwork) is None
+
+    def test_loaded_cpds_are_read_only(self, store):
+        """Test that the memory-mapped CPD buffers cannot be modified."""
+        store.save(BasketballBayesianNetwork, BasketballBayesianNetwork().model)
+        for cpd in store.load(BasketballBayesianNetwork).get_cpds():
+            assert not cpd.values.flags.writeable
+
+    def test_unwritable_directory_still_builds(self, tmp_path):
+        """Test that failing to save the artifact does not break the network."""
+        blocker = tmp_path / 'file'
+        blocker.write_text('')
+        network = BasketballBayesianNetwork(artifact_dir=str(blocker / 'artifacts'))
+        assert network.model.get_cpds('bet_risk') is not None
+
+    def test_registry_uses_artifact_dir(self, tmp_path):
+        """Test that the registry saves the artifacts of the networks it builds."""
+        registry = NetworkRegistry()
+        registry.artifact_dir = str(tmp_path)
+        registry.get('basketball')
+        assert os.path.isfile(os.path.join(tmp_path, 'BasketballBayesianNetwork', 'manifest.json'))
+
+    def test_registry_defaults_to_instance_folder(self, tmp_path):
+        """Test that the artifacts go to the app's instance folder, not a shared temp directory."""
+        app = Flask(__name__, instance_path=str(tmp_path))
+        app.config['NETWORK_ARTIFACTS'] = True
+        registry = NetworkRegistry()
+        registry.init_app(app)
+        assert registry.artifact_dir == os.path.join(str(tmp_path), 'networks')
@@ -0,0 +1,44 @@
+import pytest
+import numpy as np
+from app.ai.registry import NetworkRegistry
+from app.ai.models.bayesian.soccer_bayesian_net import SoccerBayesianNetwork
+from app.ai.models.bayesian.basketball_bayesian_net import BasketballBayesianNetwork
+
+class TestNetworkRegistry:
+    
+    @pytest.fixture
+    def registry(self):
+        """Create an empty registry for testing."""
+        return NetworkRegistry()
+    
+    def test_get_builds_network_once(self, registry):
+        """Test that the same network instance is shared for a sport."""
+        network = registry.get('soccer')
+        assert isinstance(network, SoccerBayesianNetwork)
+        assert registry.get('Soccer') is network
+    
+    def test_cpd_buffers_are_read_only(self, registry):
+        """Test that shared CPD buffers cannot be modified."""
+        network = registry.get('basketball')
+        for cpd in network.model.get_cpds():
+            assert not cpd.values.flags.writeable
+            with pytest.raises(ValueError):
+                cpd.values[...] = 0
+    
+    def test_frozen_network_still_answers_queries(self, registry):
+        """Test that inference works on read-only CPDs."""
+        network = registry.get('basketball')
+        prediction = network.inference.query(['bet_risk'], evidence={'team_form': 'good'})
+        assert np.isclose(prediction.values.sum(), 1.0)
+    
+    def test_preload_builds_every_sport(self, registry):
+        """Test that preload builds all supported networks."""
+        registry.preload()
+        assert registry.is_loaded('soccer')
+        assert registry.is_loaded('basketball')
+        assert isinstance(registry.get('basketball'), BasketballBayesianNetwork)
+    
+    def test_unsupported_sport_raises(self, registry):
+        """Test that unsupported sports are rejected."""
+        with pytest.raises(ValueError):
+            registry.get('tennis')
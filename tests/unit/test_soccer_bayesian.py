@@ -1,7 +1,7 @@
 import pytest
 from pgmpy.models import BayesianNetwork
 from pgmpy.factors.discrete import TabularCPD
-from app.models.soccer.bayesian_net import SoccerBayesianNetwork
+from app.ai.models.bayesian.soccer_bayesian_net import SoccerBayesianNetwork
 import numpy as np
 
 class TestSoccerBayesianNetwork:
@@ -323,4 +323,134 @@ class TestSoccerBayesianNetwork:
         assert unfavorable_result.values[safe_idx] < 0.2
         
         # The difference should be dramatic
-        assert favorable_result.values[safe_idx] - unfavorable_result.values[safe_idx] > 0.6
\ No newline at end of file
+        assert favorable_result.values[safe_idx] - unfavorable_result.values[safe_idx] > 0.6
+    
+    def test_full_evidence_lookup_matches_variable_elimination(self, soccer_bayes_net):
+        """Test that the full-evidence lookup returns the same posterior as VE."""
+        from itertools import islice, product
+        from pgmpy.inference import VariableElimination
+        
+        inference = soccer_bayes_net.inference
+        reference = VariableElimination(soccer_bayes_net.model)
+        evidence_vars = inference.evidence_vars
+        states = [soccer_bayes_net.model.get_cpds('risk').state_names[var] for var in evidence_vars]
+        
+        for combination in islice(product(*states), 0, None, 97):
+            evidence = dict(zip(evidence_vars, combination))
+            fast = inference.query(['risk'], evidence=evidence)
+            slow = reference.query(['risk'], evidence=evidence, show_progress=False)
+            assert fast.state_names == slow.state_names
+            assert np.allclose(fast.values, slow.values)
+    
+    def test_star_inference_matches_variable_elimination_for_every_evidence_subset(self, soccer_bayes_net):
+        """Test that the star-network marginal equals the VE posterior for every subset of observed parents."""
+        import random
+        from itertools import combinations
+        from pgmpy.inference import VariableElimination
+        from app.ai.base_models import StarNetworkInference
+        
+        inference = soccer_bayes_net.inference
+        assert isinstance(inference, StarNetworkInference)
+        reference = VariableElimination(soccer_bayes_net.model)
+        states = soccer_bayes_net.model.get_cpds('risk').state_names
+        rng = random.Random(11)
+        
+        for k in range(len(inference.evidence_vars) + 1):
+            for observed in combinations(inference.evidence_vars, k):
+                evidence = {var: rng.choice(states[var]) for var in observed}
+                fast = inference.query(['risk'], evidence=evidence)
+                slow = reference.query(['risk'], evidence=evidence, show_progress=False)
+                assert fast.state_names == slow.state_names
+                assert np.allclose(fast.values, slow.values)
+    
+    def test_star_inference_falls_back_for_other_queries(self, soccer_bayes_net):
+        """Test that queries on other variables still go through variable elimination."""
+        prediction = soccer_bayes_net.inference.query(['injuries'], evidence={'risk': 'risky'})
+        assert prediction.variables == ['injuries']
+        assert prediction.values[1] > soccer_bayes_net.model.get_cpds('injuries').values[1]
+        with pytest.raises(Exception):
+            soccer_bayes_net.inference.query(['risk'], evidence={'injuries': 'invalid'})
+    
+    def test_full_evidence_lookup_table(self, soccer_bayes_net):
+        """Test that the lookup table covers every parent combination."""
+        inference = soccer_bayes_net.inference
+        
+        assert inference.table.shape == (11664, 2)
+        assert not inference.table.flags.writeable
+        assert np.allclose(inference.table.sum(axis=1), 1.0)
+    
+    def test_partial_evidence_uses_variable_elimination(self, soccer_bayes_net):
+        """Test that partial evidence still returns a proper marginal."""
+        prediction = soccer_bayes_net.inference.query(['risk'], evidence={'injuries': 'yes'})
+        assert np.isclose(prediction.values.sum(), 1.0)
+    
+    def test_full_evidence_with_invalid_state_raises(self, soccer_bayes_net):
+        """Test that invalid states are still rejected on the fast path."""
+        evidence = {var: 'invalid' for var in soccer_bayes_net.inference.evidence_vars}
+        with pytest.raises(Exception):
+            soccer_bayes_net.inference.query(['risk'], evidence=evidence)
+    
+    def test_risk_cpd_matches_reference_loop(self, soccer_bayes_net):
+        """Test that the vectorized risk CPD matches the original per-combination loop."""
+        from itertools import product
+        
+        safe = []
+        risky = []
+        for home_advantage, injury, performance, weather, rivalry, league_position, recent_streak, match_importance, physical_condition, head_to_head in product(
+            ['home', 'away'], ['no', 'yes'], ['low', 'medium', 'high'], ['no', 'yes'], ['no', 'yes'],
+            ['high', 'medium', 'low'], ['winning', 'neutral', 'losing'], ['high', 'medium', 'low'],
+            ['rested', 'normal', 'fatigued'], ['home_advantage', 'balanced', 'away_advantage']
+        ):
+            risk = 0.0
+            risk += 0.15 if home_advantage == 'away' else -0.1
+            risk += 0.25 if injury == 'yes' else -0.05
+            risk += 0.25 if performance == 'low' else (-0.05 if performance == 'high' else 0.0)
+            risk += 0.2 if weather == 'yes' else -0.05
+            risk += 0.1 if rivalry == 'yes' else -0.05
+            risk += -0.1 if league_position == 'high' else (0.05 if league_position == 'low' else 0.0)
+            risk += -0.1 if recent_streak == 'winning' else (0.1 if recent_streak == 'losing' else 0.0)
+            risk += -0.05 if match_importance == 'high' else (0.05 if match_importance == 'low' else 0.0)
+            risk += -0.1 if physical_condition == 'rested' else (0.1 if physical_condition == 'fatigued' else 0.0)
+            risk += -0.05 if head_to_head == 'home_advantage' else (0.05 if head_to_head == 'away_advantage' else 0.0)
+            risk = min(max(0.05 + risk, 0.01), 0.99)
+            safe.append(round(1 - risk, 3))
+            risky.append(round(risk, 3))
+        
+        values = soccer_bayes_net.model.get_cpds('risk').get_values()
+        assert np.array_equal(values, np.array([safe, risky]))
+    
+    def test_prefix_tables_match_variable_elimination(self, soccer_bayes_net):
+        """Test that every prefix table equals the VE posterior for that prefix."""
+        import random
+        from pgmpy.inference import VariableElimination
+        
+        order = ['home_advantage', 'injuries', 'performance', 'weather', 'rivalry', 'league_position',
+                 'recent_streak', 'match_importance', 'physical_condition', 'head_to_head']
+        states = soccer_bayes_net.model.get_cpds('risk').state_names
+        reference = VariableElimination(soccer_bayes_net.model)
+        rng = random.Random(3)
+        
+        for k in range(len(order) + 1):
+            evidence = {var: rng.choice(states[var]) for var in order[:k]}
+            posterior = soccer_bayes_net.prefix_posterior(order, evidence)
+            expected = reference.query(['risk'], evidence=evidence, show_progress=False)
+            assert np.allclose([posterior[s] for s in expected.state_names['risk']], expected.values)
+    
+    def test_prefix_tables_shapes(self, soccer_bayes_net):
+        """Test that table k has one axis per answered parent plus the risk axis."""
+        order = list(soccer_bayes_net.inference.evidence_vars)
+        tables = soccer_bayes_net.prefix_tables(order)
+        
+        assert len(tables) == len(order) + 1
+        assert tables[0].shape == (2,)
+        assert tables[-1].shape == (2, 2, 3, 2, 2, 3, 3, 3, 3, 3, 2)
+        assert all(not table.flags.writeable for table in tables)
+        assert soccer_bayes_net.prefix_tables(order) is tables
+    
+    def test_prefix_posterior_rejects_non_prefix(self, soccer_bayes_net):
+        """Test that answers skipping a question are rejected."""
+        order = list(soccer_bayes_net.inference.evidence_vars)
+        with pytest.raises(ValueError):
+            soccer_bayes_net.prefix_posterior(order, {order[1]: 'yes'})
+        with pytest.raises(ValueError):
+            soccer_bayes_net.prefix_tables(order[:-1])
@@ -3,7 +3,7 @@ from unittest.mock import Mock, MagicMock
 from experta import Fact
 import numpy as np
 import re
-from app.models.soccer.expert_system import SoccerExpert, SoccerFact, SPANISH_MAP, VALID_STATES
+from app.ai.models.expert_systems.soccer_expert import SoccerExpert, SoccerFact, SPANISH_MAP, VALID_STATES
 
 class TestSoccerExpert:
     @pytest.fixture
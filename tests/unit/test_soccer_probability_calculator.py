@@ -0,0 +1,145 @@
+import json
+import random
+import pytest
+import numpy as np
+import pandas as pd
+from app.ai.utils.soccer import soccer_probability_calculator as calculator
+
+TEAMS = [f'Team {i}' for i in range(12)]
+
+def make_matches(days=120, seed=7):
+    """Build a results frame in which no team plays twice on the same day."""
+    rng = random.Random(seed)
+    date = pd.Timestamp('2000-01-01')
+    rows = []
+    for _ in range(days):
+        date += pd.Timedelta(days=rng.randint(1, 3))
+        teams = rng.sample(TEAMS, 2 * rng.randint(1, 4))
+        for home, away in zip(teams[::2], teams[1::2]):
+            rows.append({
+                'date': date,
+                'home_team': home,
+                'away_team': away,
+                'home_score': rng.randint(0, 3),
+                'away_score': rng.randint(0, 3),
+                'tournament': rng.choice(['Friendly', 'FIFA World Cup qualification']),
+                'neutral': rng.random() < 0.2
+            })
+    return pd.DataFrame(rows).sort_values('date', kind='mergesort').reset_index(drop=True)
+
+def reference_features(data):
+    """The original per-row implementation of the factors (without sampling)."""
+    def result(row):
+        if row['home_score'] > row['away_score']:
+            return 'home_win'
+        if row['home_score'] < row['away_score']:
+            return 'away_win'
+        return 'draw'
+
+    def previous(team, date):
+        mask = ((data['home_team'] == team) | (data['away_team'] == team)) & (data['date'] < date)
+        return data[mask].sort_values('date', ascending=False)
+
+    def streak(team, date):
+        prev = previous(team, date).head(3)
+        if len(prev) < 3:
+            return 'neutral'
+        wins = sum((r['home_team'] == team and r['result'] == 'home_win') or
+                   (r['away_team'] == team and r['result'] == 'away_win') for _, r in prev.iterrows())
+        losses = sum((r['home_team'] == team and r['result'] == 'away_win') or
+                     (r['away_team'] == team and r['result'] == 'home_win') for _, r in prev.iterrows())
+        return 'good' if wins >= 2 else 'bad' if losses >= 2 else 'neutral'
+
+    def h2h(row):
+        teams = {row['home_team'], row['away_team']}
+        mask = data['home_team'].isin(teams) & data['away_team'].isin(teams) & (data['date'] < row['date'])
+        prev = data[mask].sort_values('date', ascending=False).head(5)
+        if prev.empty:
+            return None
+        wins = sum((r['home_team'] == row['home_team'] and r['result'] == 'home_win') or
+                   (r['away_team'] == row['home_team'] and r['result'] == 'away_win') for _, r in prev.iterrows())
+        return wins / len(prev)
+
+    def rest(row):
+        prev = previous(row['home_team'], row['date'])
+        return None if prev.empty else (row['date'] - prev['date'].iloc[0]).days
+
+    data = data.copy()
+    data['result'] = data.apply(result, axis=1)
+    data['home_streak'] = data.apply(lambda row: streak(row['home_team'], row['date']), axis=1)
+    data['away_streak'] = data.apply(lambda row: streak(row['away_team'], row['date']), axis=1)
+    data['h2h_win_rate'] = data.apply(h2h, axis=1)
+    data['home_days_rest'] = data.apply(rest, axis=1)
+    return data
+
+@pytest.fixture(scope='module')
+def matches():
+    """Synthetic match history."""
+    return make_matches()
+
+class TestSoccerProbabilityCalculator:
+
+    def test_features_match_reference_implementation(self, matches):
+        """Test that the vectorized windows equal the original per-row computation."""
+        fast = calculator.compute_features(matches)
+        slow = reference_features(matches)
+
+        assert (fast['result'] == slow['result']).all()
+        assert (fast['home_streak'] == slow['home_streak']).all()
+        assert (fast['away_streak'] == slow['away_streak']).all()
+        assert np.allclose(fast['h2h_win_rate'].astype(float), slow['h2h_win_rate'].astype(float), equal_nan=True)
+        assert np.allclose(fast['home_days_rest'].astype(float), slow['home_days_rest'].astype(float), equal_nan=True)
+
+    def test_same_day_matches_do_not_see_each_other(self):
+        """Test that a team's two matches on one day share the same previous window."""
+        day = pd.Timestamp('2020-01-01')
+        data = pd.DataFrame([
+            {'date': day, 'home_team': 'A', 'away_team': 'B', 'home_score': 1, 'away_score': 0,
+             'tournament': 'Friendly', 'neutral': False},
+            {'date': day, 'home_team': 'A', 'away_team': 'C', 'home_score': 2, 'away_score': 0,
+             'tournament': 'Friendly', 'neutral': False},
+            {'date': day + pd.Timedelta(days=2), 'home_team': 'A', 'away_team': 'B', 'home_score': 0,
+             'away_score': 0, 'tournament': 'Friendly', 'neutral': True}
+        ])
+        features = calculator.compute_features(data)
+
+        assert features['home_days_rest'].isna().tolist() == [True, True, False]
+        assert features['home_days_rest'].iloc[2] == 2
+        assert features['h2h_group'].tolist() == ['no_data', 'no_data', 'alta']
+        assert features['venue'].tolist() == ['home', 'home', 'neutral']
+
+    def test_incremental_ingest_matches_full_run(self, matches):
+        """Test that ingesting the history in chunks gives the same counters as one pass."""
+        full = calculator.ingest(matches)
+
+        state = calculator.empty_state()
+        dates = matches['date'].drop_duplicates()
+        for chunk in np.array_split(dates.to_numpy(), 4):
+            state = calculator.ingest(matches[matches['date'].isin(chunk)], state)
+            # Round-trip through JSON like the stored state file
+            state = json.loads(json.dumps(state))
+
+        assert state['counters'] == full['counters']
+        assert state['last_date'] == full['last_date']
+
+    def test_already_ingested_matches_are_skipped(self, matches):
+        """Test that re-ingesting old matches does not change the counters."""
+        state = calculator.ingest(matches)
+        assert calculator.ingest(matches, state) == state
+
+    def test_probability_table(self, matches):
+        """Test that the exported table keeps the original factors and order."""
+        table = calculator.probabilities(calculator.ingest(matches)['counters'])
+
+        assert list(table.columns) == ['factor', 'state', 'win_probability']
+        assert table[['factor', 'state']].values.tolist()[:3] == [['venue', 'home'], ['venue', 'neutral'], ['venue', 'away']]
+        assert len(table) == len(calculator.PROBABILITY_ROWS)
+        assert table['win_probability'].between(0, 1).all()
+
+    def test_state_file_round_trip(self, matches, tmp_path):
+        """Test that the stored state can be saved and loaded back."""
+        path = str(tmp_path / 'state.json')
+        assert calculator.load_state(path) == calculator.empty_state()
+        state = calculator.ingest(matches)
+        calculator.save_state(state, path)
+        assert calculator.load_state(path) == state
@@ -0,0 +1,59 @@
+import pytest
+from app.core.cache import TTLCache
+
+class FakeClock:
+    """Manually advanced clock."""
+    
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+class TestTTLCache:
+    
+    @pytest.fixture
+    def clock(self):
+        return FakeClock()
+    
+    def test_get_and_set(self):
+        """Test that stored values are returned and missing keys give the default."""
+        cache = TTLCache(max_size=2)
+        cache.set('a', 1)
+        assert cache.get('a') == 1
+        assert cache.get('b', 'missing') == 'missing'
+        assert (cache.hits, cache.misses) == (1, 1)
+    
+    def test_least_recently_used_is_evicted(self):
+        """Test that the least recently used entry is evicted when full."""
+        cache = TTLCache(max_size=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        
+        assert 'a' in cache
+        assert 'b' not in cache
+        assert len(cache) == 2
+    
+    def test_entries_expire(self, clock):
+        """Test that entries expire after the TTL."""
+        cache = TTLCache(max_size=2, ttl=10, clock=clock)
+        cache.set('a', 1)
+        clock.now = 9.9
+        assert cache.get('a') == 1
+        clock.now = 10.0
+        assert cache.get('a') is None
+        assert len(cache) == 0
+    
+    def test_delete_and_clear(self):
+        """Test that entries can be removed one by one or all at once."""
+        cache = TTLCache()
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.delete('a')
+        cache.delete('missing')
+        assert 'a' not in cache
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.hits == cache.misses == 0
@@ -1,11 +1,15 @@
 import sys
 import json
 import os
+import numpy as np
+import pandas as pd
+import pytest
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
-from app.models.betting_adviser import BettingAdviser
+from app.ai.batch_scorer import BatchScorer
 
 SOCCER_JSON = 'data/soccer_matches.json'
 BASKET_JSON = 'data/basketball_games.json'
+CALIBRATION_BINS = 10
 
 def load_data(path):
     """Load match data from JSON file."""
@@ -13,57 +17,97 @@ def load_data(path):
     with open(full_path, encoding='utf-8') as f:
         return json.load(f)
 
+def to_frame(matches, sport):
+    """
+    Turn the match list into a categorical frame.
+
+    Every fact column is translated to the network states and stored as a
+    pandas Categorical whose categories follow the CPD state order, so the
+    category codes are directly the state ordinals (-1 for invalid answers).
+    """
+    scorer = BatchScorer.for_sport(sport)
+    inference = scorer.network.inference
+    raw = pd.DataFrame.from_records(matches)
+
+    frame = pd.DataFrame(index=raw.index)
+    for key in inference.evidence_vars:
+        answers = raw[key] if key in raw else pd.Series('', index=raw.index)
+        answers = answers.astype(str).str.strip().str.lower().map(scorer.translations[key])
+        frame[key] = pd.Categorical(answers, categories=list(inference.ordinals[key]))
+    frame['home_win'] = raw['result'].eq('home_win')
+    return frame
+
+def score_frame(frame, sport):
+    """Add the safe probability and the predicted label for every valid row at once."""
+    inference = BatchScorer.for_sport(sport).network.inference
+    codes = np.column_stack([frame[key].cat.codes.to_numpy() for key in inference.evidence_vars])
+    valid = (codes >= 0).all(axis=1)
+
+    scored = frame[valid].copy()
+    safe_idx = inference.state_names[inference.target].index('safe')
+    scored['p_safe'] = inference.batch_query(codes[valid])[:, safe_idx]
+    scored['predicted_safe'] = scored['p_safe'] >= 0.5
+    return scored, int((~valid).sum())
+
 def evaluate(matches, sport):
-    """Evaluate the accuracy of predictions for a sport."""
-    adviser = BettingAdviser(sport)
-    correct = 0
-    total_processed = 0
-    
-    for m in matches:
-        try:
-            actual = m['result']  # 'home_win' or 'away_win'
-            
-            # Filter out metadata fields and create facts list
-            excluded_fields = {'result', 'home_team', 'away_team', 'date'}
-            facts_dict = {k: v for k, v in m.items() if k not in excluded_fields}
-            
-            # Process all facts at once to get final recommendation
-            facts_list = [facts_dict]  # Wrap in list as expected by the system
-            
-            res = adviser.get_betting_advice(facts_list)
-            
-            if 'message' not in res:
-                print(f"Warning: No message in response for {m.get('home_team', 'Unknown')} vs {m.get('away_team', 'Unknown')}")
-                continue
-                
-            msg = res['message']
-            
-            # Determine prediction based on message content
-            pred = 'segura' if 'segura' in msg else 'arriesgada'
-            
-            # Check if prediction matches actual result
-            # segura = safe bet = expect home win
-            # arriesgada = risky bet = expect away win or upset
-            if (pred == 'segura' and actual == 'home_win') or (pred == 'arriesgada' and actual != 'home_win'):
-                correct += 1
-                
-            total_processed += 1
-            
-            # Debug output for first few matches
-            if total_processed <= 3:
-                print(f"Debug: {m.get('home_team', 'Home')} vs {m.get('away_team', 'Away')}")
-                print(f"  Prediction: {pred}, Actual: {actual}, Correct: {(pred == 'segura' and actual == 'home_win') or (pred == 'arriesgada' and actual != 'home_win')}")
-                print(f"  Message: {msg[:100]}...")
-                
-        except Exception as e:
-            print(f"Error processing match {m.get('home_team', 'Unknown')} vs {m.get('away_team', 'Unknown')}: {e}")
-            continue
-    
-    if total_processed == 0:
-        return 0, 0, 0.0
-        
-    accuracy = (correct / total_processed) * 100
-    return total_processed, correct, accuracy
+    """
+    Evaluate the predictions for a sport.
+
+    A 'safe' prediction is correct when the home team won; a 'risky' one when it did not.
+    Returns accuracy, the confusion matrix, the Brier score of P(safe) against a home
+    win and calibration bins, all computed from the numeric probabilities.
+    """
+    scored, skipped = score_frame(to_frame(matches, sport), sport)
+    total = len(scored)
+    if total == 0:
+        return {'total': 0, 'correct': 0, 'accuracy': 0.0, 'skipped': skipped}
+
+    outcome = scored['home_win'].to_numpy()
+    predicted = scored['predicted_safe'].to_numpy()
+    p_safe = scored['p_safe'].to_numpy()
+    correct = int((predicted == outcome).sum())
+
+    confusion = {
+        'safe_home_win': int((predicted & outcome).sum()),
+        'safe_other': int((predicted & ~outcome).sum()),
+        'risky_home_win': int((~predicted & outcome).sum()),
+        'risky_other': int((~predicted & ~outcome).sum()),
+    }
+
+    bins = np.minimum((p_safe * CALIBRATION_BINS).astype(int), CALIBRATION_BINS - 1)
+    grouped = pd.DataFrame({'bin': bins, 'p_safe': p_safe, 'home_win': outcome}).groupby('bin')
+    calibration = [{
+        'bin': f"{b / CALIBRATION_BINS:.1f}-{(b + 1) / CALIBRATION_BINS:.1f}",
+        'count': int(count),
+        'mean_predicted': round(float(mean_predicted), 4),
+        'observed_rate': round(float(observed), 4)
+    } for b, count, mean_predicted, observed in zip(
+        grouped.size().index, grouped.size(), grouped['p_safe'].mean(), grouped['home_win'].mean()
+    )]
+
+    return {
+        'total': total,
+        'correct': correct,
+        'accuracy': correct / total * 100,
+        'skipped': skipped,
+        'confusion': confusion,
+        'brier': float(np.mean((p_safe - outcome) ** 2)),
+        'calibration': calibration
+    }
+
+def print_report(name, metrics):
+    """Print the metrics of one sport."""
+    print(f"{name:<11}: {metrics['correct']}/{metrics['total']} aciertos -> {metrics['accuracy']:.2f}%"
+          f" (omitidos: {metrics['skipped']})")
+    if metrics['total'] == 0:
+        return
+    confusion = metrics['confusion']
+    print(f"  Matriz de confusión  segura: {confusion['safe_home_win']} local / {confusion['safe_other']} otro"
+          f" | arriesgada: {confusion['risky_home_win']} local / {confusion['risky_other']} otro")
+    print(f"  Brier score: {metrics['brier']:.4f}")
+    for row in metrics['calibration']:
+        print(f"  Calibración {row['bin']}: n={row['count']}, predicho={row['mean_predicted']:.3f},"
+              f" observado={row['observed_rate']:.3f}")
 
 def main():
     """Main validation function."""
@@ -71,32 +115,68 @@ def main():
         print("Loading data...")
         soccer = load_data(SOCCER_JSON)
         basket = load_data(BASKET_JSON)
-        
+
         print("Evaluating soccer matches...")
-        soc_total, soc_corr, soc_rate = evaluate(soccer, 'soccer')
-        
+        soccer_metrics = evaluate(soccer, 'soccer')
+
         print("Evaluating basketball games...")
-        bb_total, bb_corr, bb_rate = evaluate(basket, 'basketball')
+        basket_metrics = evaluate(basket, 'basketball')
 
         print("\n" + "="*40)
         print("=== INFORME DE VALIDACIÓN ===")
         print("="*40)
-        print(f"Fútbol     : {soc_corr}/{soc_total} aciertos -> {soc_rate:.2f}%")
-        print(f"Baloncesto : {bb_corr}/{bb_total} aciertos -> {bb_rate:.2f}%")
+        print_report("Fútbol", soccer_metrics)
+        print_report("Baloncesto", basket_metrics)
         print("="*40)
-        
+
         # Overall statistics
-        total_matches = soc_total + bb_total
-        total_correct = soc_corr + bb_corr
+        total_matches = soccer_metrics['total'] + basket_metrics['total']
+        total_correct = soccer_metrics['correct'] + basket_metrics['correct']
         overall_rate = (total_correct / total_matches * 100) if total_matches > 0 else 0
-        
+
         print(f"Total      : {total_correct}/{total_matches} aciertos -> {overall_rate:.2f}%")
-        
+
     except FileNotFoundError as e:
         print(f"Error: Could not find data file. {e}")
         print("Make sure the data files exist in the correct location.")
     except Exception as e:
         print(f"An unexpected error occurred: {e}")
 
+class TestValidation:
+
+    @pytest.mark.parametrize('sport,path', [('soccer', SOCCER_JSON), ('basketball', BASKET_JSON)])
+    def test_evaluation_matches_conversational_advice(self, sport, path):
+        """Test that the vectorized predictions agree with the chat adviser's text."""
+        from app.ai.betting_adviser import BettingAdviser
+
+        matches = load_data(path)
+        scored, skipped = score_frame(to_frame(matches, sport), sport)
+        adviser = BettingAdviser(sport)
+        excluded_fields = {'result', 'home_team', 'away_team', 'date'}
+
+        assert skipped == 0
+        for match, predicted_safe in zip(matches, scored['predicted_safe']):
+            facts = [{k: v for k, v in match.items() if k not in excluded_fields}]
+            message = adviser.get_betting_advice(facts)['message']
+            assert ('segura' in message) == predicted_safe
+
+    @pytest.mark.parametrize('sport,path', [('soccer', SOCCER_JSON), ('basketball', BASKET_JSON)])
+    def test_evaluation_metrics(self, sport, path):
+        """Test that the metrics are consistent with each other."""
+        metrics = evaluate(load_data(path), sport)
+
+        assert metrics['total'] == sum(metrics['confusion'].values())
+        assert metrics['correct'] == metrics['confusion']['safe_home_win'] + metrics['confusion']['risky_other']
+        assert 0 <= metrics['brier'] <= 1
+        assert sum(row['count'] for row in metrics['calibration']) == metrics['total']
+
+    def test_invalid_rows_are_skipped(self):
+        """Test that rows with invalid answers are skipped, not mis-scored."""
+        matches = load_data(SOCCER_JSON)[:3]
+        matches[0] = dict(matches[0], weather='tormenta')
+        metrics = evaluate(matches, 'soccer')
+        assert metrics['skipped'] == 1
+        assert metrics['total'] == 2
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()